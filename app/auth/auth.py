@@ -8,11 +8,13 @@ from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 from pydantic import EmailStr
 
-from app.models.models import User, RefreshToken, Session
+from app.models.models import User, RefreshToken
 from app.schemas.status_schema import AccountStatus
 from app.schemas.user_schemas import TokenResponse
 from app.database.database import get_db
 from app.config.config import settings
+from app.auth.user_cache import load_auth_user
+from app.utils.session_activity import record_session_activity
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -133,9 +135,7 @@ async def get_current_user(
 """
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -152,23 +152,13 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    query = select(User).where(User.id == user_id)
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
+    user = await load_auth_user(user_id)
 
     if user is None or user.is_blocked:
         raise credentials_exception
 
-    # Update session activity
-    session_result = await db.execute(
-        select(Session).where(Session.user_id == user.id, Session.is_active == True)
-    )
-    sessions = session_result.scalars().all()
-    for session_obj in sessions:
-        session_obj.last_active = datetime.now()
-        session_obj.is_active = True
-    if sessions:
-        await db.commit()
+    # Session last_active is written in batches by the activity flusher
+    record_session_activity(user.id)
 
     return user
 
@@ -189,9 +179,7 @@ async def get_user_from_token(token: str, db: AsyncSession) -> User | None:
     except JWTError:
         return None
 
-    query = select(User).where(User.id == user_id)
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
+    user = await load_auth_user(user_id)
 
     if user is None or user.is_blocked:
         return None
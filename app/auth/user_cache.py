@@ -0,0 +1,175 @@
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, time as dt_time
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config.config import redis_client, settings
+from app.database.database import async_session
+from app.models.models import Profile, ProfileImage, User
+from app.utils.logger_config import setup_logger
+
+logger = setup_logger()
+
+# Secrets stay out of the shared cache; they are loaded on demand when needed
+_EXCLUDED_COLUMNS = {
+    "password",
+    "reset_token",
+    "email_verification_code",
+    "phone_verification_code",
+}
+
+# user_id -> (expires_at, snapshot)
+_local_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+
+def _auth_user_key(user_id: UUID | str) -> str:
+    return f"auth_user:{user_id}"
+
+
+def _dump_columns(obj) -> dict:
+    return {
+        attr.key: getattr(obj, attr.key)
+        for attr in inspect(obj).mapper.column_attrs
+        if attr.key not in _EXCLUDED_COLUMNS
+    }
+
+
+def _load_columns(model, data: dict):
+    """Rebuild a mapped instance from a JSON snapshot, coercing values by column type"""
+    values = {}
+    for attr in inspect(model).column_attrs:
+        if attr.key not in data:
+            continue
+        value = data[attr.key]
+        if value is not None:
+            try:
+                python_type = attr.columns[0].type.python_type
+            except NotImplementedError:
+                python_type = None
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is dt_time:
+                value = dt_time.fromisoformat(value)
+            elif python_type is UUID:
+                value = UUID(value)
+            elif python_type is Decimal:
+                value = Decimal(value)
+            elif isinstance(python_type, type) and issubclass(python_type, Enum):
+                value = python_type(value)
+        values[attr.key] = value
+    return model(**values)
+
+
+def _snapshot(user: User) -> dict:
+    profile = user.profile
+    return {
+        "user": _dump_columns(user),
+        "profile": _dump_columns(profile) if profile else None,
+        "profile_image": (
+            _dump_columns(profile.profile_image)
+            if profile and profile.profile_image
+            else None
+        ),
+    }
+
+
+def _set_local(user_id: str, snapshot: dict) -> None:
+    _local_cache[user_id] = (
+        time.monotonic() + settings.AUTH_USER_LOCAL_CACHE_TTL_SECONDS,
+        snapshot,
+    )
+    _local_cache.move_to_end(user_id)
+    while len(_local_cache) > settings.AUTH_USER_LOCAL_CACHE_SIZE:
+        _local_cache.popitem(last=False)
+
+
+def _get_snapshot(user_id: str) -> dict | None:
+    entry = _local_cache.pop(user_id, None)
+    try:
+        if entry and entry[0] > time.monotonic():
+            # Invalidation deletes the shared entry, so a local copy is only used
+            # while that still exists; a user blocked through another worker is
+            # reloaded on the next request instead of when the local copy expires
+            if not redis_client.exists(_auth_user_key(user_id)):
+                return None
+            _local_cache[user_id] = entry
+            return entry[1]
+
+        cached = redis_client.get(_auth_user_key(user_id))
+    except Exception as e:
+        logger.error(f"Auth user cache read failed: {str(e)}")
+        return None
+    if not cached:
+        return None
+
+    snapshot = json.loads(cached)
+    _set_local(user_id, snapshot)
+    return snapshot
+
+
+def cache_auth_user(user: User) -> None:
+    """Store a snapshot of the user (with profile and profile image) for the JWT dependency"""
+    user_id = str(user.id)
+    snapshot = json.loads(json.dumps(_snapshot(user), default=str))
+    _set_local(user_id, snapshot)
+    try:
+        redis_client.setex(
+            _auth_user_key(user_id),
+            settings.AUTH_USER_CACHE_TTL_SECONDS,
+            json.dumps(snapshot),
+        )
+    except Exception as e:
+        logger.error(f"Auth user cache write failed: {str(e)}")
+
+
+def invalidate_auth_user(user_id: UUID | str) -> None:
+    """
+    Drop a user's auth snapshot so the next request reloads it from the database.
+    Other workers drop their local copy once they see the shared entry is gone.
+    """
+    _local_cache.pop(str(user_id), None)
+    redis_client.delete(_auth_user_key(user_id))
+
+
+async def load_auth_user(user_id: UUID | str) -> User | None:
+    """
+    Return the user for a decoded token, detached from any session. Served from
+    the snapshot cache when possible, otherwise loaded in a session of its own
+    and cached. Keeping it out of the request session means handlers that
+    re-read the user get fresh rows, and their session starts with no
+    transaction open; writes go through queries, not the returned object.
+    """
+    user_id = str(user_id)
+    snapshot = _get_snapshot(user_id)
+
+    if snapshot:
+        user = _load_columns(User, snapshot["user"])
+        instances = [user]
+        user.profile = None
+        if snapshot["profile"]:
+            user.profile = _load_columns(Profile, snapshot["profile"])
+            user.profile.profile_image = None
+            instances.append(user.profile)
+            if snapshot["profile_image"]:
+                user.profile.profile_image = _load_columns(
+                    ProfileImage, snapshot["profile_image"]
+                )
+                instances.append(user.profile.profile_image)
+
+        # Mark the snapshot as already-persisted rows rather than new objects
+        for instance in instances:
+            make_transient_to_detached(instance)
+        return user
+
+    async with async_session() as session:
+        result = await session.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+    if user is not None:
+        cache_auth_user(user)
+    return user
@@ -22,10 +22,46 @@ class Settings(BaseSettings):
 
     # RabbitMQ settings
     RABBITMQ_URL: str = os.getenv("RABBITMQ_URL")
+    # "amqp" for RabbitMQ, "memory" for the in-process broker (tests, benchmarks)
+    QUEUE_TRANSPORT: str = os.getenv("QUEUE_TRANSPORT", "amqp")
+    # Unacked messages the broker pushes to each consumer
+    QUEUE_PREFETCH_COUNT: int = 50
+    # Consumers run inside the web app unless this is false. Moving them to the
+    # worker process (python -m app.worker) is opt-in: start a worker first, then
+    # set this to false on the web processes
+    QUEUE_CONSUMERS_IN_WEB: bool = os.getenv("QUEUE_CONSUMERS_IN_WEB", "true").lower() == "true"
+    # Seconds the worker waits for in-flight handlers on shutdown
+    QUEUE_DRAIN_TIMEOUT_SECONDS: int = 30
+    # Handlers running at once per consumer
+    QUEUE_MAX_CONCURRENCY: int = 10
+    # Backoff before each retry of a failed message; the last delay repeats
+    QUEUE_RETRY_DELAYS_SECONDS: list[int] = [5, 30, 120, 600]
+    # Failed attempts before a message goes to failed_{service}_updates
+    QUEUE_MAX_ATTEMPTS: int = 6
+    # Confirm-mode channels the producer keeps open for concurrent publishers
+    QUEUE_PRODUCER_CHANNEL_POOL_SIZE: int = 8
+    # Wallet consumer applies messages in batches, coalescing deltas per wallet
+    WALLET_QUEUE_BATCH_MODE: bool = os.getenv("WALLET_QUEUE_BATCH_MODE", "false").lower() == "true"
+    WALLET_QUEUE_BATCH_SIZE: int = 100
+    WALLET_QUEUE_BATCH_WAIT_MS: int = 50
+    # Wallet messages are spread over this many queues by consistent hash of
+    # wallet_id. 1 keeps the single wallet_updates queue. Producers and workers
+    # must agree on it; drain the wallet queues before changing it.
+    WALLET_QUEUE_SHARDS: int = int(os.getenv("WALLET_QUEUE_SHARDS", "1"))
+    # Kept well past the 24h queue TTL so any redelivery is still recognised
+    QUEUE_PROCESSED_MESSAGE_RETENTION_DAYS: int = 7
+    # Outbox relay
+    OUTBOX_RELAY_BATCH_SIZE: int = 200
+    OUTBOX_RELAY_INTERVAL_SECONDS: int = 1
+    OUTBOX_RETENTION_DAYS: int = 7
+    # How often consumer processes store their queue metrics in Redis
+    QUEUE_METRICS_PUBLISH_SECONDS: int = 15
 
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     TEST_DATABASE_URL: str = os.getenv("TEST_DATABASE_URL")
+    # Read replica; falls back to DATABASE_URL when unset
+    READ_DATABASE_URL: str | None = os.getenv("READ_DATABASE_URL")
 
     # LOGFIRE
     LOGFIRE_TOKEN: str = os.getenv("LOGFIRE_TOKEN")
@@ -41,6 +77,15 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Session activity tracking
+    SESSION_ACTIVITY_INTERVAL_SECONDS: int = 300
+    SESSION_ACTIVITY_FLUSH_SECONDS: int = 30
+
+    # Authenticated user snapshot cache
+    AUTH_USER_CACHE_TTL_SECONDS: int = 60
+    AUTH_USER_LOCAL_CACHE_TTL_SECONDS: int = 5
+    AUTH_USER_LOCAL_CACHE_SIZE: int = 10000
+
     # AWS
     AWS_SECRET_KEY: str = os.getenv("AWSSecretKey")
     AWS_ACCESS_KEY_ID: str = os.getenv("AWSAccessKeyId")
@@ -72,6 +117,31 @@ class Settings(BaseSettings):
     DB_MAX_RETRIES: int = 3
     DB_RETRY_DELAY: int = 1
 
+    # Statement caching. Sizes cover the ORM's eager-load query set with headroom.
+    # DB_PGBOUNCER_MODE is for PgBouncer in transaction pooling mode, where a
+    # prepared statement may not exist on the next transaction's server connection.
+    DB_COMPILED_CACHE_SIZE: int = 1500
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    DB_PREPARED_STATEMENT_LIFETIME_SECONDS: int = 3600
+    DB_PGBOUNCER_MODE: bool = os.getenv("DB_PGBOUNCER_MODE", "false").lower() == "true"
+
+    # Connection pool telemetry and autotuning
+    DB_LONG_HELD_SECONDS: float = 5.0
+    DB_POOL_CAPTURE_STACKS: bool = os.getenv("DB_POOL_CAPTURE_STACKS", "false").lower() == "true"
+    DB_POOL_AUTOTUNE: bool = os.getenv("DB_POOL_AUTOTUNE", "false").lower() == "true"
+    DB_POOL_AUTOTUNE_INTERVAL_SECONDS: int = 60
+    DB_POOL_AUTOTUNE_MAX_CONNECTIONS: int = 80
+    DB_POOL_AUTOTUNE_MIN_OVERFLOW: int = 5
+    DB_POOL_AUTOTUNE_HEADROOM: float = 1.25
+
+    # Read replica routing
+    READ_DB_POOL_SIZE: int = 20
+    READ_DB_MAX_OVERFLOW: int = 20
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_HEALTH_CHECK_SECONDS: int = 10
+    # Max cache TTL for data read from the replica
+    REPLICA_CACHE_TTL_SECONDS: int = 15
+
     # Termii
     SMS_API_KEY: str = os.getenv("SMS_API_KEY")
 
@@ -81,6 +151,29 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_EX: int = 3600
 
+    # Audit log writer
+    AUDIT_LOG_BATCH_SIZE: int = 500
+    AUDIT_LOG_FLUSH_SECONDS: int = 5
+    AUDIT_LOG_SHUTDOWN_RETRIES: int = 3
+    # Failed flushes of one batch before it is written row by row
+    AUDIT_LOG_BATCH_ATTEMPTS: int = 3
+    # Buffered entries kept in memory while the database is failing
+    AUDIT_LOG_MAX_PENDING: int = 50_000
+    AUDIT_LOG_SPILL_PATH: str = os.getenv("AUDIT_LOG_SPILL_PATH", "audit_log_spill.jsonl")
+
+    # Monthly partitions for transactions and audit_logs
+    PARTITION_PREMAKE_MONTHS: int = 3
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"
+    TRANSACTIONS_RETENTION_MONTHS: int = 24
+    AUDIT_LOGS_RETENTION_MONTHS: int = 12
+
+    # Cold archive for terminal orders
+    ORDER_ARCHIVE_AFTER_DAYS: int = 180
+    ORDER_ARCHIVE_BATCH_SIZE: int = 500
+
+    # Materialized views
+    VENDOR_REVIEW_STATS_REFRESH_MINUTES: int = 5
+
     UPSTASH_REDIS_URL: str = os.getenv("UPSTASH_REDIS_URL")
     UPSTASH_TOKEN: str = os.getenv("UPSTASH_TOKEN")
 
@@ -1,7 +1,14 @@
+import asyncio
+import time
+from uuid import uuid4
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import AsyncGenerator
 
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.util import await_only
+
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
@@ -12,12 +19,15 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config.config import settings
-from app.utils.middleware import with_db_retry
+from app.database.pool_metrics import InstrumentedQueuePool, instrument_engine
+from app.utils.logger_config import setup_logger
 
 from urllib.parse import urlparse
 
 DEBUG = settings.DEBUG
 
+logger = setup_logger()
+
 
 # Parse and clean test database URL
 test_db_url = settings.TEST_DATABASE_URL
@@ -31,42 +41,199 @@ TestingSessionLocal = async_sessionmaker(
 )
 
 
+def statement_cache_options(
+    pgbouncer_mode: bool = settings.DB_PGBOUNCER_MODE,
+    compiled_cache_size: int = settings.DB_COMPILED_CACHE_SIZE,
+    prepared_statement_cache_size: int = settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+) -> dict:
+    """
+    Engine kwargs for SQLAlchemy's compiled cache and asyncpg's prepared statement cache.
+    In PgBouncer mode statements are never reused and get unique names, so a
+    transaction landing on a different server connection cannot hit a missing or
+    clashing prepared statement.
+    """
+    if pgbouncer_mode:
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    else:
+        connect_args = {
+            # Used by asyncpg's own fetch paths; SQLAlchemy prepares through its cache below
+            "statement_cache_size": prepared_statement_cache_size,
+            "prepared_statement_cache_size": prepared_statement_cache_size,
+            "max_cached_statement_lifetime": settings.DB_PREPARED_STATEMENT_LIFETIME_SECONDS,
+        }
+    return {"query_cache_size": compiled_cache_size, "connect_args": connect_args}
+
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
+    poolclass=InstrumentedQueuePool,
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
     pool_timeout=settings.DB_POOL_TIMEOUT,
     pool_recycle=settings.DB_POOL_RECYCLE,
     pool_pre_ping=True,
+    **statement_cache_options(),
 )
 async_session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 
+def _retry_on_connect(async_engine) -> None:
+    """
+    Retry opening new DBAPI connections with exponential backoff.
+    Only connection acquisition is retried; statements are never replayed.
+    """
+
+    @event.listens_for(async_engine.sync_engine, "do_connect")
+    def _connect_with_retry(dialect, conn_rec, cargs, cparams):
+        for attempt in range(settings.DB_MAX_RETRIES):
+            try:
+                return dialect.connect(*cargs, **cparams)
+            except Exception as e:
+                if attempt == settings.DB_MAX_RETRIES - 1:
+                    raise
+                logger.warning(
+                    f"Database connect attempt {attempt + 1} failed: {str(e)}"
+                )
+                # do_connect runs inside SQLAlchemy's greenlet, so this sleep is async
+                await_only(asyncio.sleep(settings.DB_RETRY_DELAY * (2**attempt)))
+
+
+_retry_on_connect(engine)
+instrument_engine(engine)
+
+# Read-only engine for GET-heavy endpoints. Without READ_DATABASE_URL it points at
+# the primary, so routing can be exercised against a single database.
+read_engine = create_async_engine(
+    settings.READ_DATABASE_URL or settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.READ_DB_POOL_SIZE,
+    max_overflow=settings.READ_DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    execution_options={"postgresql_readonly": True},
+    **statement_cache_options(),
+)
+async_read_session = async_sessionmaker(
+    read_engine, expire_on_commit=False, class_=AsyncSession
+)
+_retry_on_connect(read_engine)
+instrument_engine(read_engine)
+
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class ReplicaMonitor:
+    """Tracks whether the read replica is reachable and within REPLICA_MAX_LAG_SECONDS"""
+
+    def __init__(self):
+        self._usable = True
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return (
+            time.monotonic() - self._checked_at
+            < settings.REPLICA_HEALTH_CHECK_SECONDS
+        )
+
+    async def is_usable(self) -> bool:
+        # Callers never wait on an in-flight check
+        if self._is_fresh() or self._lock.locked():
+            return self._usable
+
+        async with self._lock:
+            if not self._is_fresh():
+                self._usable = await self._check()
+                self._checked_at = time.monotonic()
+        return self._usable
+
+    def mark_unusable(self) -> None:
+        """Route reads to the primary until the next health check"""
+        self._usable = False
+        self._checked_at = time.monotonic()
+
+    async def _check(self) -> bool:
+        try:
+            async with read_engine.connect() as conn:
+                lag = await conn.scalar(REPLICA_LAG_SQL)
+        except Exception as e:
+            logger.warning(f"Read replica unreachable, using primary: {str(e)}")
+            return False
+
+        if lag is not None and lag > settings.REPLICA_MAX_LAG_SECONDS:
+            logger.warning(f"Read replica lagging {lag:.1f}s, using primary")
+            return False
+        return True
+
+
+replica_monitor = ReplicaMonitor()
+
+
 class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
-@with_db_retry()
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+    async with async_session() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
+def read_cache_ttl(db: AsyncSession, ttl: int) -> int:
+    """
+    TTL for caching a read made on `db`. A replica can trail a write and the cache
+    invalidation that followed it, so what it served is only cached briefly.
+    """
+    if db.info.get("replica"):
+        return min(ttl, settings.REPLICA_CACHE_TTL_SECONDS)
+    return ttl
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only endpoints. Served by the replica while it is healthy,
+    otherwise by the primary.
+    """
+    use_replica = await replica_monitor.is_usable()
+    session_factory = async_read_session if use_replica else async_session
+    async with session_factory() as session:
+        session.info["replica"] = use_replica and bool(settings.READ_DATABASE_URL)
         try:
             yield session
+        except DBAPIError:
+            await session.rollback()
+            if use_replica:
+                replica_monitor.mark_unusable()
+            raise
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
 
 
 @asynccontextmanager
 async def get_db_context():
     """Context manager for database sessions"""
-    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+    async with async_session() as session:
         try:
             yield session
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
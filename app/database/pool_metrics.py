@@ -0,0 +1,208 @@
+import asyncio
+import bisect
+import sys
+import time
+import traceback
+from collections import deque
+
+import greenlet
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config.config import settings
+from app.utils.logger_config import setup_logger
+
+logger = setup_logger()
+
+# Checkout wait buckets in milliseconds (upper bounds)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _caller_stack(limit: int = 25) -> list[str]:
+    """
+    Stack of the code that asked for the connection. Async engines check out
+    inside a child greenlet, so the application frames live on its parent.
+    """
+    current = greenlet.getcurrent()
+    frame = current.parent.gr_frame if current.parent else sys._getframe(1)
+    return traceback.format_list(traceback.extract_stack(frame, limit=limit))
+
+
+class PoolMetrics:
+    """Checkout latency histogram, usage peaks and long-held connection tracking for one pool"""
+
+    def __init__(self):
+        self.wait_bucket_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.long_held_count = 0
+        self.peak_in_use = 0
+        # Peak in-use per autotune window
+        self.window_peak_in_use = 0
+        self.recent_long_held: deque = deque(maxlen=20)
+        # id(connection record) -> (checked out at, stack or None)
+        self._held: dict[int, tuple[float, list[str] | None]] = {}
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        wait_ms = seconds * 1000
+        self.wait_bucket_counts[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+        self.wait_count += 1
+        self.wait_sum_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        if timed_out:
+            self.timeouts += 1
+
+    def on_checkout(self, record, in_use: int) -> None:
+        self.checkouts += 1
+        self.peak_in_use = max(self.peak_in_use, in_use)
+        self.window_peak_in_use = max(self.window_peak_in_use, in_use)
+        stack = _caller_stack() if settings.DB_POOL_CAPTURE_STACKS else None
+        self._held[id(record)] = (time.monotonic(), stack)
+
+    def on_checkin(self, record) -> None:
+        entry = self._held.pop(id(record), None)
+        if not entry:
+            return
+        checked_out_at, stack = entry
+        held = time.monotonic() - checked_out_at
+        if held >= settings.DB_LONG_HELD_SECONDS:
+            self.long_held_count += 1
+            self.recent_long_held.append(
+                {"held_seconds": round(held, 3), "stack": stack}
+            )
+            logger.warning(
+                f"Database connection held for {held:.2f}s"
+                + (f"\n{''.join(stack)}" if stack else "")
+            )
+
+    def currently_long_held(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {"held_seconds": round(now - checked_out_at, 3), "stack": stack}
+            for checked_out_at, stack in list(self._held.values())
+            if now - checked_out_at >= settings.DB_LONG_HELD_SECONDS
+        ]
+
+    def histogram(self) -> dict:
+        buckets, cumulative = {}, 0
+        for bound, count in zip(
+            [*map(str, WAIT_BUCKETS_MS), "+Inf"], self.wait_bucket_counts
+        ):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {
+            "buckets_ms": buckets,
+            "count": self.wait_count,
+            "sum_ms": round(self.wait_sum_ms, 3),
+            "max_ms": round(self.wait_max_ms, 3),
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times how long callers wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe_wait(time.perf_counter() - start)
+        return connection
+
+
+def instrument_engine(async_engine) -> None:
+    """Attach checkout/checkin tracking to an engine created with InstrumentedQueuePool"""
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool = sync_engine.pool
+        pool.metrics.on_checkout(connection_record, pool.checkedout())
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        sync_engine.pool.metrics.on_checkin(connection_record)
+
+
+def pool_snapshot(async_engine) -> dict:
+    """Gauges and counters for the metrics endpoint"""
+    pool = async_engine.sync_engine.pool
+    metrics: PoolMetrics = pool.metrics
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "peak_in_use": metrics.peak_in_use,
+        "checkouts": metrics.checkouts,
+        "checkout_timeouts": metrics.timeouts,
+        "checkout_wait": metrics.histogram(),
+        "long_held_total": metrics.long_held_count,
+        "long_held_active": metrics.currently_long_held(),
+        "long_held_recent": list(metrics.recent_long_held),
+        "recommended_pool_size": recommended_pool_size(pool),
+    }
+
+
+def recommended_pool_size(pool) -> int:
+    """Steady-state pool size suggested by observed peak concurrency"""
+    return max(
+        1,
+        min(
+            int(pool.metrics.peak_in_use * settings.DB_POOL_AUTOTUNE_HEADROOM + 0.5),
+            settings.DB_POOL_AUTOTUNE_MAX_CONNECTIONS,
+        ),
+    )
+
+
+def autotune_pool(async_engine) -> None:
+    """
+    Resize the overflow allowance from the peak concurrency seen in the last window.
+    The persistent pool_size cannot change at runtime, so only the burst cap moves;
+    recommended_pool_size on the metrics endpoint tells what to deploy next.
+    """
+    pool = async_engine.sync_engine.pool
+    metrics: PoolMetrics = pool.metrics
+    target_total = int(
+        metrics.window_peak_in_use * settings.DB_POOL_AUTOTUNE_HEADROOM + 0.5
+    )
+    # Grow faster when callers had to wait for a connection
+    if metrics.wait_max_ms >= 100:
+        target_total = max(target_total, pool.size() + pool._max_overflow + 5)
+
+    target_total = min(target_total, settings.DB_POOL_AUTOTUNE_MAX_CONNECTIONS)
+    new_overflow = max(target_total - pool.size(), settings.DB_POOL_AUTOTUNE_MIN_OVERFLOW)
+    if new_overflow != pool._max_overflow:
+        logger.info(
+            f"Pool autotune: max_overflow {pool._max_overflow} -> {new_overflow} "
+            f"(window peak {metrics.window_peak_in_use})"
+        )
+        pool._max_overflow = new_overflow
+
+    metrics.window_peak_in_use = pool.checkedout()
+    metrics.wait_max_ms = 0.0
+
+
+async def run_pool_autotuner(async_engine) -> None:
+    """Periodically apply autotune_pool until cancelled"""
+    while True:
+        await asyncio.sleep(settings.DB_POOL_AUTOTUNE_INTERVAL_SECONDS)
+        try:
+            autotune_pool(async_engine)
+        except Exception as e:
+            logger.error(f"Pool autotune failed: {str(e)}")
@@ -37,10 +37,16 @@ from app.routes import (
     stats_routes,
     ws_routes,
     audit_log_routes,
+    metrics_routes,
 )
 
 
 from app.utils.cron_job import (
+    archive_completed_orders,
+    maintain_time_partitions,
+    purge_processed_messages,
+    purge_sent_outbox_messages,
+    refresh_vendor_review_stats,
     reset_user_suspension,
     suspend_user_with_order_cancel_count_equal_3,
 )
@@ -48,11 +54,17 @@ from app.schemas.status_schema import BankSchema
 from app.utils.logger_config import setup_logger
 from app.utils.utils import get_all_banks, resolve_account_details
 from app.config.config import redis_client
-from app.database.database import engine
+from app.database.database import engine, read_engine
 from app.schemas.user_schemas import AccountDetails, AccountDetailResponse
 from app.queue.order_consumer import OrderStatusQueueConsumer
 from app.queue.wallet_consumer import WalletQueueConsumer
-from app.queue.producer import CentralQueueProducer
+from app.queue.sharding import wallet_shards
+from app.queue.producer import producer
+from app.queue.outbox import run_outbox_relay
+from app.queue.queue_metrics import run_queue_metrics_publisher
+from app.utils.session_activity import run_session_activity_flusher
+from app.utils.audit_log_writer import run_audit_log_writer
+from app.database.pool_metrics import run_pool_autotuner
 
 
 
@@ -99,11 +111,42 @@ scheduler.add_job(
     id="suspend_users",
 )
 
+scheduler.add_job(
+    lambda: run_async(loop, refresh_vendor_review_stats()),
+    trigger=IntervalTrigger(minutes=settings.VENDOR_REVIEW_STATS_REFRESH_MINUTES),
+    id="refresh_vendor_review_stats",
+)
+
+scheduler.add_job(
+    lambda: run_async(loop, maintain_time_partitions()),
+    trigger=IntervalTrigger(hours=24),
+    id="maintain_time_partitions",
+)
+
+scheduler.add_job(
+    lambda: run_async(loop, archive_completed_orders()),
+    trigger=IntervalTrigger(hours=24),
+    id="archive_completed_orders",
+)
+
+scheduler.add_job(
+    lambda: run_async(loop, purge_processed_messages()),
+    trigger=IntervalTrigger(hours=24),
+    id="purge_processed_messages",
+)
+
+scheduler.add_job(
+    lambda: run_async(loop, purge_sent_outbox_messages()),
+    trigger=IntervalTrigger(hours=24),
+    id="purge_sent_outbox_messages",
+)
+
 scheduler.start()
 
-wallet_queue_consumer = WalletQueueConsumer()
+wallet_queue_consumers = [WalletQueueConsumer(shard=shard) for shard in wallet_shards()]
 order_status_queue_consumer = OrderStatusQueueConsumer()
-central_queue_producer = CentralQueueProducer()
+# The producer the services publish through
+central_queue_producer = producer
 
 
 @asynccontextmanager
@@ -127,10 +170,31 @@ async def lifespan(application: FastAPI):
 
         logger.info("Starting queue system...")
         await central_queue_producer.connect()
-        await wallet_queue_consumer.start_consuming()
-        await order_status_queue_consumer.start_consuming()
+        # Off when a separate worker process runs the consumers
+        if settings.QUEUE_CONSUMERS_IN_WEB:
+            for wallet_queue_consumer in wallet_queue_consumers:
+                await wallet_queue_consumer.start_consuming()
+            await order_status_queue_consumer.start_consuming()
         logger.info("Queue system initialized successfully")
 
+        session_activity_task = asyncio.create_task(run_session_activity_flusher())
+        audit_log_task = asyncio.create_task(run_audit_log_writer())
+        outbox_relay_task = asyncio.create_task(run_outbox_relay())
+        background_tasks = [session_activity_task, audit_log_task, outbox_relay_task]
+        if settings.DB_POOL_AUTOTUNE:
+            background_tasks.append(asyncio.create_task(run_pool_autotuner(engine)))
+            background_tasks.append(
+                asyncio.create_task(run_pool_autotuner(read_engine))
+            )
+        if settings.QUEUE_CONSUMERS_IN_WEB:
+            background_tasks.append(
+                asyncio.create_task(
+                    run_queue_metrics_publisher(
+                        [*wallet_queue_consumers, order_status_queue_consumer]
+                    )
+                )
+            )
+
         # Log scheduler status
         logger.info(f"Scheduler running: {scheduler.running}")
         logger.info(f"Scheduled jobs: {scheduler.get_jobs()}")
@@ -139,11 +203,15 @@ async def lifespan(application: FastAPI):
 
         logger.info("Shutting down services...")
         scheduler.shutdown()
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
         logger.info("Services shutdown complete")
 
     finally:
         # Shutdown: Stop consumers and close producer
-        await wallet_queue_consumer.stop_consuming()
+        for wallet_queue_consumer in wallet_queue_consumers:
+            await wallet_queue_consumer.stop_consuming()
         await order_status_queue_consumer.stop_consuming()
         # await notification_queue_consumer.stop_consuming()
         await central_queue_producer.close()
@@ -216,6 +284,7 @@ logfire.configure(service_name="ServiPal")
 logfire.debug("App Debug mode on")
 logfire.instrument_fastapi(app=app)
 logfire.instrument_sqlalchemy(engine=engine)
+logfire.instrument_sqlalchemy(engine=read_engine)
 
 origins = ["http://localhost:3000", "https://servi-pal.com"]
 
@@ -317,3 +386,4 @@ app.include_router(settings_routes.router)
 app.include_router(stats_routes.router)
 app.include_router(ws_routes.router)
 app.include_router(audit_log_routes.router)
+app.include_router(metrics_routes.router)
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Table
+
+from app.database.database import Base
+from app.models.models import Delivery, Order, OrderItem
+
+
+def _archive_table(table: Table) -> Table:
+    """
+    Same columns as the live table, without foreign keys, so archived rows do not
+    pin users, wallets or items and are never touched by cascades.
+    """
+    return Table(
+        f"archived_{table.name}",
+        Base.metadata,
+        *(
+            Column(
+                column.name,
+                column.type,
+                primary_key=column.primary_key,
+                nullable=column.nullable,
+            )
+            for column in table.columns
+        ),
+        Column("archived_at", DateTime, nullable=False, default=datetime.now),
+    )
+
+
+# Terminal orders older than ORDER_ARCHIVE_AFTER_DAYS, moved by archive_completed_orders
+archived_orders = _archive_table(Order.__table__)
+archived_order_items = _archive_table(OrderItem.__table__)
+archived_deliveries = _archive_table(Delivery.__table__)
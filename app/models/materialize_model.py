@@ -6,8 +6,7 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 class VendorReviewStats(Base):
     __tablename__ = "vendor_review_stats"
-    __table_args__ = {"extend_existing": True}
-    __table_args__ = {"info": {"is_view": True}}
+    __table_args__ = {"extend_existing": True, "info": {"is_view": True}}
 
     vendor_id: Mapped[UUID] = mapped_column(primary_key=True)
     item_type: Mapped[str]
@@ -11,6 +11,7 @@ from typing import Optional, Tuple
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     DateTime,
     ForeignKey,
     ARRAY,
@@ -313,7 +314,8 @@ class Transaction(Base):
     payment_status: Mapped[PaymentStatus] = mapped_column(default=PaymentStatus.PENDING)
     payment_method: Mapped[PaymentMethod] = mapped_column(nullable=True)
     payment_link: Mapped[str] = mapped_column(nullable=True)
-    created_at: Mapped[datetime] = mapped_column(default=datetime.now)
+    # Part of the primary key: the table is range-partitioned by month on created_at
+    created_at: Mapped[datetime] = mapped_column(primary_key=True, default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column(
         default=datetime.now, onupdate=datetime.now
     )
@@ -483,7 +485,9 @@ class Order(Base):
     )
     delivery: Mapped["Delivery"] = relationship(back_populates="order")
     user_reviews: Mapped[list["Review"]] = relationship(
-        back_populates="order", cascade="all, delete-orphan"
+        back_populates="order",
+        primaryjoin="Order.id == foreign(Review.order_id)",
+        cascade="all, delete-orphan",
     )
     issues: Mapped[list["UserReport"]] = relationship(
         "UserReport",
@@ -492,6 +496,11 @@ class Order(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        Index("ix_orders_owner_id_updated_at", "owner_id", "updated_at", "id"),
+        Index("ix_orders_vendor_id_updated_at", "vendor_id", "updated_at", "id"),
+    )
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -556,6 +565,12 @@ class Delivery(Base):
         back_populates="deliveries_as_sender", foreign_keys=[sender_id]
     )
 
+    __table_args__ = (
+        Index("ix_deliveries_order_id", "order_id"),
+        Index("ix_deliveries_rider_id_order_id", "rider_id", "order_id"),
+        Index("ix_deliveries_dispatch_id_order_id", "dispatch_id", "order_id"),
+    )
+
 
 class ChargeAndCommission(Base):
     __tablename__ = "charges"
@@ -584,9 +599,8 @@ class Review(Base):
     reviewer_id: Mapped[UUID] = mapped_column(
         ForeignKey("users.id")
     )  # Who wrote the review
-    order_id: Mapped[Optional[UUID]] = mapped_column(
-        ForeignKey("orders.id"), nullable=True
-    )
+    # No foreign key: the order may have moved to archived_orders
+    order_id: Mapped[Optional[UUID]] = mapped_column(nullable=True)
     item_id: Mapped[Optional[UUID]] = mapped_column(
         ForeignKey("items.id"), nullable=True
     )
@@ -613,7 +627,10 @@ class Review(Base):
         "User", back_populates="reviews_received", foreign_keys=[reviewee_id]
     )
 
-    order: Mapped[Optional["Order"]] = relationship(back_populates="user_reviews")
+    order: Mapped[Optional["Order"]] = relationship(
+        back_populates="user_reviews",
+        primaryjoin="foreign(Review.order_id) == Order.id",
+    )
     item: Mapped[Optional["Item"]] = relationship(back_populates="reviews")
 
     __table_args__ = (
@@ -764,6 +781,10 @@ class UserReportReadStatus(Base):
     )
     user: Mapped["User"] = relationship("User")
 
+    __table_args__ = (
+        Index("ix_user_report_read_status_user_id_is_read", "user_id", "is_read"),
+    )
+
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
@@ -799,7 +820,10 @@ class AuditLog(Base):
             This can include any additional context useful for auditing, such as request headers, geo-location, etc.
     """
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
-    timestamp: Mapped[datetime] = mapped_column(default=datetime.now, nullable=False)
+    # Part of the primary key: the table is range-partitioned by month on timestamp
+    timestamp: Mapped[datetime] = mapped_column(
+        primary_key=True, default=datetime.now, nullable=False
+    )
     actor_id: Mapped[UUID]
     actor_name: Mapped[str]
     actor_role: Mapped[str]
@@ -810,3 +834,41 @@ class AuditLog(Base):
     changes: Mapped[dict] = mapped_column(JSON, nullable=True)
     ip_address: Mapped[str] = mapped_column(String(64), nullable=True)
     extra_metadata: Mapped[dict] = mapped_column(JSON, nullable=True)
+
+
+class ProcessedMessage(Base):
+    """Queue messages whose effect has been committed, keyed by the producer's message id"""
+
+    __tablename__ = "processed_messages"
+
+    message_id: Mapped[UUID] = mapped_column(primary_key=True)
+    service: Mapped[str] = mapped_column(String(64))
+    operation: Mapped[str] = mapped_column(String(64))
+    processed_at: Mapped[datetime] = mapped_column(default=datetime.now, index=True)
+
+
+class OutboxMessage(Base):
+    """Queue messages written with the change that caused them, published by the outbox relay"""
+
+    __tablename__ = "outbox_messages"
+
+    # Relay publishes in insert order
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    message_id: Mapped[UUID] = mapped_column(default=uuid4, unique=True)
+    service: Mapped[str] = mapped_column(String(64))
+    operation: Mapped[str] = mapped_column(String(64))
+    payload: Mapped[dict] = mapped_column(JSON)
+    routing_key: Mapped[str] = mapped_column(String(64), nullable=True)
+    # Trace context of the request that wrote the message
+    headers: Mapped[dict] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.now)
+    sent_at: Mapped[datetime] = mapped_column(nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_messages_unsent",
+            "id",
+            postgresql_where=text("sent_at IS NULL"),
+        ),
+        Index("ix_outbox_messages_sent_at", "sent_at"),
+    )
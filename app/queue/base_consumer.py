@@ -1,16 +1,20 @@
 import asyncio
-from typing import Dict, Callable
+from typing import Any, Dict, Callable, Optional
 import json
+import time
 
-from aio_pika import (
-    connect_robust,
+import logfire
+from logfire.propagate import attach_context
 
-    ExchangeType,
-    IncomingMessage,
+from app.queue.idempotency import current_message, message_identity
+from app.queue.queue_metrics import count_outcome, message_lag_ms, observe_message
+from app.queue.topology import declare_service_queue, retry_queue_name
+from app.queue.transport import (
+    OutgoingMessage,
+    QueueMessage,
+    QueueTransport,
+    create_transport,
 )
-
-
-
 from app.utils.logger_config import setup_logger
 from app.config.config import settings
 
@@ -18,41 +22,98 @@ logger = setup_logger()
 
 
 class BaseQueueConsumer:
-    def __init__(self, service_name: str, queue_name: str):
+    def __init__(
+        self,
+        service_name: str,
+        queue_name: str,
+        prefetch_count: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        transport: Optional[QueueTransport] = None,
+        routing_key: Optional[str] = None,
+        queue_arguments: Optional[Dict[str, Any]] = None,
+    ):
         self.service_name = service_name
         self.queue_name = queue_name
-        self._connection = None
-        self._channel = None
-        self._exchange = None
-        self._queue = None
+        # Key the queue is bound under and retries are routed back with
+        self.routing_key = routing_key or service_name
+        self.queue_arguments = queue_arguments or {}
+        self.prefetch_count = prefetch_count or settings.QUEUE_PREFETCH_COUNT
+        self.max_concurrency = max_concurrency or settings.QUEUE_MAX_CONCURRENCY
+        # Created on connect from QUEUE_TRANSPORT unless one is passed in
+        self._transport = transport
+        self._connected = False
         self._consuming = False
         self._consumer_task = None
         self._operation_handlers: Dict[str, Callable] = {}
+        self._handler_slots = asyncio.Semaphore(self.max_concurrency)
+        # ordering key -> [lock, messages holding or waiting on it]
+        self._key_locks: Dict[str, list] = {}
+        self._inflight: set[asyncio.Task] = set()
 
     async def connect(self):
-        """Establish connection to RabbitMQ"""
-        if not self._connection:
-            self._connection = await connect_robust(settings.RABBITMQ_URL)
-            self._channel = await self._connection.channel()
-            self._exchange = await self._channel.declare_exchange(
-                "central_operations", ExchangeType.DIRECT, durable=True
-            )
-            self._queue = await self._channel.declare_queue(
+        """Connect and declare the queue topology"""
+        if not self._connected:
+            if self._transport is None:
+                self._transport = create_transport()
+            await self._transport.connect()
+            await declare_service_queue(
+                self._transport,
+                self.service_name,
                 self.queue_name,
-                durable=True,
-                arguments={
-                    "x-message-ttl": 1000 * 60 * 60 * 24,  # 24 hours
-                    "x-dead-letter-exchange": f"{self.service_name}_dlx",
-                    "x-dead-letter-routing-key": f"failed_{self.service_name}_updates",
-                },
-            )
-            await self._queue.bind(self._exchange, routing_key=self.service_name)
-            await self._channel.declare_queue(
-                f"failed_{self.service_name}_updates", durable=True
+                self.routing_key,
+                self.queue_arguments,
             )
+            self._connected = True
 
-    async def process_message(self, message: IncomingMessage):
+    def ordering_key(self, data: Dict[str, Any]) -> Optional[str]:
+        """
+        Messages sharing a key are handled one at a time, in delivery order.
+        A failed message is redelivered from a retry queue, so it runs after
+        same-key messages delivered meanwhile; handlers must tolerate that.
+        None lets the message run alongside any other. Override per consumer.
+        """
+        return None
+
+    def _message_key(self, message: QueueMessage) -> Optional[str]:
+        try:
+            key = self.ordering_key(json.loads(message.body.decode()))
+        except Exception:
+            # process_message reports the malformed body
+            return None
+        return str(key) if key is not None else None
+
+    async def _handle(self, message: QueueMessage, key: Optional[str]):
+        """Run one message once its key lane and a handler slot are free"""
+        if key is None:
+            async with self._handler_slots:
+                await self.process_message(message)
+            return
+
+        entry = self._key_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            # Lock waiters are woken first-in first-out, so same-key messages keep
+            # their delivery order. The slot is taken only after the lane is ours,
+            # so a busy key never holds slots other keys could use.
+            async with entry[0]:
+                async with self._handler_slots:
+                    await self.process_message(message)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._key_locks[key]
+
+    def _dispatch(self, message: QueueMessage):
+        task = asyncio.create_task(self._handle(message, self._message_key(message)))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def process_message(self, message: QueueMessage):
         """Process incoming message by dispatching to the appropriate handler"""
+        operation = None
+        headers = message.headers or {}
+        lag_ms = message_lag_ms(headers)
+        started = time.perf_counter()
         try:
             data = json.loads(message.body.decode())
             operation = data.get("operation")
@@ -67,18 +128,114 @@ class BaseQueueConsumer:
                     f"No handler for operation {operation} in {self.service_name}"
                 )
 
-            await handler(payload)
+            # The span joins the trace of the request that published the message
+            with attach_context(headers), logfire.span(
+                "queue {service}.{operation}",
+                service=self.service_name,
+                operation=operation,
+                message_id=message.message_id,
+                attempt=int(headers.get("x-attempt", 0)) + 1,
+                lag_ms=lag_ms,
+            ):
+                # Handlers call claim_message inside their transaction to skip redeliveries
+                token = current_message.set(message_identity(data, message.message_id))
+                try:
+                    await handler(payload)
+                finally:
+                    current_message.reset(token)
+
+        except Exception as e:
+            logger.error(f"Error processing {self.service_name} message: {str(e)}")
+            observe_message(
+                self.service_name,
+                operation,
+                lag_ms,
+                (time.perf_counter() - started) * 1000,
+                "failed",
+            )
+            await self.reject_message(message, operation)
+            return
+
+        if not await self.ack_message(message):
+            return
+        observe_message(
+            self.service_name,
+            operation,
+            lag_ms,
+            (time.perf_counter() - started) * 1000,
+            "processed",
+        )
+        logger.info(f"Processed {self.service_name} message for operation {operation}")
+
+    async def ack_message(self, message: QueueMessage) -> bool:
+        """
+        Ack a handled message. A failed ack is only logged: the handler's work is
+        committed, and if the ack never reached the broker the redelivery is
+        dropped by its idempotency claim. Rejecting here could settle the message
+        twice.
+        """
+        try:
             await message.ack()
-            logger.info(
-                f"Processed {self.service_name} message for operation {operation}"
+        except Exception as e:
+            logger.error(f"Could not ack {self.service_name} message: {str(e)}")
+            return False
+        return True
+
+    def _retry_queue_name(self, delay: int) -> str:
+        return retry_queue_name(self.queue_name, delay)
+
+    async def queue_depths(self) -> Dict[str, int]:
+        """Ready messages in this consumer's queue, its retry tiers and its failed queue"""
+        names = [
+            self.queue_name,
+            *map(self._retry_queue_name, settings.QUEUE_RETRY_DELAYS_SECONDS),
+            f"failed_{self.service_name}_updates",
+        ]
+        return {name: await self._transport.queue_depth(name) for name in names}
+
+    async def reject_message(
+        self, message: QueueMessage, operation: Optional[str] = None
+    ):
+        """
+        Park a failed message in the delay queue for its attempt, so it comes back
+        after an exponentially growing wait instead of spinning. The x-attempt
+        header counts failures; after QUEUE_MAX_ATTEMPTS the message is rejected
+        into failed_{service}_updates. A retried message no longer holds its
+        place in per-key ordering.
+        """
+        attempt = int((message.headers or {}).get("x-attempt", 0)) + 1
+        if attempt >= settings.QUEUE_MAX_ATTEMPTS:
+            logger.error(
+                f"Dead-lettering {self.service_name} message after {attempt} attempts"
             )
+            await message.reject(requeue=False)
+            count_outcome(self.service_name, operation, "dead_lettered")
+            return
 
+        delays = settings.QUEUE_RETRY_DELAYS_SECONDS
+        delay = delays[min(attempt, len(delays)) - 1]
+        try:
+            await self._transport.publish(
+                f"{self.service_name}_retry",
+                OutgoingMessage(
+                    message.body,
+                    routing_key=self._retry_queue_name(delay),
+                    message_id=message.message_id,
+                    headers={**(message.headers or {}), "x-attempt": attempt},
+                    content_type=message.content_type or "application/json",
+                ),
+            )
         except Exception as e:
-            logger.error(f"Error processing {self.service_name} message: {str(e)}")
-            if message.headers.get("delivery_count", 0) > 3:
-                await message.reject(requeue=False)
-            else:
-                await message.reject(requeue=True)
+            logger.error(f"Could not schedule {self.service_name} retry: {str(e)}")
+            await message.reject(requeue=True)
+            return
+
+        # The copy is confirmed by the broker before the original goes
+        await message.ack()
+        count_outcome(self.service_name, operation, "retried")
+        logger.info(
+            f"Retrying {self.service_name} message in {delay}s (attempt {attempt})"
+        )
 
     async def start_consuming(self):
         """Start consuming messages"""
@@ -90,9 +247,12 @@ class BaseQueueConsumer:
 
         async def _consume():
             try:
-                async with self._queue.iterator() as queue_iter:
-                    async for message in queue_iter:
-                        await self.process_message(message)
+                # The broker stops delivering once prefetch_count messages are
+                # unacked, which bounds the tasks waiting here
+                async for message in self._transport.consume(
+                    self.queue_name, self.prefetch_count
+                ):
+                    self._dispatch(message)
             except Exception as e:
                 logger.error(f"Consumer error in {self.service_name}: {str(e)}")
                 self._consuming = False
@@ -100,15 +260,30 @@ class BaseQueueConsumer:
         self._consumer_task = asyncio.create_task(_consume())
         logger.info(f"Started {self.service_name} consumer")
 
-    async def stop_consuming(self):
-        """Stop consuming messages"""
+    async def stop_consuming(self, drain_timeout: Optional[float] = None):
+        """
+        Stop consuming messages. Deliveries stop first, then handlers already
+        running get up to drain_timeout seconds (no limit when None) to finish
+        and ack. Handlers still running after that are cancelled; their messages
+        were never acked, so the broker redelivers them.
+        """
         if self._consumer_task:
             self._consumer_task.cancel()
+            await asyncio.gather(self._consumer_task, return_exceptions=True)
+            self._consumer_task = None
             self._consuming = False
 
-        if self._connection:
-            await self._connection.close()
-            self._connection = None
-            self._channel = None
-            self._exchange = None
-            self._queue = None
+        # Let running handlers ack before the channel goes away
+        if self._inflight:
+            _, pending = await asyncio.wait(set(self._inflight), timeout=drain_timeout)
+            if pending:
+                logger.warning(
+                    f"Cancelling {len(pending)} unfinished {self.service_name} handlers"
+                )
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if self._connected:
+            await self._transport.close()
+            self._connected = False
@@ -0,0 +1,64 @@
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import ProcessedMessage
+from app.utils.logger_config import setup_logger
+
+logger = setup_logger()
+
+# Message being handled by the current task, set by BaseQueueConsumer.process_message
+current_message: ContextVar[Optional[Dict]] = ContextVar(
+    "current_queue_message", default=None
+)
+
+
+def message_identity(data: Dict, message_id: Optional[str] = None) -> Optional[Dict]:
+    """processed_messages row for a decoded message, None if the producer gave no id"""
+    message_id = data.get("message_id") or message_id
+    if not message_id:
+        return None
+    try:
+        message_id = UUID(str(message_id))
+    except ValueError:
+        return None
+    return {
+        "message_id": message_id,
+        "service": data.get("service") or "",
+        "operation": data.get("operation") or "",
+    }
+
+
+async def claim_message(db: AsyncSession) -> bool:
+    """
+    Record the current message as processed inside the handler's transaction.
+    False means an earlier delivery already committed its effect and the handler
+    should return without doing anything; the message is then acked as usual.
+    If the transaction rolls back, so does the claim.
+    """
+    identity = current_message.get()
+    if not identity:
+        return True
+
+    claimed = await claim_messages(db, [identity])
+    if not claimed:
+        logger.info(
+            f"Skipping duplicate {identity['service']} message {identity['message_id']}"
+        )
+    return bool(claimed)
+
+
+async def claim_messages(db: AsyncSession, identities: List[Dict]) -> set:
+    """Claim many messages with one insert; returns the ids that were not seen before"""
+    if not identities:
+        return set()
+    result = await db.execute(
+        insert(ProcessedMessage)
+        .values(identities)
+        .on_conflict_do_nothing(index_elements=[ProcessedMessage.message_id])
+        .returning(ProcessedMessage.message_id)
+    )
+    return set(result.scalars().all())
@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from uuid import UUID
 
 from sqlalchemy import insert, update, select
@@ -6,6 +6,8 @@ from sqlalchemy import insert, update, select
 from app.database.database import get_db
 from app.models.models import Delivery, Order
 from app.queue.base_consumer import BaseQueueConsumer
+from app.queue.idempotency import claim_message
+from app.queue.transport import QueueTransport
 from app.utils.logger_config import setup_logger
 from app.config.config import redis_client
 
@@ -17,18 +19,24 @@ logger = setup_logger()
 
 
 class OrderStatusQueueConsumer(BaseQueueConsumer):
-    def __init__(self):
-        super().__init__("order_status", "order_status_updates")
+    def __init__(self, transport: Optional[QueueTransport] = None):
+        super().__init__("order_status", "order_status_updates", transport=transport)
         self._operation_handlers = {
             "update_order_status": self.process_order_status_update,
             "order_payment_status": self.process_order_payment_status_update,
         }
 
+    def ordering_key(self, data: Dict[str, Any]):
+        """Status changes for one order apply in delivery order"""
+        return data.get("payload", {}).get("order_id")
+
     async def process_order_status_update(self, payload: Dict[str, Any]):
         """Process order status update"""
         async for db in get_db():
             try:
                 async with db.begin():
+                    if not await claim_message(db):
+                        return
                     order_id = UUID(payload.get("order_id"))
                     order_status = payload.get("order_status")
                     delivery_status = payload.get("delivery_status")
@@ -67,6 +75,8 @@ class OrderStatusQueueConsumer(BaseQueueConsumer):
         async for db in get_db():
             try:
                 async with db.begin():
+                    if not await claim_message(db):
+                        return
                     order_id = UUID(payload.get("order_id"))
                     new_status = payload.get("new_status")
                     order_status = payload.get('order_status')
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List
+
+from logfire.propagate import get_context
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.config import settings
+from app.database.database import async_session
+from app.models.models import OutboxMessage
+from app.queue.producer import producer
+from app.utils.logger_config import setup_logger
+
+logger = setup_logger()
+
+_relay_requested = asyncio.Event()
+
+# Advisory lock key held by the relay publishing the outbox
+OUTBOX_RELAY_LOCK_ID = 7_301_845_112
+
+
+def add_outbox_messages(db: AsyncSession, messages: List[Dict[str, Any]]) -> None:
+    """
+    Stage queue messages on the caller's session; they are written by its commit,
+    together with the change they describe. Items take the publish_message
+    arguments. Call wake_outbox_relay() after the commit to publish right away.
+    """
+    db.add_all(
+        OutboxMessage(
+            service=item["service"],
+            operation=item["operation"],
+            payload=item["payload"],
+            routing_key=item.get("routing_key"),
+            headers=get_context(),
+        )
+        for item in messages
+    )
+
+
+def wake_outbox_relay() -> None:
+    _relay_requested.set()
+
+
+async def relay_outbox_batch() -> int:
+    """
+    Publish up to OUTBOX_RELAY_BATCH_SIZE unsent messages with confirms and mark
+    them sent. One relay across all processes holds the advisory lock for its
+    transaction, so rows reach the broker in insert order; the others return 0.
+    If publishing fails nothing is marked; the outbox message_id lets consumers
+    drop copies that did get through.
+    """
+    async with async_session() as session:
+        async with session.begin():
+            if not await session.scalar(
+                select(func.pg_try_advisory_xact_lock(OUTBOX_RELAY_LOCK_ID))
+            ):
+                return 0
+            result = await session.execute(
+                select(OutboxMessage)
+                .where(OutboxMessage.sent_at.is_(None))
+                .order_by(OutboxMessage.id)
+                .limit(settings.OUTBOX_RELAY_BATCH_SIZE)
+            )
+            rows = result.scalars().all()
+            if not rows:
+                return 0
+
+            await producer.publish_many(
+                [
+                    {
+                        "service": row.service,
+                        "operation": row.operation,
+                        "payload": row.payload,
+                        "routing_key": row.routing_key,
+                        "message_id": str(row.message_id),
+                        "headers": row.headers or {},
+                    }
+                    for row in rows
+                ]
+            )
+            await session.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_([row.id for row in rows]))
+                .values(sent_at=datetime.now())
+            )
+    return len(rows)
+
+
+async def run_outbox_relay() -> None:
+    """Drain the outbox when woken, or every OUTBOX_RELAY_INTERVAL_SECONDS, until cancelled"""
+    while True:
+        try:
+            await asyncio.wait_for(
+                _relay_requested.wait(), timeout=settings.OUTBOX_RELAY_INTERVAL_SECONDS
+            )
+        except asyncio.TimeoutError:
+            pass
+        _relay_requested.clear()
+        try:
+            while await relay_outbox_batch() == settings.OUTBOX_RELAY_BATCH_SIZE:
+                pass
+        except Exception as e:
+            logger.error(f"Outbox relay error: {str(e)}")
+            await asyncio.sleep(settings.OUTBOX_RELAY_INTERVAL_SECONDS)
@@ -1,12 +1,18 @@
 import asyncio
 import json
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any, Callable
-from aio_pika import connect_robust, Message, DeliveryMode, ExchangeType
+from uuid import uuid4
+from typing import Optional, Dict, Any, Callable, List
+from logfire.propagate import get_context
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, insert
 
 from app.models.models import Delivery, Order, Wallet
+from app.queue.queue_metrics import PUBLISHED_AT_HEADER
+from app.queue.sharding import routing_key_for
+from app.queue.topology import declare_topology
+from app.queue.transport import OutgoingMessage, QueueTransport, create_transport
 from app.database.database import get_db
 from app.utils.logger_config import setup_logger
 from app.config.config import settings, redis_client
@@ -22,19 +28,54 @@ logger = setup_logger()
 
 
 class CentralQueueProducer:
-    def __init__(self):
-        self._connection = None
-        self._channel = None
-        self._exchange = None
+    def __init__(self, transport: Optional[QueueTransport] = None):
+        # Created on connect from QUEUE_TRANSPORT unless one is passed in
+        self._transport = transport
+        self._connected = False
+        self._connect_lock = asyncio.Lock()
 
     async def connect(self):
-        """Establish connection to RabbitMQ"""
-        if not self._connection:
-            self._connection = await connect_robust(settings.RABBITMQ_URL)
-            self._channel = await self._connection.channel()
-            self._exchange = await self._channel.declare_exchange(
-                "central_operations", ExchangeType.DIRECT, durable=True
-            )
+        """
+        Connect and declare the queue topology, so messages published before any
+        consumer has started are queued rather than unroutable
+        """
+        async with self._connect_lock:
+            if not self._connected:
+                if self._transport is None:
+                    self._transport = create_transport()
+                await self._transport.connect()
+                await declare_topology(self._transport)
+                self._connected = True
+
+    @staticmethod
+    def _build_message(
+        service: str,
+        operation: str,
+        payload: Dict[str, Any],
+        routing_key: Optional[str] = None,
+        message_id: Optional[str] = None,
+        headers: Optional[Dict[str, Any]] = None,
+    ) -> OutgoingMessage:
+        message_id = str(message_id or uuid4())
+        # Trace context of the publishing request, unless the caller captured it
+        # earlier, plus the publish time for queue lag
+        headers = {
+            **(headers if headers is not None else get_context()),
+            PUBLISHED_AT_HEADER: time.time(),
+        }
+        message_data = {
+            "message_id": message_id,
+            "service": service,
+            "operation": operation,
+            "payload": payload,
+            "timestamp": datetime.now().isoformat(),
+        }
+        return OutgoingMessage(
+            json.dumps(message_data).encode(),
+            routing_key=routing_key or routing_key_for(service, payload),
+            message_id=message_id,
+            headers=headers,
+        )
 
     async def publish_message(
         self,
@@ -42,38 +83,65 @@ class CentralQueueProducer:
         operation: str,
         payload: Dict[str, Any],
         routing_key: Optional[str] = None,
+        message_id: Optional[str] = None,
     ):
-        """Publish a message to the specified service and operation"""
+        """
+        Publish a message to the specified service and operation.
+        message_id lets consumers drop redeliveries; pass a stable id to make
+        re-publishing the same logical message safe, otherwise a new one is assigned.
+        """
+        await self.publish_many(
+            [
+                {
+                    "service": service,
+                    "operation": operation,
+                    "payload": payload,
+                    "routing_key": routing_key,
+                    "message_id": message_id,
+                }
+            ]
+        )
+
+    async def publish_many(self, messages: List[Dict[str, Any]]):
+        """
+        Publish several messages on one channel without waiting for each confirm in
+        turn, then wait for all of them. Each item takes the publish_message
+        arguments. Messages reach the broker in list order. Raises if any message
+        was not confirmed; the others may still have been delivered.
+        """
+        if not messages:
+            return
         try:
             await self.connect()
 
-            message_data = {
-                "service": service,
-                "operation": operation,
-                "payload": payload,
-                "timestamp": datetime.now().isoformat(),
-            }
-
-            message = Message(
-                json.dumps(message_data).encode(),
-                delivery_mode=DeliveryMode.PERSISTENT,
-                content_type="application/json",
+            await self._transport.publish_many(
+                "central_operations",
+                [
+                    self._build_message(
+                        item["service"],
+                        item["operation"],
+                        item["payload"],
+                        item.get("routing_key"),
+                        item.get("message_id"),
+                        item.get("headers"),
+                    )
+                    for item in messages
+                ],
             )
-
-            await self._exchange.publish(message, routing_key=routing_key or service)
-            logger.info(f"Published {service} message for operation {operation}")
+            for item in messages:
+                logger.info(
+                    f"Published {item['service']} message for operation {item['operation']}"
+                )
 
         except Exception as e:
             logger.error(f"Failed to publish message: {str(e)}")
             raise
 
     async def close(self):
-        """Close the RabbitMQ connection"""
-        if self._connection:
-            await self._connection.close()
-            self._connection = None
-            self._channel = None
-            self._exchange = None
+        """Close the broker connection"""
+        if self._connected:
+            await self._transport.close()
+            self._connected = False
 
 
 # Global producer instance
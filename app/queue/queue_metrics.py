@@ -0,0 +1,168 @@
+import asyncio
+import bisect
+import json
+import os
+import socket
+import time
+from typing import Dict, Optional
+
+import logfire
+
+from app.config.config import redis_client, settings
+from app.utils.logger_config import setup_logger
+
+logger = setup_logger()
+
+# Upper bounds in milliseconds, for both time-in-queue and handler duration
+LATENCY_BUCKETS_MS = (
+    1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000,
+)
+
+# Header the producer stamps with the publish time (epoch seconds)
+PUBLISHED_AT_HEADER = "x-published-at"
+
+_lag_histogram = logfire.metric_histogram(
+    "queue.lag", unit="ms", description="Time from publish to handler start"
+)
+_handler_histogram = logfire.metric_histogram(
+    "queue.handler.duration", unit="ms", description="Handler run time per message"
+)
+_message_counter = logfire.metric_counter(
+    "queue.messages", description="Messages by outcome: processed, failed, retried, dead_lettered"
+)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def snapshot(self) -> dict:
+        buckets, cumulative = {}, 0
+        for bound, count in zip(
+            [*map(str, LATENCY_BUCKETS_MS), "+Inf"], self.bucket_counts
+        ):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {
+            "buckets_ms": buckets,
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class OperationMetrics:
+    """Counters and latency histograms for one service operation in this process"""
+
+    def __init__(self):
+        self.lag = LatencyHistogram()
+        self.handler = LatencyHistogram()
+        self.outcomes: Dict[str, int] = {
+            "processed": 0,
+            "failed": 0,
+            "retried": 0,
+            "dead_lettered": 0,
+        }
+
+    def snapshot(self) -> dict:
+        return {
+            **self.outcomes,
+            "lag": self.lag.snapshot(),
+            "handler": self.handler.snapshot(),
+        }
+
+
+# (service, operation) -> metrics
+_operations: Dict[tuple, OperationMetrics] = {}
+
+
+def _metrics_for(service: str, operation: str) -> OperationMetrics:
+    return _operations.setdefault((service, operation or "unknown"), OperationMetrics())
+
+
+def message_lag_ms(headers: Optional[dict]) -> Optional[float]:
+    """Milliseconds since the message was first published, retries included"""
+    published_at = (headers or {}).get(PUBLISHED_AT_HEADER)
+    if published_at is None:
+        return None
+    return max((time.time() - float(published_at)) * 1000, 0.0)
+
+
+def observe_message(
+    service: str,
+    operation: str,
+    lag_ms: Optional[float],
+    handler_ms: float,
+    outcome: str,
+) -> None:
+    """Record one handled message: outcome is processed or failed"""
+    metrics = _metrics_for(service, operation)
+    attributes = {"service": service, "operation": operation or "unknown"}
+    if lag_ms is not None:
+        metrics.lag.observe(lag_ms)
+        _lag_histogram.record(lag_ms, attributes)
+    metrics.handler.observe(handler_ms)
+    _handler_histogram.record(handler_ms, attributes)
+    count_outcome(service, operation, outcome)
+
+
+def count_outcome(service: str, operation: str, outcome: str) -> None:
+    _metrics_for(service, operation).outcomes[outcome] += 1
+    _message_counter.add(
+        1, {"service": service, "operation": operation or "unknown", "outcome": outcome}
+    )
+
+
+def queue_metrics_snapshot() -> dict:
+    services: Dict[str, dict] = {}
+    for (service, operation), metrics in list(_operations.items()):
+        services.setdefault(service, {})[operation] = metrics.snapshot()
+    return services
+
+
+async def run_queue_metrics_publisher(consumers: list) -> None:
+    """
+    Every QUEUE_METRICS_PUBLISH_SECONDS, store this process's operation metrics and
+    its consumers' queue depths in Redis for the metrics endpoint. The key expires
+    if the process goes away.
+    """
+    key = f"queue_metrics:{socket.gethostname()}:{os.getpid()}"
+    while True:
+        try:
+            depths = {}
+            for consumer in consumers:
+                depths.update(await consumer.queue_depths())
+            redis_client.setex(
+                key,
+                settings.QUEUE_METRICS_PUBLISH_SECONDS * 3,
+                json.dumps(
+                    {
+                        "updated_at": time.time(),
+                        "queue_depths": depths,
+                        "operations": queue_metrics_snapshot(),
+                    }
+                ),
+            )
+        except Exception as e:
+            logger.error(f"Publishing queue metrics failed: {str(e)}")
+        await asyncio.sleep(settings.QUEUE_METRICS_PUBLISH_SECONDS)
+
+
+def collect_queue_metrics() -> dict:
+    """Latest snapshot from every live consumer process"""
+    keys = redis_client.keys("queue_metrics:*")
+    snapshots = {}
+    for key in keys:
+        value = redis_client.get(key)
+        if value:
+            snapshots[key.split(":", 1)[1]] = json.loads(value)
+    return snapshots
@@ -0,0 +1,61 @@
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from app.config.config import settings
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash (Lamport & Veach): maps a 64-bit key to a bucket in
+    [0, buckets). Going from n to n + 1 buckets moves only 1/(n + 1) of the keys,
+    all of them into the new bucket.
+    """
+    bucket, jump = -1, 0
+    while jump < buckets:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_for(key: str, shards: int) -> int:
+    # hash() is salted per process; every producer must pick the same shard
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return jump_hash(int.from_bytes(digest, "big"), shards)
+
+
+def wallet_shards() -> List[Optional[int]]:
+    """Wallet queue shards to consume; [None] is the single unsharded queue"""
+    if settings.WALLET_QUEUE_SHARDS > 1:
+        return list(range(settings.WALLET_QUEUE_SHARDS))
+    return [None]
+
+
+def wallet_shard(wallet_id: Any) -> Optional[int]:
+    if settings.WALLET_QUEUE_SHARDS > 1:
+        return shard_for(str(wallet_id or ""), settings.WALLET_QUEUE_SHARDS)
+    return None
+
+
+def wallet_queue_name(shard: Optional[int]) -> str:
+    return "wallet_updates" if shard is None else f"wallet_updates.{shard}"
+
+
+def wallet_routing_key(shard: Optional[int]) -> str:
+    return "wallet" if shard is None else f"wallet.{shard}"
+
+
+def wallet_queue_arguments(shard: Optional[int]) -> Optional[Dict[str, Any]]:
+    # Only one consumer takes deliveries from a shard, so a wallet's messages are
+    # never split across workers; others wait as standbys
+    return {"x-single-active-consumer": True} if shard is not None else None
+
+
+def routing_key_for(service: str, payload: Dict[str, Any]) -> str:
+    """
+    Routing key for a message published without one. Wallet messages go to the
+    shard owning their wallet_id, so one consumer sees every update to a wallet.
+    """
+    if service == "wallet":
+        return wallet_routing_key(wallet_shard(payload.get("wallet_id")))
+    return service
@@ -0,0 +1,91 @@
+"""
+Queue topology shared by publishers and consumers. Both declare it on connect, so
+messages are routable before any consumer has started.
+"""
+from typing import Any, Dict, List, Optional
+
+from app.config.config import settings
+from app.queue.sharding import (
+    wallet_queue_arguments,
+    wallet_queue_name,
+    wallet_routing_key,
+    wallet_shards,
+)
+from app.queue.transport import QueueTransport
+
+
+def retry_queue_name(queue_name: str, delay: int) -> str:
+    return f"{queue_name}_retry_{delay}s"
+
+
+def service_queues() -> List[Dict[str, Any]]:
+    """Queues the consumers read, as declare_service_queue keyword arguments"""
+    queues = [
+        {
+            "service_name": "wallet",
+            "queue_name": wallet_queue_name(shard),
+            "routing_key": wallet_routing_key(shard),
+            "queue_arguments": wallet_queue_arguments(shard),
+        }
+        for shard in wallet_shards()
+    ]
+    queues.append(
+        {"service_name": "order_status", "queue_name": "order_status_updates"}
+    )
+    return queues
+
+
+async def declare_service_queue(
+    transport: QueueTransport,
+    service_name: str,
+    queue_name: str,
+    routing_key: Optional[str] = None,
+    queue_arguments: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Declare a service queue with its failed queue and retry tiers"""
+    routing_key = routing_key or service_name
+    await transport.declare_exchange("central_operations")
+    await transport.declare_queue(
+        queue_name,
+        arguments={
+            "x-message-ttl": 1000 * 60 * 60 * 24,  # 24 hours
+            "x-dead-letter-exchange": f"{service_name}_dlx",
+            "x-dead-letter-routing-key": f"failed_{service_name}_updates",
+            **(queue_arguments or {}),
+        },
+    )
+    await transport.bind(queue_name, "central_operations", routing_key)
+
+    # Messages rejected without requeue land here via the queue's DLX
+    await transport.declare_exchange(f"{service_name}_dlx")
+    await transport.declare_queue(f"failed_{service_name}_updates")
+    await transport.bind(
+        f"failed_{service_name}_updates",
+        f"{service_name}_dlx",
+        f"failed_{service_name}_updates",
+    )
+
+    # One delay queue per backoff tier; expired messages go back to the main
+    # exchange under the queue's routing key
+    await transport.declare_exchange(f"{service_name}_retry")
+    for delay in settings.QUEUE_RETRY_DELAYS_SECONDS:
+        await transport.declare_queue(
+            retry_queue_name(queue_name, delay),
+            arguments={
+                "x-message-ttl": delay * 1000,
+                "x-dead-letter-exchange": "central_operations",
+                "x-dead-letter-routing-key": routing_key,
+            },
+        )
+        await transport.bind(
+            retry_queue_name(queue_name, delay),
+            f"{service_name}_retry",
+            retry_queue_name(queue_name, delay),
+        )
+
+
+async def declare_topology(transport: QueueTransport) -> None:
+    """Declare the main exchange and every service queue"""
+    await transport.declare_exchange("central_operations")
+    for queue in service_queues():
+        await declare_service_queue(transport, **queue)
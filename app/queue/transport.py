@@ -0,0 +1,444 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol
+
+from aio_pika import connect_robust, DeliveryMode, ExchangeType, Message
+from aio_pika.pool import Pool
+
+from app.config.config import settings
+from app.utils.logger_config import setup_logger
+
+logger = setup_logger()
+
+
+class QueueMessage(Protocol):
+    """What consumers see of a delivered message, whichever transport delivered it"""
+
+    body: bytes
+    headers: Dict[str, Any]
+    message_id: Optional[str]
+    content_type: Optional[str]
+    redelivered: bool
+
+    async def ack(self) -> None: ...
+
+    async def reject(self, requeue: bool = False) -> None: ...
+
+
+@dataclass
+class OutgoingMessage:
+    body: bytes
+    routing_key: str
+    message_id: Optional[str] = None
+    headers: Dict[str, Any] = field(default_factory=dict)
+    content_type: str = "application/json"
+
+
+class UnroutableError(Exception):
+    """No queue is bound for the message's routing key"""
+
+
+class QueueTransport(ABC):
+    """
+    The broker operations the producer and consumers rely on. Exchanges are
+    direct and durable, queues durable; publishing waits for the broker to take
+    responsibility for every message and raises for unroutable ones.
+    """
+
+    @abstractmethod
+    async def connect(self) -> None: ...
+
+    @abstractmethod
+    async def declare_exchange(self, name: str) -> None: ...
+
+    @abstractmethod
+    async def declare_queue(
+        self, name: str, arguments: Optional[Dict[str, Any]] = None
+    ) -> None: ...
+
+    @abstractmethod
+    async def bind(self, queue: str, exchange: str, routing_key: str) -> None: ...
+
+    @abstractmethod
+    async def publish_many(
+        self, exchange: str, messages: List[OutgoingMessage]
+    ) -> None: ...
+
+    async def publish(self, exchange: str, message: OutgoingMessage) -> None:
+        await self.publish_many(exchange, [message])
+
+    @abstractmethod
+    def consume(self, queue: str, prefetch_count: int) -> AsyncIterator[QueueMessage]:
+        """Deliveries from queue, at most prefetch_count unsettled at a time"""
+
+    @abstractmethod
+    async def queue_depth(self, queue: str) -> int:
+        """Messages ready for delivery, not counting unacked ones"""
+
+    @abstractmethod
+    async def close(self) -> None: ...
+
+
+class AmqpTransport(QueueTransport):
+    """RabbitMQ through aio_pika, with a pool of confirm-mode channels for publishing"""
+
+    def __init__(self, url: Optional[str] = None):
+        self._url = url or settings.RABBITMQ_URL
+        self._connection = None
+        # Declarations and consuming
+        self._channel = None
+        self._channel_pool = None
+        self._connect_lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        async with self._connect_lock:
+            if not self._connection:
+                self._connection = await connect_robust(self._url)
+                self._channel = await self._connection.channel()
+                self._channel_pool = Pool(
+                    self._open_publish_channel,
+                    max_size=settings.QUEUE_PRODUCER_CHANNEL_POOL_SIZE,
+                )
+
+    async def _open_publish_channel(self):
+        # Every publish waits for the broker's confirm, and a message no queue is
+        # bound for raises instead of being dropped
+        return await self._connection.channel(
+            publisher_confirms=True, on_return_raises=True
+        )
+
+    async def declare_exchange(self, name: str) -> None:
+        await self._channel.declare_exchange(name, ExchangeType.DIRECT, durable=True)
+
+    async def declare_queue(
+        self, name: str, arguments: Optional[Dict[str, Any]] = None
+    ) -> None:
+        await self._channel.declare_queue(name, durable=True, arguments=arguments)
+
+    async def bind(self, queue: str, exchange: str, routing_key: str) -> None:
+        amqp_queue = await self._channel.get_queue(queue, ensure=False)
+        await amqp_queue.bind(exchange, routing_key=routing_key)
+
+    async def publish_many(
+        self, exchange: str, messages: List[OutgoingMessage]
+    ) -> None:
+        # Published back to back on one channel, so they reach the broker in list
+        # order, and the confirms are awaited together
+        async with self._channel_pool.acquire() as channel:
+            if channel.is_closed:
+                await channel.reopen()
+            target = await channel.get_exchange(exchange, ensure=False)
+            results = await asyncio.gather(
+                *(
+                    target.publish(
+                        Message(
+                            message.body,
+                            headers=message.headers,
+                            content_type=message.content_type,
+                            delivery_mode=DeliveryMode.PERSISTENT,
+                            message_id=message.message_id,
+                        ),
+                        routing_key=message.routing_key,
+                        mandatory=True,
+                    )
+                    for message in messages
+                ),
+                return_exceptions=True,
+            )
+
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
+    async def consume(
+        self, queue: str, prefetch_count: int
+    ) -> AsyncIterator[QueueMessage]:
+        await self._channel.set_qos(prefetch_count=prefetch_count)
+        amqp_queue = await self._channel.get_queue(queue, ensure=False)
+        async with amqp_queue.iterator() as queue_iter:
+            async for message in queue_iter:
+                yield message
+
+    async def queue_depth(self, queue: str) -> int:
+        amqp_queue = await self._channel.declare_queue(queue, passive=True)
+        return amqp_queue.declaration_result.message_count
+
+    async def close(self) -> None:
+        if self._connection:
+            await self._channel_pool.close()
+            await self._connection.close()
+            self._connection = None
+            self._channel = None
+            self._channel_pool = None
+
+
+@dataclass
+class _Envelope:
+    body: bytes
+    exchange: str
+    routing_key: str
+    message_id: Optional[str]
+    headers: Dict[str, Any]
+    content_type: str
+    redelivered: bool = False
+    expires_at: Optional[float] = None
+
+
+class _MemoryQueue:
+    def __init__(self, name: str, arguments: Dict[str, Any]):
+        self.name = name
+        self.arguments = arguments
+        self.messages: deque[_Envelope] = deque()
+        self._waiters: List[asyncio.Future] = []
+        self._expiry_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def ttl_seconds(self) -> Optional[float]:
+        ttl = self.arguments.get("x-message-ttl")
+        return ttl / 1000 if ttl is not None else None
+
+    def notify(self) -> None:
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    async def changed(self) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        await waiter
+
+
+class InMemoryBroker:
+    """
+    Process-local stand-in for RabbitMQ with the semantics the consumers depend on:
+    direct exchanges, prefetch, ack/reject with requeue, per-queue message TTL and
+    dead-lettering through x-dead-letter-exchange / x-dead-letter-routing-key.
+    Like a classic queue, messages only expire from the head of a queue.
+    """
+
+    def __init__(self):
+        # exchange -> routing key -> bound queue names
+        self.exchanges: Dict[str, Dict[str, set]] = {}
+        self.queues: Dict[str, _MemoryQueue] = {}
+
+    def declare_exchange(self, name: str) -> None:
+        self.exchanges.setdefault(name, {})
+
+    def declare_queue(self, name: str, arguments: Optional[Dict[str, Any]]) -> None:
+        if name not in self.queues:
+            self.queues[name] = _MemoryQueue(name, dict(arguments or {}))
+
+    def bind(self, queue: str, exchange: str, routing_key: str) -> None:
+        if exchange not in self.exchanges:
+            raise ValueError(f"Exchange {exchange} not declared")
+        if queue not in self.queues:
+            raise ValueError(f"Queue {queue} not declared")
+        self.exchanges[exchange].setdefault(routing_key, set()).add(queue)
+
+    def route(self, envelope: _Envelope) -> int:
+        """Copy the message into every queue bound for its routing key"""
+        if envelope.exchange not in self.exchanges:
+            raise ValueError(f"Exchange {envelope.exchange} not declared")
+        targets = self.exchanges[envelope.exchange].get(envelope.routing_key, ())
+        for name in targets:
+            self._enqueue(
+                self.queues[name],
+                _Envelope(
+                    envelope.body,
+                    envelope.exchange,
+                    envelope.routing_key,
+                    envelope.message_id,
+                    dict(envelope.headers),
+                    envelope.content_type,
+                ),
+            )
+        return len(targets)
+
+    def _enqueue(self, queue: _MemoryQueue, envelope: _Envelope) -> None:
+        if queue.ttl_seconds is not None:
+            envelope.expires_at = asyncio.get_running_loop().time() + queue.ttl_seconds
+        queue.messages.append(envelope)
+        self._schedule_expiry(queue)
+        queue.notify()
+
+    def requeue(self, queue: _MemoryQueue, envelope: _Envelope) -> None:
+        envelope.redelivered = True
+        queue.messages.appendleft(envelope)
+        self._schedule_expiry(queue)
+        queue.notify()
+
+    def dead_letter(self, queue: _MemoryQueue, envelope: _Envelope, reason: str) -> None:
+        exchange = queue.arguments.get("x-dead-letter-exchange")
+        if not exchange or exchange not in self.exchanges:
+            # RabbitMQ drops it too
+            return
+        headers = dict(envelope.headers)
+        headers["x-death"] = [
+            {"queue": queue.name, "reason": reason, "exchange": envelope.exchange},
+            *headers.get("x-death", []),
+        ]
+        self.route(
+            _Envelope(
+                envelope.body,
+                exchange,
+                queue.arguments.get("x-dead-letter-routing-key", envelope.routing_key),
+                envelope.message_id,
+                headers,
+                envelope.content_type,
+            )
+        )
+
+    def _schedule_expiry(self, queue: _MemoryQueue) -> None:
+        if queue._expiry_handle or not queue.messages:
+            return
+        head = queue.messages[0]
+        if head.expires_at is None:
+            return
+        loop = asyncio.get_running_loop()
+        queue._expiry_handle = loop.call_at(head.expires_at, self._expire, queue)
+
+    def _expire(self, queue: _MemoryQueue) -> None:
+        queue._expiry_handle = None
+        now = asyncio.get_running_loop().time()
+        while queue.messages:
+            head = queue.messages[0]
+            if head.expires_at is None or head.expires_at > now:
+                break
+            self.dead_letter(queue, queue.messages.popleft(), "expired")
+        self._schedule_expiry(queue)
+
+
+class InMemoryMessage:
+    def __init__(self, envelope: _Envelope, consumer: "_MemoryConsumer"):
+        self._envelope = envelope
+        self._consumer = consumer
+        self._settled = False
+        self.body = envelope.body
+        self.headers = dict(envelope.headers)
+        self.message_id = envelope.message_id
+        self.content_type = envelope.content_type
+        self.routing_key = envelope.routing_key
+        self.redelivered = envelope.redelivered
+
+    def _settle(self) -> None:
+        if self._settled:
+            raise RuntimeError("Message already acked or rejected")
+        self._settled = True
+        self._consumer.unacked.pop(id(self), None)
+        self._consumer.queue.notify()
+
+    async def ack(self) -> None:
+        self._settle()
+
+    async def reject(self, requeue: bool = False) -> None:
+        self._settle()
+        broker = self._consumer.broker
+        if requeue:
+            broker.requeue(self._consumer.queue, self._envelope)
+        else:
+            broker.dead_letter(self._consumer.queue, self._envelope, "rejected")
+
+
+class _MemoryConsumer:
+    def __init__(self, broker: InMemoryBroker, queue: _MemoryQueue, prefetch_count: int):
+        self.broker = broker
+        self.queue = queue
+        self.prefetch_count = prefetch_count
+        self.unacked: Dict[int, InMemoryMessage] = {}
+
+    async def next(self) -> InMemoryMessage:
+        while len(self.unacked) >= self.prefetch_count or not self.queue.messages:
+            await self.queue.changed()
+        message = InMemoryMessage(self.queue.messages.popleft(), self)
+        self.unacked[id(message)] = message
+        return message
+
+    def requeue_unacked(self) -> None:
+        # Oldest first ends up at the head, as when a channel closes
+        for message in reversed(list(self.unacked.values())):
+            message._settled = True
+            self.broker.requeue(self.queue, message._envelope)
+        self.unacked.clear()
+
+
+class InMemoryTransport(QueueTransport):
+    """
+    A connection to an InMemoryBroker. Closing it requeues whatever its consumers
+    had not settled, the way a closed AMQP connection does.
+    """
+
+    def __init__(self, broker: Optional[InMemoryBroker] = None):
+        self.broker = broker or get_memory_broker()
+        self._consumers: set[_MemoryConsumer] = set()
+
+    async def connect(self) -> None:
+        pass
+
+    async def declare_exchange(self, name: str) -> None:
+        self.broker.declare_exchange(name)
+
+    async def declare_queue(
+        self, name: str, arguments: Optional[Dict[str, Any]] = None
+    ) -> None:
+        self.broker.declare_queue(name, arguments)
+
+    async def bind(self, queue: str, exchange: str, routing_key: str) -> None:
+        self.broker.bind(queue, exchange, routing_key)
+
+    async def publish_many(
+        self, exchange: str, messages: List[OutgoingMessage]
+    ) -> None:
+        for message in messages:
+            routed = self.broker.route(
+                _Envelope(
+                    message.body,
+                    exchange,
+                    message.routing_key,
+                    message.message_id,
+                    dict(message.headers),
+                    message.content_type,
+                )
+            )
+            if not routed:
+                raise UnroutableError(
+                    f"No queue bound to {exchange} for {message.routing_key}"
+                )
+
+    async def consume(
+        self, queue: str, prefetch_count: int
+    ) -> AsyncIterator[QueueMessage]:
+        consumer = _MemoryConsumer(self.broker, self.broker.queues[queue], prefetch_count)
+        # Kept after consuming stops: delivered messages can still be settled
+        # until the transport is closed
+        self._consumers.add(consumer)
+        while True:
+            yield await consumer.next()
+
+    async def queue_depth(self, queue: str) -> int:
+        return len(self.broker.queues[queue].messages)
+
+    async def close(self) -> None:
+        for consumer in self._consumers:
+            consumer.requeue_unacked()
+        self._consumers.clear()
+
+
+_memory_broker: Optional[InMemoryBroker] = None
+
+
+def get_memory_broker() -> InMemoryBroker:
+    """The broker shared by every in-memory transport in this process"""
+    global _memory_broker
+    if _memory_broker is None:
+        _memory_broker = InMemoryBroker()
+    return _memory_broker
+
+
+def create_transport() -> QueueTransport:
+    """Transport selected by QUEUE_TRANSPORT: "amqp" (default) or "memory" """
+    if settings.QUEUE_TRANSPORT == "memory":
+        return InMemoryTransport()
+    return AmqpTransport()
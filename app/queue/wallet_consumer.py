@@ -1,29 +1,261 @@
+import asyncio
+import json
+import time
+from collections import defaultdict
 from decimal import Decimal
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from uuid import UUID
 
-from pydantic import UUID1
-from sqlalchemy import insert, update, select
+import logfire
+from sqlalchemy import delete, insert, update, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+from app.config.config import settings
 from app.database.database import get_db
-from app.models.models import Transaction, Wallet
+from app.models.models import ProcessedMessage, Transaction, Wallet
 from app.queue.base_consumer import BaseQueueConsumer
+from app.queue.idempotency import claim_message, claim_messages, message_identity
+from app.queue.queue_metrics import message_lag_ms, observe_message
+from app.queue.sharding import (
+    wallet_queue_arguments,
+    wallet_queue_name,
+    wallet_routing_key,
+)
+from app.queue.transport import QueueMessage, QueueTransport
 from app.utils.logger_config import setup_logger
 
 logger = setup_logger()
 
 
 class WalletQueueConsumer(BaseQueueConsumer):
-    def __init__(self):
-        super().__init__("wallet", "wallet_updates")
+    def __init__(
+        self, transport: Optional[QueueTransport] = None, shard: Optional[int] = None
+    ):
+        self.shard = shard
+        super().__init__(
+            "wallet",
+            wallet_queue_name(shard),
+            transport=transport,
+            routing_key=wallet_routing_key(shard),
+            queue_arguments=wallet_queue_arguments(shard),
+            # A full batch must be deliverable before any of it is acked
+            prefetch_count=max(
+                settings.QUEUE_PREFETCH_COUNT, settings.WALLET_QUEUE_BATCH_SIZE
+            )
+            if settings.WALLET_QUEUE_BATCH_MODE
+            else None,
+        )
         self._operation_handlers = {
             "update_wallet": self.process_wallet_update,
             "update_transaction": self.process_transaction_update,
             "create_transaction": self.process_create_transaction,
         }
 
+        self._batch: List[QueueMessage] = []
+        self._batch_full = asyncio.Event()
+        self._batch_task = None
+
+    def ordering_key(self, data: Dict[str, Any]):
+        """Balance changes and transaction rows for a wallet apply in delivery order"""
+        return data.get("payload", {}).get("wallet_id")
+
+    def _dispatch(self, message: QueueMessage):
+        if not settings.WALLET_QUEUE_BATCH_MODE:
+            return super()._dispatch(message)
+
+        self._batch.append(message)
+        if len(self._batch) >= settings.WALLET_QUEUE_BATCH_SIZE:
+            self._batch_full.set()
+        if self._batch_task is None or self._batch_task.done():
+            self._batch_task = asyncio.create_task(self._run_batches())
+            self._inflight.add(self._batch_task)
+            self._batch_task.add_done_callback(self._inflight.discard)
+
+    async def _run_batches(self):
+        """Drain the buffer one batch at a time, waiting briefly for a batch to fill"""
+        while self._batch:
+            if len(self._batch) < settings.WALLET_QUEUE_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(
+                        self._batch_full.wait(),
+                        timeout=settings.WALLET_QUEUE_BATCH_WAIT_MS / 1000,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            self._batch_full.clear()
+            messages = self._batch[: settings.WALLET_QUEUE_BATCH_SIZE]
+            del self._batch[: settings.WALLET_QUEUE_BATCH_SIZE]
+            await self.process_batch(messages)
+
+    async def process_batch(self, messages: List[QueueMessage]):
+        """
+        Apply a batch in one database transaction: update_wallet deltas are summed
+        per wallet and written with one locked update each, create_transaction rows
+        go in with a single insert. Every message is acked only after the commit.
+        A message that fails validation is rejected on its own; if the transaction
+        itself fails, the batch falls back to one message at a time.
+        """
+        batched, individual = [], []
+        for message in messages:
+            try:
+                data = json.loads(message.body.decode())
+                operation = data.get("operation")
+            except Exception:
+                operation = None
+            if operation in self._operation_handlers:
+                batched.append(
+                    (
+                        message,
+                        operation,
+                        data.get("payload", {}),
+                        message_identity(data, message.message_id),
+                    )
+                )
+            else:
+                # process_message reports and rejects it
+                individual.append(message)
+
+        failed = []
+        started = time.perf_counter()
+        try:
+            with logfire.span("queue wallet batch", size=len(batched)):
+                failed = await self._apply_batch(batched)
+        except Exception as e:
+            logger.error(
+                f"Wallet batch of {len(batched)} failed, retrying one by one: {str(e)}"
+            )
+            individual = [message for message, *_ in batched] + individual
+            batched = []
+
+        # Each message is charged the whole batch's run time
+        handler_ms = (time.perf_counter() - started) * 1000
+        failed_ids = {id(message) for message in failed}
+        for message, operation, *_ in batched:
+            lag_ms = message_lag_ms(message.headers)
+            if id(message) in failed_ids:
+                observe_message(self.service_name, operation, lag_ms, handler_ms, "failed")
+                await self.reject_message(message, operation)
+            elif await self.ack_message(message):
+                observe_message(
+                    self.service_name, operation, lag_ms, handler_ms, "processed"
+                )
+        if batched:
+            logger.info(
+                f"Processed wallet batch: {len(batched) - len(failed)} applied, {len(failed)} rejected"
+            )
+
+        for message in individual:
+            await self.process_message(message)
+
+    async def _apply_batch(self, batched: list) -> List[QueueMessage]:
+        """Write a parsed batch and return the messages that were not applied"""
+        failed, parsed = [], []
+        for message, operation, payload, identity in batched:
+            try:
+                if operation == "update_wallet":
+                    values = (
+                        UUID(str(payload.get("wallet_id"))),
+                        Decimal(payload.get("balance_change", 0)),
+                        Decimal(payload.get("escrow_change", 0)),
+                    )
+                elif operation == "create_transaction":
+                    values = self._transaction_values(payload)
+                else:
+                    values = payload
+            except Exception as e:
+                logger.error(f"Invalid wallet {operation} payload: {str(e)}")
+                failed.append(message)
+                continue
+            parsed.append((message, operation, values, identity))
+
+        async for db in get_db():
+            async with db.begin():
+                # Redeliveries whose effect already committed are acked untouched
+                claimed = await claim_messages(
+                    db, [identity for *_, identity in parsed if identity]
+                )
+                deltas: Dict[UUID, list] = defaultdict(list)
+                transaction_rows, transaction_updates = [], []
+                for message, operation, values, identity in parsed:
+                    if identity and identity["message_id"] not in claimed:
+                        continue
+                    if operation == "update_wallet":
+                        wallet_id, balance_change, escrow_change = values
+                        deltas[wallet_id].append(
+                            (message, identity, balance_change, escrow_change)
+                        )
+                    elif operation == "create_transaction":
+                        transaction_rows.append(values)
+                    else:
+                        transaction_updates.append(values)
+
+                # Claims of rejected messages are dropped so a redelivery is applied
+                unclaimed = []
+                if deltas:
+                    # Lock in id order so concurrent batches cannot deadlock
+                    result = await db.execute(
+                        select(Wallet)
+                        .where(Wallet.id.in_(deltas))
+                        .order_by(Wallet.id)
+                        .with_for_update()
+                    )
+                    wallets = {wallet.id: wallet for wallet in result.scalars()}
+                    for wallet_id, changes in deltas.items():
+                        wallet = wallets.get(wallet_id)
+                        if not wallet:
+                            logger.error(f"Wallet {wallet_id} not found")
+                            failed.extend(message for message, *_ in changes)
+                            unclaimed.extend(identity for _, identity, *_ in changes)
+                            continue
+                        # Same check as _safe_wallet_update, message by message in
+                        # delivery order, so an overdraft only rejects its own message
+                        balance, escrow = wallet.balance, wallet.escrow_balance
+                        for message, identity, balance_change, escrow_change in changes:
+                            if balance + balance_change < 0 or escrow + escrow_change < 0:
+                                logger.error(
+                                    f"Insufficient funds in wallet {wallet_id} for batched update"
+                                )
+                                failed.append(message)
+                                unclaimed.append(identity)
+                                continue
+                            balance += balance_change
+                            escrow += escrow_change
+                        wallet.balance = balance
+                        wallet.escrow_balance = escrow
+
+                unclaimed = [identity["message_id"] for identity in unclaimed if identity]
+                if unclaimed:
+                    await db.execute(
+                        delete(ProcessedMessage).where(
+                            ProcessedMessage.message_id.in_(unclaimed)
+                        )
+                    )
+
+                if transaction_rows:
+                    await db.execute(insert(Transaction), transaction_rows)
+
+                for payload in transaction_updates:
+                    await self._apply_transaction_update(db, payload)
+
+        return failed
+
+    @staticmethod
+    def _transaction_values(payload: Dict[str, Any]) -> Dict[str, Any]:
+        to_wallet_id = payload.get("to_wallet_id", None)
+        return {
+            "wallet_id": UUID(payload.get("wallet_id")),
+            "to_wallet_id": UUID(to_wallet_id) if to_wallet_id is not None else None,
+            "tx_ref": UUID(payload.get("tx_ref")),
+            "amount": Decimal(payload.get("amount")),
+            "transaction_type": payload.get("transaction_type"),
+            "transaction_direction": payload.get("transaction_direction"),
+            "payment_status": payload.get("payment_status"),
+            "from_user": payload.get("from_user"),
+            "payment_method": payload.get("payment_method"),
+            "to_user": payload.get("to_user"),
+        }
+
     async def _safe_wallet_update(
         self,
         db: AsyncSession,
@@ -66,6 +298,8 @@ class WalletQueueConsumer(BaseQueueConsumer):
         async for db in get_db():
             try:
                 async with db.begin():
+                    if not await claim_message(db):
+                        return
                     wallet_id = payload.get("wallet_id")
                     balance_change = payload.get("balance_change", 0)
                     escrow_change = payload.get("escrow_change", 0)
@@ -81,132 +315,69 @@ class WalletQueueConsumer(BaseQueueConsumer):
                 raise
 
 
-    # async def process_wallet_update(self, payload: Dict[str, Any]):
-    #     """Process wallet balance update with idempotency protection"""
-    #     async for db in get_db():
-    #         try:
-    #             async with db.begin():
-    #                 wallet_id = payload.get("wallet_id")
-    #                 balance_change = payload.get("balance_change", 0)
-    #                 escrow_change = payload.get("escrow_change", 0)
-    #                 idempotency_key = payload.get("idempotency_key")
-                    
-    #                 # IDEMPOTENCY CHECK: Prevent duplicate wallet updates
-    #                 if idempotency_key:
-    #                     processed_key = f"wallet_update:{idempotency_key}"
-                        
-    #                     # Check if this operation was already processed
-    #                     if redis_client.get(processed_key):
-    #                         logger.info(f"Wallet update already processed: {idempotency_key}")
-    #                         return {
-    #                             "status": "already_processed",
-    #                             "message": f"Wallet update for {idempotency_key} already completed"
-    #                         }
-                        
-    #                     # Mark as processing (with short TTL to handle failures)
-    #                     redis_client.setex(f"{processed_key}:processing", 60, "processing")
-                    
-    #                 # Perform the wallet update
-    #                 result = await self._safe_wallet_update(
-    #                     db=db,
-    #                     wallet_id=wallet_id,
-    #                     balance_change=Decimal(balance_change),
-    #                     escrow_change=Decimal(escrow_change),
-    #                 )
-                    
-    #                 # Mark operation as completed after successful update
-    #                 if idempotency_key:
-    #                     redis_client.setex(processed_key, 3600, "completed")  # 1 hour TTL
-    #                     redis_client.delete(f"{processed_key}:processing")  # Clean up processing flag
-                    
-    #                 logger.info(f"Wallet update completed for wallet {wallet_id}: balance_change={balance_change}, escrow_change={escrow_change}")
-    #                 return {
-    #                     "status": "completed",
-    #                     "wallet_id": wallet_id,
-    #                     "balance_change": str(balance_change),
-    #                     "escrow_change": str(escrow_change)
-    #                 }
-                    
-    #         except Exception as db_error:
-    #             # Clean up processing flag on error
-    #             if idempotency_key:
-    #                 redis_client.delete(f"wallet_update:{idempotency_key}:processing")
-                
-    #             logger.error(f"Wallet update error: {str(db_error)}")
-    #             raise
-
     async def process_create_transaction(self, payload: Dict[str, Any]):
         """Process transaction creation"""
         async for db in get_db():
             try:
                 async with db.begin():
-                    wallet_id = payload.get("wallet_id")
-                    tx_ref = payload.get("tx_ref")
-                    to_wallet_id = payload.get("to_wallet_id", None)
-                    amount = payload.get("amount")
-                    transaction_type = payload.get("transaction_type")
-                    transaction_direction = payload.get("transaction_direction")
-                    payment_status = payload.get("payment_status")
-                    payment_method = payload.get("payment_method")
-                    from_user = payload.get("from_user")
-                    to_user = payload.get("to_user")
-
+                    if not await claim_message(db):
+                        return
                     await db.execute(
-                        insert(Transaction).values(
-                            wallet_id=UUID(wallet_id),
-                            to_wallet_id=UUID(to_wallet_id)
-                            if to_wallet_id is not None
-                            else None,
-                            tx_ref=UUID1(tx_ref),
-                            amount=Decimal(amount),
-                            transaction_type=transaction_type,
-                            transaction_direction=transaction_direction,
-                            payment_status=payment_status,
-                            from_user=from_user,
-                            payment_method=payment_method,
-                            to_user=to_user,
-                        )
+                        insert(Transaction).values(**self._transaction_values(payload))
                     )
 
             except Exception as db_error:
                 logger.error(f"Transaction creation error: {str(db_error)}")
                 raise
 
+    @staticmethod
+    async def _apply_transaction_update(db: AsyncSession, payload: Dict[str, Any]):
+        """
+        Raises when the transaction row does not exist yet. Its create_transaction
+        may still be waiting in a retry queue, so the update is retried rather than
+        acked with nothing changed.
+        """
+        wallet_id = UUID(payload.get("wallet_id"))
+        tx_ref = UUID(payload.get("tx_ref"))
+        to_user = payload.get("to_user")
+        payment_status = payload.get("payment_status")
+        payment_method = payload.get("payment_method")
+        transaction_direction = payload.get("transaction_direction")
+        is_fund_wallet = payload.get("is_fund_wallet")
+
+        if is_fund_wallet:
+            await db.execute(
+                update(Transaction)
+                .where(
+                    Transaction.wallet_id == wallet_id,
+                    Transaction.tx_ref == tx_ref,
+                )
+                .values(
+                    to_user="Self",
+                    payment_method=payment_method,
+                    payment_status=payment_status,
+                    transaction_direction=transaction_direction,
+                )
+            )
+        result = await db.execute(
+            update(Transaction)
+            .where(
+                Transaction.wallet_id == wallet_id,
+                Transaction.tx_ref == tx_ref,
+            )
+            .values(to_user=to_user)
+        )
+        if not result.rowcount:
+            raise ValueError(f"Transaction {tx_ref} not found in wallet {wallet_id}")
+
     async def process_transaction_update(self, payload: Dict[str, Any]):
         """Process transaction update"""
         async for db in get_db():
             try:
                 async with db.begin():
-                    wallet_id = UUID(payload.get("wallet_id"))
-                    tx_ref = UUID1(payload.get("tx_ref"))
-                    to_user = payload.get("to_user")
-                    payment_status = payload.get("payment_status")
-                    payment_method = payload.get("payment_method")
-                    transaction_direction = payload.get("transaction_direction")
-                    is_fund_wallet = payload.get("is_fund_wallet")
-
-                    if is_fund_wallet:
-                        await db.execute(
-                            update(Transaction)
-                            .where(
-                                Transaction.wallet_id == wallet_id,
-                                Transaction.tx_ref == tx_ref,
-                            )
-                            .values(
-                                to_user="Self",
-                                payment_method=payment_method,
-                                payment_status=payment_status,
-                                transaction_direction=transaction_direction,
-                            )
-                        )
-                    await db.execute(
-                        update(Transaction)
-                        .where(
-                            Transaction.wallet_id == wallet_id,
-                            Transaction.tx_ref == tx_ref,
-                        )
-                        .values(to_user=to_user)
-                    )
+                    if not await claim_message(db):
+                        return
+                    await self._apply_transaction_update(db, payload)
             except Exception as db_error:
                 logger.error(f"Transaction update error: {str(db_error)}")
                 raise
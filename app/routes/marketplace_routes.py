@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.database.database import get_db
+from app.database.database import get_db, get_read_db
 from app.auth.auth import get_current_user
 from app.models.models import Order, User
 from app.schemas.delivery_schemas import DeliveryResponse
@@ -25,7 +25,7 @@ router = APIRouter(prefix="/api/marketplace", tags=["Marketplace"])
     summary="Get marketplace items",
 )
 async def get_marketplace_items(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await marketplace_service.get_marketplace_items(db=db)
 
@@ -64,7 +64,7 @@ async def get_user_product_orders(
 async def get_marketplace_item(
     item_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     return await marketplace_service.get_marketplace_item(db=db, item_id=item_id)
 
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+
+from app.auth.auth import get_current_admin_user
+from app.database.database import engine, read_engine
+from app.database.pool_metrics import pool_snapshot
+from app.models.models import User
+from app.queue.queue_metrics import collect_queue_metrics
+
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"])
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics(
+    current_user: User = Depends(get_current_admin_user),
+) -> dict:
+    """Connection pool gauges, checkout wait histogram and long-held connections"""
+    return {
+        "primary": pool_snapshot(engine),
+        "read": pool_snapshot(read_engine),
+    }
+
+
+@router.get("/queues")
+async def get_queue_metrics(
+    current_user: User = Depends(get_current_admin_user),
+) -> dict:
+    """Queue depths, lag and handler latency histograms and outcome counts per consumer process"""
+    return {"workers": collect_queue_metrics()}
@@ -3,13 +3,19 @@ from fastapi import Body, Form, File, Request, UploadFile, HTTPException
 from uuid import UUID
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, Query, status, HTTPException, UploadFile, File, Form
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.auth import get_db, get_current_user
+from app.database.database import get_read_db
 from app.models.models import Order, User
-from app.schemas.delivery_schemas import DeliveryResponse, PaginatedDeliveryResponse, CancelOrderSchema
+from app.schemas.delivery_schemas import (
+    CancelOrderSchema,
+    CursorPaginatedDeliveryResponse,
+    DeliveryResponse,
+    PaginatedDeliveryResponse,
+)
 
 from app.schemas.order_schema import (
     OrderAndDeliverySchema,
@@ -67,9 +73,13 @@ async def get_paid_pending_deliveries(
 @router.get("/{user_id}/user-related-orders", status_code=status.HTTP_200_OK)
 async def get_user_related_deliveries(
     user_id: UUID,
-    db: AsyncSession = Depends(get_db),
-) -> list[DeliveryResponse]:
-    return await order_service.get_user_related_orders(db=db, user_id=user_id)
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+) -> CursorPaginatedDeliveryResponse:
+    return await order_service.get_user_related_orders(
+        db=db, user_id=user_id, cursor=cursor, limit=limit
+    )
 
 
 @router.post(
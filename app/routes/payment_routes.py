@@ -3,6 +3,7 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from fastapi.responses import HTMLResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.auth import get_current_user
@@ -246,7 +247,9 @@ async def generate_new_payment_link(
     """
     Generate a new payment link for a transaction.
     """
-    transaction = await db.get(Transaction, id)
+    transaction = await db.scalar(
+        select(Transaction).where(Transaction.id == transaction_id)
+    )
     order = await db.get(Order, id)
     tx_ref = uuid.uuid1()
 
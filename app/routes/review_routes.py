@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.auth import get_db, get_current_user, get_current_admin_user
+from app.database.database import get_read_db
 from app.models.models import User
 from app.schemas.review_schema import (
     ReviewCount,
@@ -57,7 +58,7 @@ async def create_item_review(
 )
 async def get_user_reviews(
     vendor_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[ReviewResponse]:
     """
     Endpoint to get current user reviews
@@ -71,7 +72,7 @@ async def get_user_reviews(
 )
 async def fetch_item_reviews(
     item_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[ReviewResponse]:
     """
     Endpoint to get item  reviews
@@ -85,7 +86,7 @@ async def fetch_item_reviews(
 )
 async def get_item_review_count(
     item_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> ReviewCount:
     """
     Endpoint to get item  reviews count
@@ -95,7 +96,7 @@ async def get_item_review_count(
 
 @router.get("/admin/reviews", status_code=status.HTTP_200_OK)
 async def get_reviews_for_admin(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     review_filter: ReviewFilter | None = None,
     page: int = 1,
     page_size: int = 20,
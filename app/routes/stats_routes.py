@@ -4,7 +4,7 @@ from typing import Optional
 from datetime import date
 
 from app.auth.auth import get_current_user
-from app.database.database import get_db
+from app.database.database import get_read_db
 from app.models.models import User
 from app.schemas.stats_schema import (
     StatsPeriod,
@@ -56,7 +56,7 @@ async def get_order_stats(
     custom_end: Optional[date] = Query(
         None, description="Custom end date (required for custom period)"
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -107,7 +107,7 @@ async def get_revenue_stats(
     custom_end: Optional[date] = Query(
         None, description="Custom end date (required for custom period)"
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -135,7 +135,7 @@ async def get_user_stats(
     custom_end: Optional[date] = Query(
         None, description="Custom end date (required for custom period)"
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -156,7 +156,7 @@ async def get_user_stats(
     description="Get high-level platform statistics and key performance indicators.",
 )
 async def get_platform_stats_overview(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     """
     Get overall platform statistics overview.
@@ -192,7 +192,7 @@ async def get_platform_stats_overview(
     description="Get all platform statistics in one comprehensive response.",
 )
 async def get_comprehensive_statistics(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     """
     Get comprehensive platform statistics.
@@ -223,7 +223,7 @@ async def get_dashboard_stats(
     period: StatsPeriod = Query(
         StatsPeriod.LAST_7_DAYS, description="Period for time-based stats"
     ),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -336,7 +336,7 @@ async def get_available_periods():
     description="Get essential statistics for quick overview.",
 )
 async def get_quick_stats(
-    db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db), current_user: User = Depends(get_current_user)
 ):
     """
     Get quick essential statistics.
@@ -14,7 +14,7 @@ from fastapi import (
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.auth import get_current_user
-from app.database.database import get_db
+from app.database.database import get_db, get_read_db
 from app.models.models import User
 
 from app.schemas.schemas import DispatchRiderSchema
@@ -161,7 +161,7 @@ async def get_rider_details(
 @router.get("/restaurants", status_code=status.HTTP_200_OK)
 async def get_restaurants(
     category_id: UUID | None = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> list[VendorUserResponse]:
     """
@@ -181,7 +181,7 @@ async def get_restaurants(
     status_code=status.HTTP_200_OK,
 )
 async def get_laundry_vendors(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> list[VendorUserResponse]:
     """
@@ -243,7 +243,7 @@ async def get_restaurant_reviews_endpoint(
 async def get_restaurant_menu(
     restaurant_id: UUID,
     food_group: FoodGroup,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[MenuResponseSchema]:
     """
     Get restaurant menu with individual item reviews.
@@ -257,7 +257,7 @@ async def get_restaurant_menu(
 @router.get("/laundry/{laundry_id}/menu", status_code=status.HTTP_200_OK)
 async def get_laundry_menu(
     laundry_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> list[MenuResponseSchema]:
     """
     Get restaurant menu with individual item reviews.
@@ -67,5 +67,10 @@ class PaginatedDeliveryResponse(BaseModel):
     total: int
     data: list[DeliveryResponse]
 
+
+class CursorPaginatedDeliveryResponse(BaseModel):
+    data: list[DeliveryResponse]
+    next_cursor: str | None = None
+
 class CancelOrderSchema(BaseModel):
     reason: str
\ No newline at end of file
@@ -27,7 +27,7 @@ from app.schemas.user_schemas import (
     UpdateStaffSchema,
     CreateUserResponseSchema
 )
-from app.models.models import AuditLog, Profile, Session, User, RefreshToken, Wallet
+from app.models.models import Profile, Session, User, RefreshToken, Wallet
 from app.services import ws_service
 from app.schemas.user_schemas import UpdateStaffSchema
 from app.config.config import settings, email_conf
@@ -40,6 +40,8 @@ from app.utils.utils import (
     validate_password,
 )
 from app.config.config import redis_client
+from app.auth.user_cache import invalidate_auth_user
+from app.utils.audit_log_writer import record_audit_log
 from app.templating import templates
 from app.utils.utils import generate_otp, validate_otp
 
@@ -424,9 +426,11 @@ async def create_new_staff(
         db.add(staff_profile)
         db.flush()
 
-        # --- AUDIT LOG ---
+        await db.commit()
+        await db.refresh(new_staff)
 
-        audit = AuditLog(
+        # --- AUDIT LOG ---
+        record_audit_log(
             actor_id=current_user.id,
             actor_name=current_user.profile.full_name or current_user.email,
             actor_role=current_user.user_type,
@@ -438,11 +442,6 @@ async def create_new_staff(
             extra_metadata=None,
         )
 
-        db.add(audit)
-
-        await db.commit()
-        await db.refresh(new_staff)
-
         staff_dict = {
             "user_type": new_staff.user_type,
             "email": new_staff.email,
@@ -583,7 +582,7 @@ async def update_staff(
                 if isinstance(value, (datetime, time)):
                     values[i] = value.isoformat()
 
-        audit = AuditLog(
+        record_audit_log(
             actor_id=current_user.id,
             actor_name=current_user.profile.full_name or current_user.email,
             actor_role=current_user.user_type,
@@ -592,10 +591,8 @@ async def update_staff(
             resource_id=profile.user_id,
             resource_summary=f"updated user with email: {staff.email}",
             changes=changed_fields,
-            metadata=None,
+            extra_metadata=None,
         )
-        db.add(audit)
-        db.commit()
     return staff
 
 
@@ -719,25 +716,36 @@ async def change_password(
     # validate password
     validate_password(password_data.new_password)
 
+    # The auth user cache does not carry the password hash
+    old_password_hash = await db.scalar(
+        select(User.password).where(User.id == current_user.id)
+    )
+
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.password):
+    if not verify_password(password_data.current_password, old_password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
 
     # Update password
-    old_password_hash = current_user.password
-    current_user.password = hash_password(password_data.new_password)
-    current_user.updated_at = datetime.now()
+    await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(
+            password=hash_password(password_data.new_password),
+            updated_at=datetime.now(),
+        )
+    )
 
     try:
         await db.commit()
+        invalidate_auth_user(current_user.id)
         # Logout from all devices
         await logout_user(db, current_user.id)
         # --- AUDIT LOG ---
 
-        audit = AuditLog(
+        record_audit_log(
             actor_id=current_user.id,
             actor_name=current_user.profile.full_name or current_user.email,
             actor_role=current_user.user_type,
@@ -746,11 +754,8 @@ async def change_password(
             resource_id=current_user.id,
             resource_summary=current_user.email,
             changes={"password": [old_password_hash, "***"]},
-            metadata=None,
+            extra_metadata=None,
         )
-
-        db.add(audit)
-        await db.commit()
         return {"message": "Password changed successfully"}
     except Exception as e:
         await db.rollback()
@@ -784,6 +789,7 @@ async def logout_user(db: AsyncSession, current_user: User) -> dict:
         
         # Clear user cache (fix typo: current_useer -> current_user)
         redis_client.delete(f"current_user_profile:{current_user.id}")
+        invalidate_auth_user(current_user.id)
         
         # Get count of revoked tokens
         revoked_count = result.rowcount
@@ -894,7 +900,7 @@ async def reset_password(
 
         await db.commit()
 
-        audit = AuditLog(
+        record_audit_log(
             actor_id=user.id,
             actor_name=user.email,
             actor_role=user.user_type,
@@ -903,12 +909,9 @@ async def reset_password(
             resource_id=user.id,
             resource_summary=user.email,
             changes={"password": [old_password_hash, "***"]},
-            metadata=None,
+            extra_metadata=None,
         )
 
-        db.add(audit)
-        await db.commit()
-
         # Log out from all devices for security
         await logout_user(db, user)
 
@@ -1254,6 +1257,7 @@ async def verify_user_contact(
     user.profile.phone_verification_expires = None
 
     await db.commit()
+    invalidate_auth_user(user.id)
     await send_welcome_email(user)
 
     return {"message": "Email and phone verified successfully"}
@@ -1318,7 +1322,7 @@ async def update_staff_password(
     staff.updated_at = datetime.now()
     await db.commit()
     # --- AUDIT LOG ---
-    audit = AuditLog(
+    record_audit_log(
         actor_id=current_user.id,
         actor_name=current_user.profile.full_name or current_user.email,
         actor_role=current_user.user_type,
@@ -1327,11 +1331,8 @@ async def update_staff_password(
         resource_id=current_user.id,
         resource_summary=current_user.email,
         changes={"password": [old_password_hash, "***"]},
-        metadata=None,
+        extra_metadata=None,
     )
-
-    db.add(audit)
-    await db.commit()
     return {"message": "Staff password updated successfully."}
 
 
@@ -1533,6 +1534,7 @@ async def verify_user_contact1(
     user.account_status = AccountStatus.CONFIRMED
     
     await db.commit()
+    invalidate_auth_user(user.id)
     
     # Clean up Redis
     redis_client.delete(f"otp_verification:{user_id}")
@@ -48,6 +48,7 @@ from app.utils.utils import (
     send_push_notification,
 )
 from app.config.config import redis_client
+from app.database.database import read_cache_ttl
 
 
 async def get_marketplace_items(db: AsyncSession) -> list[ItemResponse]:
@@ -91,7 +92,7 @@ async def get_marketplace_items(db: AsyncSession) -> list[ItemResponse]:
     if item_list_dict:
         redis_client.setex(
             "marketplace_items",
-            CACHE_TTL,
+            read_cache_ttl(db, CACHE_TTL),
             json.dumps(item_list_dict, default=str),
         )
 
@@ -137,7 +138,7 @@ async def get_marketplace_item(item_id: UUID, db: AsyncSession) -> ItemResponse:
     if item_dict:
         redis_client.setex(
             f"marketplace_items:{item_id}",
-            CACHE_TTL,
+            read_cache_ttl(db, CACHE_TTL),
             json.dumps(item_dict, default=str),
         )
 
@@ -1,13 +1,26 @@
 from datetime import timedelta, datetime
 from typing import Optional
 import uuid
-from sqlalchemy import func, or_, and_, select, update, insert
+from sqlalchemy import (
+    JSON,
+    String,
+    Table,
+    and_,
+    cast,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
 
 from fastapi import UploadFile
 
 from sqlalchemy.orm import joinedload, selectinload
 from app.models.models import (
-    AuditLog,
     ChargeAndCommission,
     Delivery,
     Item,
@@ -19,11 +32,17 @@ from app.models.models import (
     ItemImage,
     Profile,
 )
+from app.models.archive_model import (
+    archived_deliveries,
+    archived_order_items,
+    archived_orders,
+)
 from app.services import ws_service
 from app.queue.producer import producer
 from app.utils.map import get_distance_between_addresses
 
 
+import base64
 import json
 from decimal import Decimal
 from uuid import UUID, uuid1
@@ -47,6 +66,7 @@ from app.schemas.order_schema import (
     OrderAndDeliverySchema,
 )
 from app.schemas.delivery_schemas import (
+    CursorPaginatedDeliveryResponse,
     DeliveryResponse,
     DeliveryType,
     PaginatedDeliveryResponse,
@@ -65,11 +85,24 @@ from app.utils.utils import (
     get_user_notification_token,
 )
 from app.config.config import redis_client, settings
+from app.database.database import read_cache_ttl
+from app.auth.user_cache import invalidate_auth_user
 from app.utils.s3_service import add_image
+from app.utils.audit_log_writer import record_audit_log
 
 
 ALL_DELIVERY = "orders"
 
+# Shared eager-load graph for order feeds. Using one options tuple keeps the
+# statements structurally identical, so they reuse compiled and prepared statements.
+ORDER_FEED_LOAD_OPTIONS = (
+    selectinload(Order.order_items).options(
+        joinedload(OrderItem.item).options(selectinload(Item.images))
+    ),
+    joinedload(Order.delivery),
+    joinedload(Order.vendor).joinedload(User.profile),
+)
+
 
 async def get_delivery_by_order_id(
     order_id: UUID,
@@ -94,6 +127,9 @@ async def get_delivery_by_order_id(
         order = order_result.scalar_one_or_none()
 
         if not order:
+            archived_response = await get_archived_delivery(db, order_id)
+            if archived_response:
+                return archived_response
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Order not found"
             )
@@ -111,6 +147,19 @@ async def get_delivery_by_order_id(
         )
 
 
+async def get_archived_delivery(
+    db: AsyncSession, order_id: UUID
+) -> Optional[DeliveryResponse]:
+    """Look up an order moved to the archive tables by archive_completed_orders"""
+    result = await db.execute(
+        order_feed_projection(
+            archived_orders, archived_order_items, archived_deliveries
+        ).where(archived_orders.c.id == order_id)
+    )
+    row = result.first()
+    return delivery_response_from_row(row) if row else None
+
+
 async def get_user_orders(db: AsyncSession, user_id: UUID) -> list[DeliveryResponse]:
     """
     Get all orders with their deliveries (if any) with caching
@@ -124,28 +173,15 @@ async def get_user_orders(db: AsyncSession, user_id: UUID) -> list[DeliveryRespo
         return [DeliveryResponse(**d) for d in json.loads(cached_deliveries)]
 
     stmt = (
-        select(Order)
+        order_feed_projection()
         .where(or_(Order.owner_id == user_id, Order.vendor_id == user_id))
         .where(
             Order.order_type.in_([OrderType.FOOD, OrderType.LAUNDRY, OrderType.PACKAGE])
         )
         .order_by(Order.updated_at.desc())
-        .options(
-            selectinload(Order.order_items).options(
-                joinedload(OrderItem.item).options(selectinload(Item.images))
-            ),
-            joinedload(Order.delivery),
-            joinedload(Order.vendor).joinedload(User.profile),
-        )
     )
 
-    result = await db.execute(stmt)
-    orders = result.unique().scalars().all()
-
-    # Format responses - delivery will be None for orders without delivery
-    delivery_responses = [
-        format_delivery_response(order=order, delivery=order.delivery) for order in orders
-    ]
+    delivery_responses = await load_order_feed(db, stmt)
 
     # Cache the formatted responses with error handling
 
@@ -173,16 +209,9 @@ async def get_all_orders(
         return [DeliveryResponse(**d) for d in json.loads(cached_deliveries)]
 
     stmt = (
-        select(Order)
+        order_feed_projection()
         .offset(skip)
         .limit(limit)
-        .options(
-            selectinload(Order.order_items).options(
-                joinedload(OrderItem.item).options(selectinload(Item.images))
-            ),
-            joinedload(Order.delivery),
-            joinedload(Order.vendor).joinedload(User.profile),
-        )
         .where(Order.require_delivery == RequireDeliverySchema.PICKUP)
         .where(
             Order.order_type.in_([OrderType.FOOD, OrderType.LAUNDRY, OrderType.PACKAGE])
@@ -190,13 +219,7 @@ async def get_all_orders(
         .order_by(Order.created_at.desc())
     )
 
-    result = await db.execute(stmt)
-    orders = result.unique().scalars().all()
-
-    # Format responses - delivery will be None for orders without delivery
-    delivery_responses = [
-        format_delivery_response(order=order, delivery=order.delivery) for order in orders
-    ]
+    delivery_responses = await load_order_feed(db, stmt)
 
     # Cache the formatted responses with error handling
 
@@ -234,16 +257,9 @@ async def get_all_require_delivery_orders(
 
     # 2. Get paginated data
     stmt = (
-        select(Order)
+        order_feed_projection()
         .offset(skip)
         .limit(limit)
-        .options(
-            selectinload(Order.order_items).options(
-                joinedload(OrderItem.item).options(selectinload(Item.images))
-            ),
-            joinedload(Order.delivery),
-            joinedload(Order.vendor).joinedload(User.profile),
-        )
         .where(Order.require_delivery == RequireDeliverySchema.DELIVERY)
         .where(
             Order.order_type.in_([OrderType.FOOD, OrderType.LAUNDRY, OrderType.PACKAGE])
@@ -251,12 +267,7 @@ async def get_all_require_delivery_orders(
         .order_by(Order.created_at.desc())
     )
 
-    result = await db.execute(stmt)
-    orders = result.unique().scalars().all()
-
-    delivery_responses = [
-        format_delivery_response(order=order, delivery=order.delivery) for order in orders
-    ]
+    delivery_responses = await load_order_feed(db, stmt)
 
     response = {"data": [d.model_dump() for d in delivery_responses], "total": total}
 
@@ -298,16 +309,9 @@ async def get_all_pickup_delivery_orders(
 
     # 2. Get paginated data
     stmt = (
-        select(Order)
+        order_feed_projection()
         .offset(skip)
         .limit(limit)
-        .options(
-            selectinload(Order.order_items).options(
-                joinedload(OrderItem.item).options(selectinload(Item.images))
-            ),
-            joinedload(Order.delivery),
-            joinedload(Order.vendor).joinedload(User.profile),
-        )
         .where(Order.require_delivery == RequireDeliverySchema.PICKUP)
         .where(
             Order.order_type.in_([OrderType.FOOD, OrderType.LAUNDRY, OrderType.PACKAGE])
@@ -315,12 +319,7 @@ async def get_all_pickup_delivery_orders(
         .order_by(Order.created_at.desc())
     )
 
-    result = await db.execute(stmt)
-    orders = result.unique().scalars().all()
-
-    delivery_responses = [
-        format_delivery_response(order=order, delivery=order.delivery) for order in orders
-    ]
+    delivery_responses = await load_order_feed(db, stmt)
 
     response = {"data": [d.model_dump() for d in delivery_responses], "total": total}
 
@@ -1297,10 +1296,15 @@ async def cancel_order_or_delivery(
             order.cancel_reason = reason.reason
 
             # Increment rider's cancellation count if a rider is cancelling
+            # Incremented in SQL: current_user is a cached snapshot and may be stale
             if current_user.user_type == UserType.RIDER:
-                current_user.order_cancel_count = (
-                    current_user.order_cancel_count or 0
-                ) + 1
+                await db.execute(
+                    update(User)
+                    .where(User.id == current_user.id)
+                    .values(
+                        order_cancel_count=func.coalesce(User.order_cancel_count, 0) + 1
+                    )
+                )
 
             # Reverse escrow for the original dispatch company if order was paid
             if old_dispatch_id and order.order_payment_status == PaymentStatus.PAID:
@@ -1342,6 +1346,8 @@ async def cancel_order_or_delivery(
                 f"user_related_orders:{current_user.id}",
             ]
             redis_client.delete(*cache_keys_to_delete)
+            if current_user.user_type == UserType.RIDER:
+                invalidate_auth_user(current_user.id)
 
             # Notify customer
             try:
@@ -2616,7 +2622,7 @@ async def admin_modify_delivery_status(
         await db.refresh(delivery)
 
         # --- AUDIT LOG ---
-        audit = AuditLog(
+        record_audit_log(
             actor_id=current_user.get("id"),
             actor_name=current_user.get("email", "unknown"),
             actor_role=str(current_user.get("user_type", "unknown")),
@@ -2627,8 +2633,6 @@ async def admin_modify_delivery_status(
             changes={"delivery_status": [str(old_status), str(new_status)]},
             extra_metadata=None,
         )
-        db.add(audit)
-        await db.commit()
 
         invalidate_delivery_cache(delivery_id)
         redis_client.delete("all_deliveries")
@@ -2778,7 +2782,7 @@ async def admin_modify_order_status(
         await db.refresh(order)
 
         # --- AUDIT LOG ---
-        audit = AuditLog(
+        record_audit_log(
             actor_id=current_user.get("id"),
             actor_name=current_user.get("email", "unknown"),
             actor_role=str(current_user.get("user_type", "unknown")),
@@ -2789,8 +2793,6 @@ async def admin_modify_order_status(
             changes={"order_status": [str(old_status), str(new_status)]},
             extra_metadata=None,
         )
-        db.add(audit)
-        await db.commit()
 
         invalidate_delivery_cache(order_id)
         redis_client.delete("all_deliveries")
@@ -3069,6 +3071,9 @@ def format_delivery_response(
         "payment_link": order.payment_link or "",
         "order_items": order_items,
         "created_at": order.created_at.isoformat(),
+        "is_one_way_delivery": (
+            order.is_one_way_delivery if order.is_one_way_delivery is not None else True
+        ),
         "cancel_reason": getattr(order, "cancel_reason", None),
     }
 
@@ -3077,6 +3082,157 @@ def format_delivery_response(
     return DeliveryResponse(order=order_data, delivery=delivery_data,  distance=distance)
 
 
+DELIVERY_FEED_COLUMNS = (
+    "id",
+    "delivery_type",
+    "delivery_status",
+    "sender_id",
+    "vendor_id",
+    "rider_id",
+    "dispatch_id",
+    "distance",
+    "delivery_fee",
+    "amount_due_dispatch",
+    "pickup_coordinates",
+    "dropoff_coordinates",
+    "origin",
+    "destination",
+    "duration",
+    "created_at",
+    "rider_phone_number",
+    "sender_phone_number",
+)
+
+
+ORDER_FEED_COLUMNS = (
+    "id",
+    "owner_id",
+    "order_number",
+    "vendor_id",
+    "order_type",
+    "require_delivery",
+    "total_price",
+    "grand_total",
+    "order_payment_status",
+    "order_status",
+    "amount_due_vendor",
+    "vendor_pickup_dropoff_charge",
+    "payment_link",
+    "is_one_way_delivery",
+    "created_at",
+    "cancel_reason",
+)
+
+
+def order_feed_projection(
+    orders: Table = Order.__table__,
+    order_items: Table = OrderItem.__table__,
+    deliveries: Table = Delivery.__table__,
+):
+    """
+    Select only the columns DeliveryResponse needs, one row per order.
+    Items and their images are aggregated into JSON by Postgres, so no ORM graph
+    is built for the feed. Pass the archive tables to read archived orders.
+    """
+    images = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    func.json_build_object(
+                        "id", ItemImage.id, "item_id", ItemImage.item_id, "url", ItemImage.url
+                    )
+                ),
+                literal_column("'[]'::json"),
+            )
+        )
+        .where(ItemImage.item_id == Item.id)
+        .correlate(Item)
+        .scalar_subquery()
+    )
+    items_json = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    func.json_build_object(
+                        "id", Item.id,
+                        "user_id", Item.user_id,
+                        "name", Item.name,
+                        # Text keeps the exact decimal through JSON
+                        "price", cast(Item.price, String),
+                        "description", func.coalesce(Item.description, ""),
+                        "quantity", order_items.c.quantity,
+                        "images", images,
+                    )
+                ),
+                literal_column("'[]'::json"),
+                type_=JSON,
+            )
+        )
+        .select_from(order_items)
+        .join(Item, Item.id == order_items.c.item_id)
+        .where(order_items.c.order_id == orders.c.id)
+        .correlate(orders)
+        .scalar_subquery()
+    )
+
+    return (
+        select(
+            *(orders.c[column] for column in ORDER_FEED_COLUMNS),
+            func.coalesce(Profile.business_name, Profile.full_name).label(
+                "business_name"
+            ),
+            items_json.label("order_items"),
+            *(
+                deliveries.c[column].label(f"delivery_{column}")
+                for column in DELIVERY_FEED_COLUMNS
+            ),
+        )
+        .select_from(orders)
+        .outerjoin(deliveries, deliveries.c.order_id == orders.c.id)
+        .outerjoin(Profile, Profile.user_id == orders.c.vendor_id)
+    )
+
+
+def delivery_response_from_row(row, distance: Optional[float] = None) -> DeliveryResponse:
+    """Build a DeliveryResponse from an order_feed_projection row"""
+    delivery_data = None
+    if row.delivery_id is not None:
+        delivery_data = {
+            column: getattr(row, f"delivery_{column}") for column in DELIVERY_FEED_COLUMNS
+        }
+
+    order_data = {
+        "id": row.id,
+        "user_id": row.owner_id,
+        "order_number": row.order_number,
+        "vendor_id": row.vendor_id,
+        "business_name": row.business_name,
+        "order_type": row.order_type.value,
+        "require_delivery": row.require_delivery.value if row.require_delivery else None,
+        "total_price": row.total_price,
+        "grand_total": row.grand_total,
+        "order_payment_status": row.order_payment_status.value,
+        "order_status": row.order_status,
+        "amount_due_vendor": row.amount_due_vendor,
+        "vendor_pickup_dropoff_charge": row.vendor_pickup_dropoff_charge,
+        "payment_link": row.payment_link or "",
+        "is_one_way_delivery": (
+            row.is_one_way_delivery if row.is_one_way_delivery is not None else True
+        ),
+        "order_items": row.order_items,
+        "created_at": row.created_at,
+        "cancel_reason": row.cancel_reason,
+    }
+
+    return DeliveryResponse(order=order_data, delivery=delivery_data, distance=distance)
+
+
+async def load_order_feed(db: AsyncSession, stmt) -> list[DeliveryResponse]:
+    """Execute an order_feed_projection statement and build the responses"""
+    result = await db.execute(stmt)
+    return [delivery_response_from_row(row) for row in result]
+
+
 async def get_user_profile(user_id: UUID, db: AsyncSession):
     result = await db.execute(select(Profile).where(Profile.user_id == user_id))
 
@@ -3166,13 +3322,7 @@ async def get_paid_pending_deliveries(db: AsyncSession, current_user: User) -> l
                 Order.delivery.has(delivery_status="pending"),
             )
         )
-        .options(
-            selectinload(Order.order_items).options(
-                joinedload(OrderItem.item).options(selectinload(Item.images))
-            ),
-            joinedload(Order.delivery),
-            joinedload(Order.vendor).joinedload(User.profile),
-        )
+        .options(*ORDER_FEED_LOAD_OPTIONS)
         .order_by(Order.created_at.desc())
     )
     result = await db.execute(stmt)
@@ -3271,61 +3421,100 @@ async def get_paid_pending_deliveries(db: AsyncSession, current_user: User) -> l
 #     return delivery_responses
 
 
+def encode_order_cursor(updated_at: datetime, order_id: UUID) -> str:
+    return base64.urlsafe_b64encode(
+        f"{updated_at.isoformat()}|{order_id}".encode()
+    ).decode()
+
+
+def decode_order_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        updated_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(updated_at), UUID(order_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
 async def get_user_related_orders(
     db: AsyncSession,
     user_id: UUID,
-) -> list[DeliveryResponse]:
+    cursor: Optional[str] = None,
+    limit: int = 20,
+) -> CursorPaginatedDeliveryResponse:
     """
-    Returns deliveries where the user is involved as:
+    Returns a page of orders where the user is involved as:
       - order.owner_id
       - order.vendor_id
       - delivery.dispatch_id
       - delivery.rider_id
+
+    Each role is looked up on its own index and limited before the branches are
+    combined with UNION ALL, so a page costs the same however long the history is.
+    Pages are ordered by (updated_at, id) descending; pass next_cursor to continue.
     """
+    # Only the first page is cached so existing invalidation of this key still applies
     cache_key = f"user_related_orders:{user_id}"
-    cached_orders = redis_client.get(cache_key)
-    if cached_orders:
-        return [DeliveryResponse(**d) for d in json.loads(cached_orders)]
-
-    stmt = (
-        select(Order)
-        .outerjoin(
-            Delivery
-        )  # Using outerjoin to ensure we get orders even without deliveries
-        .options(
-            selectinload(Order.order_items).options(
-                joinedload(OrderItem.item).options(selectinload(Item.images))
-            ),
-            joinedload(Order.delivery),
-            joinedload(Order.vendor).joinedload(User.profile),
-        )
-        .where(
-            or_(
-                Order.owner_id == user_id,
-                Order.vendor_id == user_id,
-                and_(Delivery.id != None, Delivery.dispatch_id == user_id),
-                and_(Delivery.id != None, Delivery.rider_id == user_id),
-            )
-        )
-        .where(
-            Order.order_type.in_([OrderType.FOOD, OrderType.PACKAGE, OrderType.LAUNDRY])
-        )
-        .order_by(Order.updated_at.desc())
+    use_cache = cursor is None and limit == 20
+    if use_cache:
+        cached_orders = redis_client.get(cache_key)
+        if cached_orders:
+            return CursorPaginatedDeliveryResponse(**json.loads(cached_orders))
+
+    order_types = [OrderType.FOOD, OrderType.PACKAGE, OrderType.LAUNDRY]
+    after = decode_order_cursor(cursor) if cursor else None
+
+    def branch(stmt, role_filter):
+        stmt = stmt.where(role_filter).where(Order.order_type.in_(order_types))
+        if after:
+            stmt = stmt.where(tuple_(Order.updated_at, Order.id) < tuple_(*after))
+        return stmt.order_by(Order.updated_at.desc(), Order.id.desc()).limit(limit + 1)
+
+    order_ids = select(Order.id, Order.updated_at)
+    delivery_order_ids = select(Order.id, Order.updated_at).join(
+        Delivery, Delivery.order_id == Order.id
     )
-    result = await db.execute(stmt)
-    orders = result.unique().scalars().all()
+    related = union_all(
+        branch(order_ids, Order.owner_id == user_id),
+        branch(order_ids, Order.vendor_id == user_id),
+        branch(delivery_order_ids, Delivery.dispatch_id == user_id),
+        branch(delivery_order_ids, Delivery.rider_id == user_id),
+    ).subquery()
+
+    page_stmt = (
+        select(related.c.id, related.c.updated_at)
+        .distinct()
+        .order_by(related.c.updated_at.desc(), related.c.id.desc())
+        .limit(limit + 1)
+    )
+    page = (await db.execute(page_stmt)).all()
 
-    delivery_responses = [
-        format_delivery_response(order=order, delivery=order.delivery) for order in orders
-    ]
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_order_cursor(page[-1].updated_at, page[-1].id)
 
-    redis_client.setex(
-        cache_key,
-        timedelta(seconds=settings.REDIS_EX),
-        json.dumps([d.model_dump() for d in delivery_responses], default=str),
+    responses_by_id = {}
+    if page:
+        feed = await load_order_feed(
+            db, order_feed_projection().where(Order.id.in_([row.id for row in page]))
+        )
+        responses_by_id = {response.order.id: response for response in feed}
+
+    response = CursorPaginatedDeliveryResponse(
+        data=[responses_by_id[row.id] for row in page if row.id in responses_by_id],
+        next_cursor=next_cursor,
     )
 
-    return delivery_responses
+    if use_cache:
+        redis_client.setex(
+            cache_key,
+            read_cache_ttl(db, settings.REDIS_EX),
+            json.dumps(response.model_dump(), default=str),
+        )
+
+    return response
 
 
 async def cancel_order(
@@ -36,7 +36,6 @@ from app.schemas.review_schema import (
     SenderInfo,
 )
 from app.models.models import (
-    AuditLog,
     Message,
     MessageReadStatus,
     User,
@@ -48,6 +47,7 @@ from app.models.models import (
 )
 from app.schemas.status_schema import OrderStatus, UserType
 from app.config.config import redis_client, settings, channel, server_client
+from app.database.database import read_cache_ttl
 
 # from app.services.notification_service import create_automatic_report_thread
 
@@ -58,6 +58,8 @@ from app.utils.utils import (
     get_user_notification_token,
     send_push_notification,
 )
+from app.utils.cron_job import mark_vendor_review_stats_stale
+from app.utils.audit_log_writer import record_audit_log
 from app.ws_manager.ws_manager import manager
 
 ADMIN_MESSAGE = f"""
@@ -69,6 +71,24 @@ To keep everyone informed, we've created a dedicated thread for this case. This
 Please know that we are reviewing everything carefully. We will post all updates and our final decision within this thread and will notify you accordingly. We thank you for your help in keeping our community safe and respectful.
 """
 
+REVIEW_STATS_CACHE_KEY = "review_stats"
+
+
+def _unread_reports_key(user_id: UUID) -> str:
+    return f"user:{user_id}:unread_reports"
+
+
+def adjust_unread_report_count(user_id: UUID, delta: int) -> None:
+    """
+    Apply a delta to a user's cached unread report counter.
+    Missing counters are left alone and re-seeded from the DB on the next read.
+    """
+    key = _unread_reports_key(user_id)
+    if not redis_client.exists(key):
+        return
+    if redis_client.incrby(key, delta) < 0:
+        redis_client.delete(key)
+
 
 def convert_report_to_response(report: ReportType) -> ReportIssueResponse:
     """Convert a ReportIssue SQLAlchemy model to ReportIssueResponse Pydantic model"""
@@ -149,7 +169,8 @@ async def create_review(
         await db.commit()
         await db.refresh(review)
 
-        redis_client.delete(f"reviews:{order.vendor_id}")
+        redis_client.delete(f"reviews:{order.vendor_id}", REVIEW_STATS_CACHE_KEY)
+        mark_vendor_review_stats_stale()
 
         return ReviewResponse(
             id=review.id,
@@ -247,7 +268,7 @@ async def create_product_review(
         await db.refresh(review)
 
         cache_key = f"reviews:{review.item_id}"
-        redis_client.delete(cache_key)
+        redis_client.delete(cache_key, REVIEW_STATS_CACHE_KEY)
 
         return ReviewResponse(
             id=review.id,
@@ -344,7 +365,7 @@ async def fetch_vendor_reviews(
     # Only cache if we have reviews
     if response_list:
         value = json.dumps([r.model_dump() for r in response_list], default=str)
-        redis_client.setex(cache_key, 3600, value) 
+        redis_client.setex(cache_key, read_cache_ttl(db, 3600), value) 
     return response_list
 
 # async def fetch_vendor_reviews(
@@ -482,7 +503,7 @@ async def fetch_item_reviews(
     if response_list:
         redis_client.setex(
             cache_key,
-            settings.REDIS_EX,
+            read_cache_ttl(db, settings.REDIS_EX),
             json.dumps([r.model_dump() for r in response_list], default=str),
         )
        
@@ -604,6 +625,8 @@ async def create_report(
         await db.commit()
         await db.refresh(report)
 
+        adjust_unread_report_count(defendant_id, 1)
+
     except IntegrityError as e:
         await db.rollback()
         # This is a fallback; the proactive check should catch most cases.
@@ -702,19 +725,26 @@ async def add_message_to_report(
             recipient_users.append(report.defendant)
 
         # Mark as unread for direct recipients
+        newly_unread_ids = []
         for recipient in recipient_users:
-            await db.execute(
+            result = await db.execute(
                 update(UserReportReadStatus)
                 .where(
                     UserReportReadStatus.report_id == report_id,
                     UserReportReadStatus.user_id == recipient.id,
+                    UserReportReadStatus.is_read == True,
                 )
                 .values(is_read=False)
             )
+            if result.rowcount:
+                newly_unread_ids.append(recipient.id)
 
     # Refresh the message object to get DB-defaults like created_at
     await db.refresh(message_obj)
 
+    for recipient_id in newly_unread_ids:
+        adjust_unread_report_count(recipient_id, 1)
+
     # 4. Invalidate relevant caches
     cache_keys_to_delete = [
         f"report:{report_id}:thread:{uid}"
@@ -771,18 +801,7 @@ async def add_message_to_report(
 
 async def mark_message_as_read(db: AsyncSession, report_id: UUID, current_user: User):
     """Mark a report and all its messages as read for a specific user"""
-    # Mark the report as read for this user
-    await db.execute(
-        update(UserReportReadStatus)
-        .where(
-            UserReportReadStatus.report_id == report_id,
-            UserReportReadStatus.user_id == current_user.id,
-        )
-        .values(is_read=True)
-    )
-    # Mark all messages in the thread as read for this user
     await mark_thread_as_read_for_user(db, report_id, current_user)
-    await db.commit()
 
 
 async def get_user_messages(db: AsyncSession, user_id: UUID) -> list[ReportMessage]:
@@ -925,6 +944,17 @@ async def get_all_report_messages_for_admin(db: AsyncSession) -> list[ReportMess
 
 
 async def mark_thread_as_read_for_user(db: AsyncSession, report_id: UUID, user: User):
+    # Mark the report as read for this user
+    read_result = await db.execute(
+        update(UserReportReadStatus)
+        .where(
+            UserReportReadStatus.report_id == report_id,
+            UserReportReadStatus.user_id == user.id,
+            UserReportReadStatus.is_read == False,
+        )
+        .values(is_read=True)
+    )
+
     # Get all messages in the report thread
     stmt = select(Message).where(Message.report_id == report_id)
     result = await db.execute(stmt)
@@ -957,6 +987,9 @@ async def mark_thread_as_read_for_user(db: AsyncSession, report_id: UUID, user:
     )
     await db.commit()
 
+    if read_result.rowcount:
+        adjust_unread_report_count(user.id, -1)
+
 
 async def delete_report_if_allowed(
     db: AsyncSession, report_id: UUID, current_user: User
@@ -983,8 +1016,12 @@ async def delete_report_if_allowed(
     redis_client.delete(f"user:{report.defendant_id}:report_threads")
     redis_client.delete(f"report:{report_id}:thread:{report.complainant_id}")
     redis_client.delete(f"report:{report_id}:thread:{report.defendant_id}")
+    redis_client.delete(
+        _unread_reports_key(report.complainant_id),
+        _unread_reports_key(report.defendant_id),
+    )
     # --- AUDIT LOG ---
-    audit = AuditLog(
+    record_audit_log(
         actor_id=current_user.id,
         actor_name=getattr(current_user, "email", "unknown"),
         actor_role=str(getattr(current_user, "user_type", "unknown")),
@@ -993,10 +1030,8 @@ async def delete_report_if_allowed(
         resource_id=report_id,
         resource_summary=f"Updated report with ID {report_id}",
         changes=None,
-        metadata=None,
+        extra_metadata=None,
     )
-    db.add(audit)
-    await db.commit()
     return None
 
 
@@ -1035,7 +1070,7 @@ async def update_report_status(
     redis_client.delete(f"report:{report_id}:thread:{report.defendant_id}")
 
     # --- AUDIT LOG ---
-    audit = AuditLog(
+    record_audit_log(
         actor_id=current_user.id,
         actor_name=getattr(current_user, "email", "unknown"),
         actor_role=str(getattr(current_user, "user_type", "unknown")),
@@ -1044,10 +1079,8 @@ async def update_report_status(
         resource_id=report_id,
         resource_summary=str(report_id),
         changes={"report_status": [old_status, new_status]},
-        metadata=None,
+        extra_metadata=None,
     )
-    db.add(audit)
-    await db.commit()
     return ReportIssueUpdate.model_validate(new_status)
 
 
@@ -1130,14 +1163,47 @@ async def get_report_by_id(
 
 async def get_unread_badge_count(db: AsyncSession, user_id: UUID) -> BadgeCount:
     """Return the count of unread reports for the current user (report threads)."""
-    unread_stmt = select(UserReportReadStatus).where(
-        UserReportReadStatus.user_id == user_id, UserReportReadStatus.is_read == False
+    cache_key = _unread_reports_key(user_id)
+    cached = redis_client.get(cache_key)
+    if cached is not None:
+        return {"unread_count": int(cached)}
+
+    unread_count = await db.scalar(
+        select(func.count())
+        .select_from(UserReportReadStatus)
+        .where(
+            UserReportReadStatus.user_id == user_id,
+            UserReportReadStatus.is_read == False,
+        )
     )
-    unread_result = await db.execute(unread_stmt)
-    unread_count = len(unread_result.fetchall())
+    redis_client.set(cache_key, unread_count, ex=settings.REDIS_EX)
     return {"unread_count": unread_count}
 
 
+async def get_review_stats(db: AsyncSession) -> ReviewStats:
+    """Return review counts by rating band in a single pass over reviews."""
+    cached = redis_client.get(REVIEW_STATS_CACHE_KEY)
+    if cached:
+        return ReviewStats.model_validate(json.loads(cached))
+
+    result = await db.execute(
+        select(
+            func.count(Review.id).filter(Review.rating >= 4).label("positive_reviews"),
+            func.count(Review.id).filter(Review.rating <= 2).label("negative_reviews"),
+            func.count(Review.id).filter(Review.rating == 3).label("average_reviews"),
+            func.count(Review.id).label("total_reviews"),
+        )
+    )
+    stats = ReviewStats(**result.one()._mapping)
+
+    redis_client.setex(
+        REVIEW_STATS_CACHE_KEY,
+        read_cache_ttl(db, settings.REDIS_EX),
+        stats.model_dump_json(),
+    )
+    return stats
+
+
 async def get_filtered_reviews_and_stats(
     db: AsyncSession,
     review_filter: ReviewFilter | None = None,
@@ -1195,23 +1261,6 @@ async def get_filtered_reviews_and_stats(
         for r in reviews
     ]
 
-    # Stats calculation
-    positive_reviews_count = await db.scalar(
-        select(func.count(Review.id)).where(Review.rating >= 4)
-    )
-    negative_reviews_count = await db.scalar(
-        select(func.count(Review.id)).where(Review.rating <= 2)
-    )
-    average_reviews_count = await db.scalar(
-        select(func.count(Review.id)).where(Review.rating == 3)
-    )
-    total_reviews_count = await db.scalar(select(func.count(Review.id)))
-
-    stats = ReviewStats(
-        positive_reviews=positive_reviews_count,
-        negative_reviews=negative_reviews_count,
-        average_reviews=average_reviews_count,
-        total_reviews=total_reviews_count,
-    )
+    stats = await get_review_stats(db)
 
     return FilteredReviewsResponse(reviews=response_list, stats=stats)
@@ -4,7 +4,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.models import AuditLog, ChargeAndCommission, User
+from app.models.models import ChargeAndCommission, User
 from app.schemas.settings_schema import (
     ChargeAndCommissionSchema,
     ChargeAndCommissionUpdateSchema,
@@ -12,6 +12,7 @@ from app.schemas.settings_schema import (
 )
 from app.schemas.status_schema import UserType
 from app.utils.logger_config import setup_logger
+from app.utils.audit_log_writer import record_audit_log
 from app.config.config import redis_client
 
 
@@ -167,8 +168,10 @@ async def update_charge_and_commission_settings(
             .where(ChargeAndCommission.id == current_settings.id)
             .values(**update_dict)
         )
+        await db.commit()
+
         # --- AUDIT LOG ---
-        audit = AuditLog(
+        record_audit_log(
             actor_id=current_user.id,
             actor_name=getattr(current_user, "email", "unknown"),
             actor_role=str(current_user.user_type),
@@ -179,8 +182,6 @@ async def update_charge_and_commission_settings(
             changes=update_dict,
             extra_metadata=None,
         )
-        db.add(audit)
-        await db.commit()
 
         # Clear cache
         redis_client.delete("charge_commission_settings")
@@ -44,6 +44,7 @@ from app.schemas.status_schema import (
 from app.schemas.review_schema import ReviewType
 from app.utils.logger_config import setup_logger
 from app.config.config import redis_client
+from app.database.database import read_cache_ttl
 
 logger = setup_logger()
 
@@ -176,7 +177,7 @@ async def get_order_statistics(
         )
 
         # Cache for 15 minutes
-        redis_client.setex(cache_key, 900, response.model_dump_json())
+        redis_client.setex(cache_key, read_cache_ttl(db, 900), response.model_dump_json())
 
         return response
 
@@ -290,7 +291,7 @@ async def get_revenue_statistics(
         )
 
         # Cache for 15 minutes
-        redis_client.setex(cache_key, 900, response.model_dump_json())
+        redis_client.setex(cache_key, read_cache_ttl(db, 900), response.model_dump_json())
 
         return response
 
@@ -402,7 +403,7 @@ async def get_user_statistics(
         )
 
         # Cache for 15 minutes
-        redis_client.setex(cache_key, 900, response.model_dump_json())
+        redis_client.setex(cache_key, read_cache_ttl(db, 900), response.model_dump_json())
 
         return response
 
@@ -509,7 +510,7 @@ async def get_platform_overview(db: AsyncSession) -> PlatformOverview:
         )
 
         # Cache for 5 minutes
-        redis_client.setex(cache_key, 300, overview.model_dump_json())
+        redis_client.setex(cache_key, read_cache_ttl(db, 300), overview.model_dump_json())
 
         return overview
 
@@ -587,7 +588,7 @@ async def get_top_vendors(db: AsyncSession, limit: int = 10) -> List[TopVendorSt
         # Cache for 30 minutes
         redis_client.setex(
             cache_key,
-            1800,
+            read_cache_ttl(db, 1800),
             json.dumps([v.model_dump() for v in top_vendors], default=str),
         )
 
@@ -766,7 +767,9 @@ async def get_comprehensive_stats(db: AsyncSession) -> ComprehensiveStatsRespons
         )
 
         # Cache for 10 minutes
-        redis_client.setex(cache_key, 600, comprehensive_stats.model_dump_json())
+        redis_client.setex(
+            cache_key, read_cache_ttl(db, 600), comprehensive_stats.model_dump_json()
+        )
 
         return comprehensive_stats
 
@@ -24,6 +24,7 @@ from app.models.models import (
     OrderItem,
 )
 
+from app.queue.outbox import add_outbox_messages, wake_outbox_relay
 from app.queue.producer import producer
 from app.schemas.transaction_schema import (
     TransactionSchema,
@@ -1255,29 +1256,36 @@ async def fund_wallet_callback(request: Request, db: AsyncSession):
 
     try:
         if new_status == PaymentStatus.PAID:
-            # Update transaction status
-            await producer.publish_message(
-                service="wallet",
-                operation="update_transaction",
-                payload={
-                    "wallet_id": f"{transaction.wallet_id}",
-                    "tx_ref": f"{transaction.tx_ref}",
-                    "payment_status": new_status,
-                    "payment_method": PaymentMethod.CARD,
-                    "transaction_direction": TransactionDirection.CREDIT,
-                    "is_fund_wallet": True,
-                },
-            )
-            # Update wallet
-            await producer.publish_message(
-                service="wallet",
-                operation="update_wallet",
-                payload={
-                    "wallet_id": f"{transaction.wallet_id}",
-                    "balance_change": f"{transaction.amount}",
-                    "escrow_change": "0",
-                },
+            add_outbox_messages(
+                db,
+                [
+                    # Update transaction status
+                    {
+                        "service": "wallet",
+                        "operation": "update_transaction",
+                        "payload": {
+                            "wallet_id": f"{transaction.wallet_id}",
+                            "tx_ref": f"{transaction.tx_ref}",
+                            "payment_status": new_status,
+                            "payment_method": PaymentMethod.CARD,
+                            "transaction_direction": TransactionDirection.CREDIT,
+                            "is_fund_wallet": True,
+                        },
+                    },
+                    # Update wallet
+                    {
+                        "service": "wallet",
+                        "operation": "update_wallet",
+                        "payload": {
+                            "wallet_id": f"{transaction.wallet_id}",
+                            "balance_change": f"{transaction.amount}",
+                            "escrow_change": "0",
+                        },
+                    },
+                ],
             )
+            await db.commit()
+            wake_outbox_relay()
 
             return templates.TemplateResponse(
                 "payment-status.html",
@@ -1419,37 +1427,43 @@ async def order_payment_callback(request: Request, db: AsyncSession):
                 )
             delivery_fee = order.delivery.delivery_fee
 
-            # Customer wallet update (add to escrow)
-            await producer.publish_message(
-                service="wallet",
-                operation="update_wallet",
-                payload={
-                    "wallet_id": str(order.owner_id),
-                    "escrow_change": str(order.delivery.delivery_fee),
-                    "balance_change": str(0),
-                },
-            )
-
-            await producer.publish_message(
-                service="order_status",
-                operation="order_payment_status",
-                payload={"new_status": new_status, "order_id": str(order.id)},
-            )
-
-            # Create transaction
-            await producer.publish_message(
-                service="wallet",
-                operation="create_transaction",
-                payload={
-                    "wallet_id": str(order.owner_id),
-                    "tx_ref": tx_ref,
-                    "amount": str(delivery_fee),
-                    "transaction_type": TransactionType.USER_TO_USER,
-                    "payment_status": new_status,
-                    "transaction_direction": TransactionDirection.DEBIT,
-                    "from_user": customer.full_name or customer.business_name,
-                },
+            # Written with the payment status; the relay publishes after commit
+            add_outbox_messages(
+                db,
+                [
+                    # Customer wallet update (add to escrow)
+                    {
+                        "service": "wallet",
+                        "operation": "update_wallet",
+                        "payload": {
+                            "wallet_id": str(order.owner_id),
+                            "escrow_change": str(order.delivery.delivery_fee),
+                            "balance_change": str(0),
+                        },
+                    },
+                    {
+                        "service": "order_status",
+                        "operation": "order_payment_status",
+                        "payload": {"new_status": new_status, "order_id": str(order.id)},
+                    },
+                    # Create transaction
+                    {
+                        "service": "wallet",
+                        "operation": "create_transaction",
+                        "payload": {
+                            "wallet_id": str(order.owner_id),
+                            "tx_ref": tx_ref,
+                            "amount": str(delivery_fee),
+                            "transaction_type": TransactionType.USER_TO_USER,
+                            "payment_status": new_status,
+                            "transaction_direction": TransactionDirection.DEBIT,
+                            "from_user": customer.full_name or customer.business_name,
+                        },
+                    },
+                ],
             )
+            await db.commit()
+            wake_outbox_relay()
 
             # Notify customer
             customer_token = await get_user_notification_token(
@@ -1483,66 +1497,70 @@ async def order_payment_callback(request: Request, db: AsyncSession):
         if order.order_type in [OrderType.FOOD, OrderType.LAUNDRY]:
             total_price = order.grand_total
          
-            # Customer wallet update (add to escrow)
-            await producer.publish_message(
-                service="wallet",
-                operation="update_wallet",
-                payload={
-                    "wallet_id": str(order.owner_id),
-                    "escrow_change": str(charged_amount),
-                    "balance_change": str(0),
-                },
-            )
-            # Vendor wallet update (add to escrow)
-            await producer.publish_message(
-                service="wallet",
-                operation="update_wallet",
-                payload={
-                    "wallet_id": str(order.vendor_id),
-                    "escrow_change": str(order.amount_due_vendor),
-                    "balance_change": str(0),
-                },
-            )
-
-            await producer.publish_message(
-                service="order_status",
-                operation="order_payment_status",
-                payload={"new_status": new_status, "order_id": str(order.id)},
-            )
-
-            # Queue customer and vendor wallet operations
-            # Customer transaction
-            await producer.publish_message(
-                service="wallet",
-                operation="create_transaction",
-                payload={
-                    "wallet_id": str(order.owner_id),
-                    "tx_ref": tx_ref,
-                    "amount": str(charged_amount),
-                    "to_wallet_id": str(order.vendor_id),
-                    "payment_status": new_status,
-                    "transaction_type": TransactionType.USER_TO_USER,
-                    "transaction_direction": TransactionDirection.DEBIT,
-                    "from_user": customer.full_name or customer.business_name,
-                    "to_user": vendor_profile.full_name or vendor_profile.business_name,
-                },
-            )
-
-            # Create vendor transaction
-            await producer.publish_message(
-                service="wallet",
-                operation="create_transaction",
-                payload={
-                    "wallet_id": str(order.vendor_id),
-                    "tx_ref": tx_ref,
-                    "amount": str(order.amount_due_vendor),
-                    "payment_status": PaymentStatus.ESCROWED,
-                    "transaction_type": TransactionType.USER_TO_USER,
-                    "transaction_direction": TransactionDirection.CREDIT,
-                    "from_user": customer.full_name or customer.business_name,
-                    "to_user": vendor_profile.full_name or vendor_profile.business_name,
-                },
+            # Written with the payment status; the relay publishes after commit
+            add_outbox_messages(
+                db,
+                [
+                    # Customer wallet update (add to escrow)
+                    {
+                        "service": "wallet",
+                        "operation": "update_wallet",
+                        "payload": {
+                            "wallet_id": str(order.owner_id),
+                            "escrow_change": str(charged_amount),
+                            "balance_change": str(0),
+                        },
+                    },
+                    # Vendor wallet update (add to escrow)
+                    {
+                        "service": "wallet",
+                        "operation": "update_wallet",
+                        "payload": {
+                            "wallet_id": str(order.vendor_id),
+                            "escrow_change": str(order.amount_due_vendor),
+                            "balance_change": str(0),
+                        },
+                    },
+                    {
+                        "service": "order_status",
+                        "operation": "order_payment_status",
+                        "payload": {"new_status": new_status, "order_id": str(order.id)},
+                    },
+                    # Customer transaction
+                    {
+                        "service": "wallet",
+                        "operation": "create_transaction",
+                        "payload": {
+                            "wallet_id": str(order.owner_id),
+                            "tx_ref": tx_ref,
+                            "amount": str(charged_amount),
+                            "to_wallet_id": str(order.vendor_id),
+                            "payment_status": new_status,
+                            "transaction_type": TransactionType.USER_TO_USER,
+                            "transaction_direction": TransactionDirection.DEBIT,
+                            "from_user": customer.full_name or customer.business_name,
+                            "to_user": vendor_profile.full_name or vendor_profile.business_name,
+                        },
+                    },
+                    # Create vendor transaction
+                    {
+                        "service": "wallet",
+                        "operation": "create_transaction",
+                        "payload": {
+                            "wallet_id": str(order.vendor_id),
+                            "tx_ref": tx_ref,
+                            "amount": str(order.amount_due_vendor),
+                            "payment_status": PaymentStatus.ESCROWED,
+                            "transaction_type": TransactionType.USER_TO_USER,
+                            "transaction_direction": TransactionDirection.CREDIT,
+                            "from_user": customer.full_name or customer.business_name,
+                            "to_user": vendor_profile.full_name or vendor_profile.business_name,
+                        },
+                    },
+                ],
             )
+            await db.commit()
+            wake_outbox_relay()
 
             # Send notifications
             customer_token = await get_user_notification_token(
@@ -2231,27 +2249,6 @@ async def product_order_payment_callback(request: Request, db: AsyncSession):
     # Only move funds and create transactions if payment is successful
     if new_status == PaymentStatus.PAID:
        
-        # Update customer escrow balance
-        await producer.publish_message(
-            service='wallet', operation='update_wallet',
-            payload={
-                "wallet_id": str(order.owner_id),
-                "escrow_change": str(order.grand_total),
-                "balance_change": '0',
-                
-            }
-        )
-
-        # # Update vendor escrow balance
-        await producer.publish_message(
-            service='wallet', operation='update_wallet',
-            payload={
-                "wallet_id": str(order.vendor_id),
-                "escrow_change": str(order.amount_due_vendor),
-                "balance_change": '0',
-            }
-        )
-
         if order.order_items:
             # Access the OrderItem and its related Item
             order_item = order.order_items[0]
@@ -2266,44 +2263,68 @@ async def product_order_payment_callback(request: Request, db: AsyncSession):
                 .values(stock=Item.stock - quantity_to_deduct)
             )
 
-            await db.commit()
-            await db.refresh(order)
-
-        # Queue Buyer Transaction
-        await producer.publish_message(
-            service='wallet', 
-            operation='create_transaction',
-            payload={
-                'wallet_id':str(order.owner_id),
-                'tx_ref':str(order.tx_ref),
-                'to_wallet_id': str(order.vendor_id),
-                'amount':f'{order.grand_total}',
-                'transaction_type':TransactionType.USER_TO_USER,
-                'transaction_direction':TransactionDirection.DEBIT,
-                'payment_status':PaymentStatus.PAID,
-                'payment_method':PaymentMethod.CARD,
-                'from_user':customer.full_name or customer.business_name,
-                'to_user':vendor.full_name or vendor.business_name,
-               
-            }
-        )
-
-        # Queue Vendor Transaction
-        await producer.publish_message(
-            service='wallet', 
-            operation='create_transaction',
-            payload={ 
-                'wallet_id':str(order.vendor_id),
-                'tx_ref': str(order.tx_ref),
-                'amount':str(order.amount_due_vendor),
-                'transaction_type':TransactionType.USER_TO_USER,
-                'transaction_direction':TransactionDirection.CREDIT,
-                'payment_status':PaymentStatus.ESCROWED,
-                'payment_method':PaymentMethod.CARD,
-                'from_user':customer.full_name or customer.business_name,
-                'to_user':vendor.full_name or vendor.business_name,}
-            
+        # Written with the payment status and stock change; the relay publishes after commit
+        add_outbox_messages(
+            db,
+            [
+                # Update customer escrow balance
+                {
+                    "service": "wallet",
+                    "operation": "update_wallet",
+                    "payload": {
+                        "wallet_id": str(order.owner_id),
+                        "escrow_change": str(order.grand_total),
+                        "balance_change": "0",
+                    },
+                },
+                # Update vendor escrow balance
+                {
+                    "service": "wallet",
+                    "operation": "update_wallet",
+                    "payload": {
+                        "wallet_id": str(order.vendor_id),
+                        "escrow_change": str(order.amount_due_vendor),
+                        "balance_change": "0",
+                    },
+                },
+                # Queue Buyer Transaction
+                {
+                    "service": "wallet",
+                    "operation": "create_transaction",
+                    "payload": {
+                        "wallet_id": str(order.owner_id),
+                        "tx_ref": str(order.tx_ref),
+                        "to_wallet_id": str(order.vendor_id),
+                        "amount": f"{order.grand_total}",
+                        "transaction_type": TransactionType.USER_TO_USER,
+                        "transaction_direction": TransactionDirection.DEBIT,
+                        "payment_status": PaymentStatus.PAID,
+                        "payment_method": PaymentMethod.CARD,
+                        "from_user": customer.full_name or customer.business_name,
+                        "to_user": vendor.full_name or vendor.business_name,
+                    },
+                },
+                # Queue Vendor Transaction
+                {
+                    "service": "wallet",
+                    "operation": "create_transaction",
+                    "payload": {
+                        "wallet_id": str(order.vendor_id),
+                        "tx_ref": str(order.tx_ref),
+                        "amount": str(order.amount_due_vendor),
+                        "transaction_type": TransactionType.USER_TO_USER,
+                        "transaction_direction": TransactionDirection.CREDIT,
+                        "payment_status": PaymentStatus.ESCROWED,
+                        "payment_method": PaymentMethod.CARD,
+                        "from_user": customer.full_name or customer.business_name,
+                        "to_user": vendor.full_name or vendor.business_name,
+                    },
+                },
+            ],
         )
+        await db.commit()
+        await db.refresh(order)
+        wake_outbox_relay()
 
     
         redis_client.delete(f"marketplace_user_orders:{order.owner_id}")
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta, time
 from app.schemas.item_schemas import FoodGroup, ItemType
-from app.models.models import AuditLog, Delivery, User, Item, RefreshToken, Session
+from app.models.models import Delivery, User, Item, RefreshToken, Session
 from sqlalchemy.orm import selectinload
 from sqlalchemy import func, select, delete, update, and_
 from typing import List, Optional
@@ -19,6 +19,9 @@ from app.schemas.status_schema import UserType
 from app.utils.logger_config import setup_logger
 from app.utils.s3_service import add_image, delete_s3_object
 from app.config.config import redis_client, settings
+from app.database.database import read_cache_ttl
+from app.auth.user_cache import invalidate_auth_user
+from app.utils.audit_log_writer import record_audit_log
 
 from app.models.models import (
     User,
@@ -29,6 +32,7 @@ from app.models.models import (
     Order,
     Item,
 )
+from app.models.materialize_model import VendorReviewStats
 from app.schemas.review_schema import ReviewType
 from app.utils.map import get_distance_between_addresses
 from app.schemas.item_schemas import MenuResponseSchema, LaundryMenuResponseSchema
@@ -114,6 +118,7 @@ def set_cached_user(user_id: UUID, user_data: dict) -> None:
 def invalidate_user_cache(user_id: UUID) -> None:
     """Helper function to invalidate user cache"""
     redis_client.delete(f"user:{user_id}")
+    invalidate_auth_user(user_id)
 
 
 async def get_rider_profile(db: AsyncSession, user_id: UUID) -> RiderProfileSchema:
@@ -418,7 +423,7 @@ async def toggle_user_block_status(
         )
 
         # --- AUDIT LOG ---
-        audit = AuditLog(
+        record_audit_log(
             actor_id=current_user.id,
             actor_name=getattr(current_user, "email", "unknown"),
             actor_role=current_user.user_type,
@@ -429,8 +434,6 @@ async def toggle_user_block_status(
             changes={"is_blocked": [not user.is_blocked, user.is_blocked]},
             extra_metadata=None,
         )
-        db.add(audit)
-        await db.commit()
 
         return user.is_blocked
 
@@ -575,7 +578,7 @@ async def update_profile(
 
     # Invalidate cached data
     redis_client.delete(f"current_useer_profile:{current_user.id}")
-    redis_client.delete(f"user:{current_user.id}")
+    invalidate_user_cache(current_user.id)
     redis_client.delete("all_users")
 
     # --- AUDIT LOG ---
@@ -591,7 +594,7 @@ async def update_profile(
                 if isinstance(value, (datetime, time)):
                     values[i] = value.isoformat()
 
-        audit = AuditLog(
+        record_audit_log(
             actor_id=current_user.id,
             actor_name=current_user.profile.full_name or current_user.email,
             actor_role=current_user.user_type,
@@ -603,9 +606,6 @@ async def update_profile(
             extra_metadata=None,
         )
 
-        db.add(audit)
-        await db.commit()
-
     return profile
 
 
@@ -714,7 +714,7 @@ async def update_rider_profile(
             if old_profile.get(k) != getattr(profile, k)
         }
         if changed_fields:
-            audit = AuditLog(
+            record_audit_log(
                 actor_id=current_user.id,
                 actor_name=getattr(current_user, "email", "unknown"),
                 actor_role=current_user.user_type,
@@ -726,9 +726,6 @@ async def update_rider_profile(
                 extra_metadata=None,
             )
 
-            db.add(audit)
-            await db.commit()
-
         return profile
 
     except Exception as e:
@@ -831,35 +828,20 @@ async def get_restaurant_vendors(
 
 
     try:
-        # Review stats subquery (for ORDER type reviews)
-        review_stats_subq = (
-            select(
-                Order.vendor_id.label("vendor_id"),
-                func.avg(Review.rating).label("average_rating"),
-                func.count(Review.id).label("review_count"),
-            )
-            .join(Review, Review.order_id == Order.id)
-            .where(Review.review_type == ReviewType.ORDER)
-            .group_by(Order.vendor_id)
-            .subquery()
-        )
-
-        # Main query
+        # Review stats come from the vendor_review_stats materialized view
         stmt = (
             select(
                 User,
                 Profile,
                 ProfileImage,
-                func.coalesce(review_stats_subq.c.average_rating, 0).label(
-                    "avg_rating"
-                ),
-                func.coalesce(review_stats_subq.c.review_count, 0).label(
+                func.coalesce(VendorReviewStats.avg_rating, 0).label("avg_rating"),
+                func.coalesce(VendorReviewStats.review_count, 0).label(
                     "review_count"
                 ),
             )
             .join(Profile, Profile.user_id == User.id)
             .outerjoin(ProfileImage, ProfileImage.profile_id == User.id)
-            .outerjoin(review_stats_subq, review_stats_subq.c.vendor_id == User.id)
+            .outerjoin(VendorReviewStats, VendorReviewStats.vendor_id == User.id)
             .where(User.user_type == UserType.RESTAURANT_VENDOR)
         )
 
@@ -920,7 +902,9 @@ async def get_restaurant_vendors(
 
         # Cache result
         redis_client.setex(
-            cache_key, settings.REDIS_EX, json.dumps(response, default=str)
+            cache_key,
+            read_cache_ttl(db, settings.REDIS_EX),
+            json.dumps(response, default=str),
         )
         return response
     except Exception as e:
@@ -991,8 +975,10 @@ async def delete_user(db: AsyncSession, current_user: User) -> None:
         await db.execute(delete(RefreshToken).where(RefreshToken.user_id == current_user.id))
         await db.execute(delete(Session).where(Session.user_id == current_user.id))
 
-        # Finally delete the user
-        await db.delete(current_user)
+        # Finally delete the user; current_user is a detached snapshot, so load
+        # the row for the ORM delete cascades
+        user = await db.get(User, current_user.id)
+        await db.delete(user)
         await db.commit()
 
         # Clear caches
@@ -1113,6 +1099,7 @@ async def upload_image_profile(
         # Commit the transaction
         logger.info("Committing transaction")
         await db.commit()
+        invalidate_auth_user(current_user.id)
         logger.info("Transaction committed successfully")
 
         # Clean up old images AFTER successful commit
@@ -1190,8 +1177,7 @@ async def get_users_by_laundry_services(db: AsyncSession, current_user: User) ->
     Fetch all vendors who offer laundry services with:
     - basic info
     - number of laundry items
-    - avg review (from Review via Order)
-    - review count
+    - avg review and review count (from the vendor_review_stats view)
     """
     cache_key = "laundry_vendors"
     cached_data = redis_client.get(cache_key)
@@ -1200,19 +1186,6 @@ async def get_users_by_laundry_services(db: AsyncSession, current_user: User) ->
         return json.loads(cached_data)
 
     try:
-        # Review stats subquery (ORDER review type only)
-        review_stats_subq = (
-            select(
-                Order.vendor_id.label("vendor_id"),
-                func.avg(Review.rating).label("average_rating"),
-                func.count(Review.id).label("review_count"),
-            )
-            .join(Review, Review.order_id == Order.id)
-            .where(Review.review_type == ReviewType.ORDER)
-            .group_by(Order.vendor_id)
-            .subquery()
-        )
-
         # Laundry item count subquery
         item_count_subq = select(
             Item.user_id.label("vendor_id"),
@@ -1227,17 +1200,15 @@ async def get_users_by_laundry_services(db: AsyncSession, current_user: User) ->
                 User,
                 Profile,
                 ProfileImage,
-                func.coalesce(review_stats_subq.c.average_rating, 0).label(
-                    "avg_rating"
-                ),
-                func.coalesce(review_stats_subq.c.review_count, 0).label(
+                func.coalesce(VendorReviewStats.avg_rating, 0).label("avg_rating"),
+                func.coalesce(VendorReviewStats.review_count, 0).label(
                     "review_count"
                 ),
                 func.coalesce(item_count_subq.c.total_items, 0).label("total_items"),
             )
             .join(Profile, Profile.user_id == User.id)
             .outerjoin(ProfileImage, ProfileImage.profile_id == User.id)
-            .outerjoin(review_stats_subq, review_stats_subq.c.vendor_id == User.id)
+            .outerjoin(VendorReviewStats, VendorReviewStats.vendor_id == User.id)
             .outerjoin(item_count_subq, item_count_subq.c.vendor_id == User.id)
             .where(User.user_type == UserType.LAUNDRY_VENDOR)
         )
@@ -1287,7 +1258,7 @@ async def get_users_by_laundry_services(db: AsyncSession, current_user: User) ->
         # Cache result
         redis_client.setex(
             cache_key,
-            settings.REDIS_EX,
+            read_cache_ttl(db, settings.REDIS_EX),
             json.dumps(response, default=str),
         )
 
@@ -1437,7 +1408,7 @@ async def delete_rider(rider_id: UUID, db: AsyncSession, current_user: User) ->
         )
 
         # --- AUDIT LOG ---
-        audit = AuditLog(
+        record_audit_log(
             actor_id=current_user.id,
             actor_name=getattr(current_user, "email", "unknown"),
             actor_role=current_user.user_type,
@@ -1448,8 +1419,6 @@ async def delete_rider(rider_id: UUID, db: AsyncSession, current_user: User) ->
             changes=None,
             extra_metadata=None,
         )
-        db.add(audit)
-        await db.commit()
 
         return None
 
@@ -1496,6 +1465,7 @@ async def register_notification(
     )
 
     await db.commit()
+    invalidate_auth_user(current_user.id)
 
     # Cache the new token
     redis_client.setex(cache_key, 3600, push_token.notification_token)
@@ -1549,6 +1519,7 @@ async def update_user_location_coords(
         .values({"current_user_location_coords": coordinate})
     )
     await db.commit()
+    invalidate_auth_user(current_user.id)
     
     # Cache the new coordinates (serialize to JSON string for Redis)
     redis_client.setex(cache_key, 3600, json.dumps(coordinate))
@@ -1638,7 +1609,9 @@ async def get_restaurant_menu(
 
         # Cache the data
         redis_client.setex(
-            cache_key, settings.REDIS_EX, json.dumps(menu_list, default=str)
+            cache_key,
+            read_cache_ttl(db, settings.REDIS_EX),
+            json.dumps(menu_list, default=str),
         )
 
         # Convert to Pydantic models for return
@@ -1703,7 +1676,9 @@ async def get_laundry_menu(
 
         # Cache the data
         redis_client.setex(
-            cache_key, settings.REDIS_EX, json.dumps(menu_list, default=str)
+            cache_key,
+            read_cache_ttl(db, settings.REDIS_EX),
+            json.dumps(menu_list, default=str),
         )
 
         # Convert to Pydantic models for return
@@ -0,0 +1,87 @@
+import json
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.config.config import settings
+from app.models.models import AuditLog
+from app.utils import audit_log_writer
+
+
+@pytest_asyncio.fixture
+async def writer(engine: AsyncEngine, monkeypatch, tmp_path):
+    """Points the writer at the test database and a temporary spill path."""
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(audit_log_writer, "async_session", sessions)
+    monkeypatch.setattr(audit_log_writer, "_failed_flushes", 0)
+    monkeypatch.setattr(settings, "AUDIT_LOG_SPILL_PATH", str(tmp_path / "spill.jsonl"))
+    audit_log_writer._pending_entries.clear()
+    yield sessions
+
+    audit_log_writer._pending_entries.clear()
+    async with sessions() as session:
+        await session.execute(delete(AuditLog))
+        await session.commit()
+
+
+def record(resource_type: str = "Order") -> None:
+    audit_log_writer.record_audit_log(
+        actor_id=uuid.uuid4(),
+        actor_name="Ada",
+        actor_role="admin",
+        action="update",
+        resource_type=resource_type,
+        resource_id=uuid.uuid4(),
+        changes={"status": ["pending", "approved"]},
+    )
+
+
+@pytest.mark.asyncio
+class TestAuditLogWriter:
+    """Bad entries are spilled rather than blocking the buffer; spills restore once."""
+
+    async def test_batch_that_keeps_failing_is_written_row_by_row(self, writer):
+        record()
+        # Longer than the String(64) column
+        record(resource_type="x" * 100)
+        record()
+
+        for _ in range(settings.AUDIT_LOG_BATCH_ATTEMPTS):
+            with pytest.raises(Exception):
+                await audit_log_writer.flush_audit_logs()
+            assert len(audit_log_writer._pending_entries) == 3
+
+        assert await audit_log_writer.flush_audit_logs() == 2
+        assert not audit_log_writer._pending_entries
+
+        async with writer() as session:
+            assert len((await session.scalars(select(AuditLog))).all()) == 2
+        (spilled,) = audit_log_writer._spilled_files()
+        assert '"resource_type": "' + "x" * 100 in open(spilled).read()
+
+    async def test_restore_reads_every_spill_file_once(self, writer, tmp_path):
+        for count in (2, 1):
+            for _ in range(count):
+                record()
+            entries = list(audit_log_writer._pending_entries)
+            audit_log_writer._pending_entries.clear()
+            audit_log_writer._spill_entries(entries)
+        spilled_ids = [
+            uuid.UUID(json.loads(line)["id"])
+            for path in audit_log_writer._spilled_files()
+            for line in open(path)
+        ]
+
+        audit_log_writer._restore_spilled_entries()
+
+        assert [
+            entry["id"] for entry in audit_log_writer._pending_entries
+        ] == spilled_ids
+        assert list(tmp_path.iterdir()) == []
+
+        # A second worker starting later finds nothing left to restore
+        audit_log_writer._restore_spilled_entries()
+        assert len(audit_log_writer._pending_entries) == 3
@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+
+from app.auth import user_cache
+from app.models.models import User
+from app.schemas.status_schema import UserType
+
+
+class SharedRedis:
+    """The few Redis calls the auth cache makes, shared by every simulated worker."""
+
+    def __init__(self):
+        self.values = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.values.get(key)
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    shared = SharedRedis()
+    monkeypatch.setattr(user_cache, "redis_client", shared)
+    monkeypatch.setattr(user_cache, "_local_cache", user_cache.OrderedDict())
+    return shared
+
+
+def make_user() -> User:
+    return User(
+        id=uuid.uuid4(),
+        email=f"{uuid.uuid4().hex[:12]}@example.com",
+        user_type=UserType.CUSTOMER,
+        is_blocked=False,
+    )
+
+
+class TestAuthUserCache:
+    """A local copy is dropped once any worker invalidates the shared entry."""
+
+    def test_local_copy_is_served_while_shared_entry_exists(self, redis):
+        user = make_user()
+        user_cache.cache_auth_user(user)
+
+        snapshot = user_cache._get_snapshot(str(user.id))
+
+        assert snapshot["user"]["id"] == str(user.id)
+        assert redis.gets == 0
+
+    def test_invalidation_by_another_worker_drops_local_copy(self, redis):
+        user = make_user()
+        user_cache.cache_auth_user(user)
+
+        # Another worker blocks the user: its invalidate only reaches Redis
+        redis.delete(user_cache._auth_user_key(user.id))
+
+        assert user_cache._get_snapshot(str(user.id)) is None
+        assert str(user.id) not in user_cache._local_cache
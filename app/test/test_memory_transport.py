@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from app.queue.transport import (
+    InMemoryBroker,
+    InMemoryTransport,
+    OutgoingMessage,
+    UnroutableError,
+)
+
+
+async def declare(transport: InMemoryTransport, queue: str = "work", **arguments):
+    await transport.declare_exchange("central_operations")
+    await transport.declare_queue(queue, arguments=arguments or None)
+    await transport.bind(queue, "central_operations", queue)
+
+
+async def receive(deliveries, timeout: float = 1):
+    return await asyncio.wait_for(anext(deliveries), timeout)
+
+
+@pytest.mark.asyncio
+class TestInMemoryTransport:
+    """The in-memory broker behaves like the RabbitMQ setup the consumers use."""
+
+    async def test_routes_by_routing_key_and_acks(self):
+        transport = InMemoryTransport(InMemoryBroker())
+        await declare(transport)
+
+        await transport.publish(
+            "central_operations",
+            OutgoingMessage(b"hello", routing_key="work", message_id="m-1"),
+        )
+        message = await receive(transport.consume("work", prefetch_count=10))
+        await message.ack()
+
+        assert message.body == b"hello"
+        assert message.message_id == "m-1"
+        assert not transport.broker.queues["work"].messages
+
+    async def test_unroutable_message_raises(self):
+        transport = InMemoryTransport(InMemoryBroker())
+        await declare(transport)
+
+        with pytest.raises(UnroutableError):
+            await transport.publish(
+                "central_operations", OutgoingMessage(b"lost", routing_key="nobody")
+            )
+
+    async def test_reject_with_requeue_redelivers(self):
+        transport = InMemoryTransport(InMemoryBroker())
+        await declare(transport)
+        await transport.publish(
+            "central_operations", OutgoingMessage(b"again", routing_key="work")
+        )
+        deliveries = transport.consume("work", prefetch_count=10)
+
+        first = await receive(deliveries)
+        await first.reject(requeue=True)
+        second = await receive(deliveries)
+
+        assert second.body == b"again"
+        assert second.redelivered
+
+    async def test_reject_without_requeue_dead_letters(self):
+        transport = InMemoryTransport(InMemoryBroker())
+        await declare(
+            transport,
+            **{
+                "x-dead-letter-exchange": "work_dlx",
+                "x-dead-letter-routing-key": "failed_work",
+            },
+        )
+        await transport.declare_exchange("work_dlx")
+        await transport.declare_queue("failed_work")
+        await transport.bind("failed_work", "work_dlx", "failed_work")
+        await transport.publish(
+            "central_operations", OutgoingMessage(b"poison", routing_key="work")
+        )
+
+        message = await receive(transport.consume("work", prefetch_count=10))
+        await message.reject(requeue=False)
+        dead = await receive(transport.consume("failed_work", prefetch_count=10))
+
+        assert dead.body == b"poison"
+        assert dead.headers["x-death"][0]["reason"] == "rejected"
+
+    async def test_expired_messages_dead_letter_back_to_main_queue(self):
+        transport = InMemoryTransport(InMemoryBroker())
+        await declare(transport)
+        await transport.declare_exchange("work_retry")
+        await transport.declare_queue(
+            "work_retry_20ms",
+            arguments={
+                "x-message-ttl": 20,
+                "x-dead-letter-exchange": "central_operations",
+                "x-dead-letter-routing-key": "work",
+            },
+        )
+        await transport.bind("work_retry_20ms", "work_retry", "work_retry_20ms")
+
+        await transport.publish(
+            "work_retry",
+            OutgoingMessage(b"later", routing_key="work_retry_20ms", headers={"x-attempt": 1}),
+        )
+        message = await receive(transport.consume("work", prefetch_count=10))
+
+        assert message.body == b"later"
+        assert message.headers["x-attempt"] == 1
+        assert message.headers["x-death"][0]["reason"] == "expired"
+
+    async def test_prefetch_limits_unacked_deliveries(self):
+        transport = InMemoryTransport(InMemoryBroker())
+        await declare(transport)
+        await transport.publish_many(
+            "central_operations",
+            [OutgoingMessage(str(i).encode(), routing_key="work") for i in range(3)],
+        )
+        deliveries = transport.consume("work", prefetch_count=2)
+
+        first = await receive(deliveries)
+        await receive(deliveries)
+        waiting = asyncio.ensure_future(anext(deliveries))
+        done, _ = await asyncio.wait({waiting}, timeout=0.05)
+        assert not done
+
+        await first.ack()
+        third = await asyncio.wait_for(waiting, 1)
+        assert third.body == b"2"
+
+    async def test_close_requeues_unacked_messages(self):
+        broker = InMemoryBroker()
+        transport = InMemoryTransport(broker)
+        await declare(transport)
+        await transport.publish(
+            "central_operations", OutgoingMessage(b"in flight", routing_key="work")
+        )
+        await receive(transport.consume("work", prefetch_count=10))
+
+        await transport.close()
+        message = await receive(
+            InMemoryTransport(broker).consume("work", prefetch_count=10)
+        )
+
+        assert message.body == b"in flight"
+        assert message.redelivered
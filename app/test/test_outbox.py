@@ -0,0 +1,129 @@
+import json
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.models.models import OutboxMessage
+from app.queue import outbox
+from app.queue.producer import CentralQueueProducer
+from app.queue.transport import InMemoryBroker, InMemoryTransport
+
+
+@pytest_asyncio.fixture
+async def relay(engine: AsyncEngine, monkeypatch):
+    """Points the relay at the test database and an in-memory broker."""
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    broker = InMemoryBroker()
+    transport = InMemoryTransport(broker)
+    await transport.declare_exchange("central_operations")
+    await transport.declare_queue("wallet_updates")
+    await transport.bind("wallet_updates", "central_operations", "wallet")
+
+    monkeypatch.setattr(outbox, "async_session", sessions)
+    monkeypatch.setattr(outbox, "producer", CentralQueueProducer(transport))
+    yield sessions, broker
+
+    async with sessions() as session:
+        await session.execute(delete(OutboxMessage))
+        await session.commit()
+
+
+def wallet_messages(count: int) -> list:
+    return [
+        {
+            "service": "wallet",
+            "operation": "update_wallet",
+            "payload": {"wallet_id": "w-1", "seq": seq},
+        }
+        for seq in range(count)
+    ]
+
+
+async def outbox_rows(sessions) -> list:
+    async with sessions() as session:
+        result = await session.execute(select(OutboxMessage).order_by(OutboxMessage.id))
+        return result.scalars().all()
+
+
+@pytest.mark.asyncio
+class TestOutboxRelay:
+    """Outbox rows are published in insert order once their transaction commits."""
+
+    async def test_committed_rows_are_published_in_order_and_marked_sent(self, relay):
+        sessions, broker = relay
+        async with sessions() as session:
+            outbox.add_outbox_messages(session, wallet_messages(3))
+            await session.commit()
+
+        assert await outbox.relay_outbox_batch() == 3
+
+        queued = broker.queues["wallet_updates"].messages
+        assert [json.loads(m.body)["payload"]["seq"] for m in queued] == [0, 1, 2]
+        assert all(row.sent_at is not None for row in await outbox_rows(sessions))
+        assert await outbox.relay_outbox_batch() == 0
+
+    async def test_rolled_back_rows_are_never_published(self, relay):
+        sessions, broker = relay
+        async with sessions() as session:
+            outbox.add_outbox_messages(session, wallet_messages(2))
+            await session.flush()
+            await session.rollback()
+
+        assert await outbox.relay_outbox_batch() == 0
+        assert not broker.queues["wallet_updates"].messages
+
+    async def test_rows_stay_unsent_when_publishing_fails(self, relay, monkeypatch):
+        sessions, broker = relay
+        async with sessions() as session:
+            outbox.add_outbox_messages(session, wallet_messages(2))
+            await session.commit()
+
+        publish_many = outbox.producer.publish_many
+        attempts = []
+
+        async def flaky_publish_many(messages):
+            attempts.append(len(messages))
+            if len(attempts) == 1:
+                raise ConnectionError("broker unavailable")
+            await publish_many(messages)
+
+        monkeypatch.setattr(outbox.producer, "publish_many", flaky_publish_many)
+        with pytest.raises(ConnectionError):
+            await outbox.relay_outbox_batch()
+
+        assert all(row.sent_at is None for row in await outbox_rows(sessions))
+        assert not broker.queues["wallet_updates"].messages
+
+        # The next run picks the same rows up again
+        assert await outbox.relay_outbox_batch() == 2
+        assert all(row.sent_at is not None for row in await outbox_rows(sessions))
+
+    async def test_relayed_message_id_is_the_row_message_id(self, relay):
+        sessions, broker = relay
+        async with sessions() as session:
+            outbox.add_outbox_messages(session, wallet_messages(1))
+            await session.commit()
+
+        await outbox.relay_outbox_batch()
+
+        (row,) = await outbox_rows(sessions)
+        (message,) = broker.queues["wallet_updates"].messages
+        assert message.message_id == str(row.message_id)
+        assert json.loads(message.body)["message_id"] == str(row.message_id)
+
+    async def test_relay_skips_while_another_relay_holds_the_lock(self, relay):
+        sessions, broker = relay
+        async with sessions() as session:
+            outbox.add_outbox_messages(session, wallet_messages(2))
+            await session.commit()
+
+        async with sessions() as other, other.begin():
+            await other.execute(
+                select(func.pg_advisory_xact_lock(outbox.OUTBOX_RELAY_LOCK_ID))
+            )
+            assert await outbox.relay_outbox_batch() == 0
+
+        assert not broker.queues["wallet_updates"].messages
+        assert await outbox.relay_outbox_batch() == 2
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+
+from app.config.config import settings
+from app.queue.base_consumer import BaseQueueConsumer
+from app.queue.transport import InMemoryBroker, InMemoryTransport, OutgoingMessage
+
+
+class RecordingTransport(InMemoryTransport):
+    """Keeps every publish so tests can see which retry tier a message went to."""
+
+    def __init__(self, broker: InMemoryBroker, fail_exchange: str | None = None):
+        super().__init__(broker)
+        self.published = []
+        self.fail_exchange = fail_exchange
+
+    async def publish_many(self, exchange, messages):
+        if exchange == self.fail_exchange:
+            raise ConnectionError("broker unavailable")
+        self.published.extend((exchange, message) for message in messages)
+        await super().publish_many(exchange, messages)
+
+
+class FailingConsumer(BaseQueueConsumer):
+    def __init__(self, transport):
+        super().__init__("ledger", "ledger_updates", transport=transport)
+        self._operation_handlers = {"explode": self.explode}
+        self.calls = 0
+
+    async def explode(self, payload):
+        self.calls += 1
+        raise RuntimeError("boom")
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "QUEUE_RETRY_DELAYS_SECONDS", [0.01, 0.02])
+    monkeypatch.setattr(settings, "QUEUE_MAX_ATTEMPTS", 4)
+
+
+async def publish(transport, headers=None):
+    await transport.publish(
+        "central_operations",
+        OutgoingMessage(
+            json.dumps({"operation": "explode", "payload": {}}).encode(),
+            routing_key="ledger",
+            message_id="m-1",
+            headers=headers or {},
+        ),
+    )
+
+
+async def wait_for_messages(queue, timeout: float = 2):
+    async def settled():
+        while not queue.messages:
+            await asyncio.sleep(0.005)
+
+    await asyncio.wait_for(settled(), timeout)
+
+
+@pytest.mark.asyncio
+class TestQueueRetries:
+    """Failed messages back off through the retry tiers, then land in the failed queue."""
+
+    async def test_failing_message_walks_retry_tiers_then_dead_letters(
+        self, fast_retries
+    ):
+        broker = InMemoryBroker()
+        transport = RecordingTransport(broker)
+        consumer = FailingConsumer(transport)
+        await consumer.start_consuming()
+        await publish(transport, headers={"x-trace": "abc"})
+
+        failed_queue = broker.queues["failed_ledger_updates"]
+        await wait_for_messages(failed_queue)
+        await consumer.stop_consuming()
+
+        retries = [
+            (message.routing_key, message.headers["x-attempt"])
+            for exchange, message in transport.published
+            if exchange == "ledger_retry"
+        ]
+        # The last delay repeats until QUEUE_MAX_ATTEMPTS
+        assert retries == [
+            ("ledger_updates_retry_0.01s", 1),
+            ("ledger_updates_retry_0.02s", 2),
+            ("ledger_updates_retry_0.02s", 3),
+        ]
+        assert consumer.calls == 4
+
+        dead = failed_queue.messages[0]
+        assert dead.message_id == "m-1"
+        assert dead.headers["x-attempt"] == 3
+        assert dead.headers["x-trace"] == "abc"
+        assert dead.headers["x-death"][0]["reason"] == "rejected"
+        assert not broker.queues["ledger_updates"].messages
+
+    async def test_original_is_kept_when_retry_publish_fails(self, fast_retries):
+        broker = InMemoryBroker()
+        transport = RecordingTransport(broker, fail_exchange="ledger_retry")
+        consumer = FailingConsumer(transport)
+        await consumer.connect()
+        await publish(transport)
+
+        deliveries = transport.consume("ledger_updates", prefetch_count=10)
+        await consumer.process_message(await anext(deliveries))
+        redelivered = await asyncio.wait_for(anext(deliveries), 1)
+
+        assert redelivered.redelivered
+        assert redelivered.message_id == "m-1"
+        assert not any(
+            queue.messages
+            for name, queue in broker.queues.items()
+            if name != "ledger_updates"
+        )
+
+    async def test_last_attempt_goes_straight_to_failed_queue(self, fast_retries):
+        broker = InMemoryBroker()
+        transport = RecordingTransport(broker)
+        consumer = FailingConsumer(transport)
+        await consumer.connect()
+        await publish(transport, headers={"x-attempt": 3})
+
+        deliveries = transport.consume("ledger_updates", prefetch_count=10)
+        await consumer.process_message(await anext(deliveries))
+
+        assert not [m for exchange, m in transport.published if exchange == "ledger_retry"]
+        assert len(broker.queues["failed_ledger_updates"].messages) == 1
+
+    async def test_failed_ack_does_not_reject_handled_message(self, fast_retries):
+        broker = InMemoryBroker()
+        transport = RecordingTransport(broker)
+        consumer = FailingConsumer(transport)
+        consumer._operation_handlers = {"explode": lambda payload: asyncio.sleep(0)}
+        await consumer.connect()
+        await publish(transport)
+
+        message = await anext(transport.consume("ledger_updates", prefetch_count=10))
+        # Settled already, so the ack after the handler raises
+        await message.ack()
+        await consumer.process_message(message)
+
+        assert not [m for exchange, m in transport.published if exchange == "ledger_retry"]
+        assert not broker.queues["failed_ledger_updates"].messages
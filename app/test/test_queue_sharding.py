@@ -0,0 +1,44 @@
+from collections import Counter
+from uuid import uuid4
+
+from app.config.config import settings
+from app.queue.sharding import jump_hash, routing_key_for, shard_for
+
+
+class TestWalletSharding:
+    """Wallet messages land on a stable shard that changes little when shards are added."""
+
+    def test_same_wallet_always_maps_to_same_shard(self):
+        wallet_id = str(uuid4())
+
+        assert len({shard_for(wallet_id, 8) for _ in range(5)}) == 1
+
+    def test_keys_spread_over_all_shards(self):
+        counts = Counter(shard_for(str(uuid4()), 4) for _ in range(4000))
+
+        assert set(counts) == {0, 1, 2, 3}
+        assert min(counts.values()) > 800
+
+    def test_adding_a_shard_only_moves_keys_into_it(self):
+        keys = [str(uuid4()) for _ in range(2000)]
+
+        moved = [key for key in keys if shard_for(key, 4) != shard_for(key, 5)]
+
+        assert all(shard_for(key, 5) == 4 for key in moved)
+        assert len(moved) < len(keys) * 0.3
+
+    def test_single_bucket(self):
+        assert jump_hash(123456789, 1) == 0
+
+    def test_wallet_routing_key_follows_shard_setting(self, monkeypatch):
+        wallet_id = str(uuid4())
+
+        monkeypatch.setattr(settings, "WALLET_QUEUE_SHARDS", 1)
+        assert routing_key_for("wallet", {"wallet_id": wallet_id}) == "wallet"
+
+        monkeypatch.setattr(settings, "WALLET_QUEUE_SHARDS", 4)
+        assert (
+            routing_key_for("wallet", {"wallet_id": wallet_id})
+            == f"wallet.{shard_for(wallet_id, 4)}"
+        )
+        assert routing_key_for("order_status", {"order_id": "1"}) == "order_status"
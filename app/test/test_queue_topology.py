@@ -0,0 +1,53 @@
+import pytest
+
+from app.config.config import settings
+from app.queue.order_consumer import OrderStatusQueueConsumer
+from app.queue.producer import CentralQueueProducer
+from app.queue.transport import InMemoryBroker, InMemoryTransport
+
+
+@pytest.mark.asyncio
+class TestQueueTopology:
+    """Publishing works before any consumer has declared its queue."""
+
+    @pytest.mark.parametrize("shards", [1, 3])
+    async def test_producer_declares_every_service_queue(self, shards, monkeypatch):
+        monkeypatch.setattr(settings, "WALLET_QUEUE_SHARDS", shards)
+        broker = InMemoryBroker()
+        producer = CentralQueueProducer(InMemoryTransport(broker))
+
+        await producer.publish_many(
+            [
+                {
+                    "service": "wallet",
+                    "operation": "update_wallet",
+                    "payload": {"wallet_id": f"w-{n}"},
+                }
+                for n in range(20)
+            ]
+            + [
+                {
+                    "service": "order_status",
+                    "operation": "update_order_status",
+                    "payload": {"order_id": "o-1"},
+                }
+            ]
+        )
+
+        wallet_queues = (
+            ["wallet_updates"]
+            if shards == 1
+            else [f"wallet_updates.{shard}" for shard in range(shards)]
+        )
+        assert sum(len(broker.queues[name].messages) for name in wallet_queues) == 20
+        assert len(broker.queues["order_status_updates"].messages) == 1
+
+    async def test_consumer_declares_the_same_queue(self):
+        broker = InMemoryBroker()
+        producer = CentralQueueProducer(InMemoryTransport(broker))
+        await producer.connect()
+        declared = {name: queue.arguments for name, queue in broker.queues.items()}
+
+        await OrderStatusQueueConsumer(InMemoryTransport(broker)).connect()
+
+        assert {name: queue.arguments for name, queue in broker.queues.items()} == declared
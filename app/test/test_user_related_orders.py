@@ -0,0 +1,163 @@
+import base64
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Delivery, Order, User
+from app.schemas.delivery_schemas import DeliveryType
+from app.schemas.order_schema import OrderType
+from app.schemas.status_schema import UserType
+from app.services.order_service import (
+    decode_order_cursor,
+    encode_order_cursor,
+    get_user_related_orders,
+)
+
+BASE_URL = "/api/orders"
+
+
+def make_user(user_type: UserType = UserType.CUSTOMER) -> User:
+    return User(
+        email=f"{uuid.uuid4().hex[:12]}@example.com",
+        password="hashed",
+        user_type=user_type,
+    )
+
+
+def make_order(owner: User, vendor: User, updated_at: datetime) -> Order:
+    return Order(
+        owner_id=owner.id,
+        vendor_id=vendor.id,
+        order_type=OrderType.PACKAGE,
+        total_price=Decimal("1000.00"),
+        amount_due_vendor=Decimal("900.00"),
+        updated_at=updated_at,
+    )
+
+
+def make_delivery(order: Order, sender: User, dispatch=None, rider=None) -> Delivery:
+    return Delivery(
+        order_id=order.id,
+        sender_id=sender.id,
+        dispatch_id=dispatch.id if dispatch else None,
+        rider_id=rider.id if rider else None,
+        sender_phone_number="+2348000000000",
+        pickup_coordinates=[6.5, 3.3],
+        dropoff_coordinates=[6.6, 3.4],
+        delivery_fee=Decimal("1500.00"),
+        amount_due_dispatch=Decimal("1275.00"),
+        distance=Decimal("4.2"),
+        duration="15 mins",
+        origin="Ikeja",
+        destination="Yaba",
+        delivery_type=DeliveryType.PACKAGE,
+    )
+
+
+async def walk_pages(session: AsyncSession, user_id, limit: int) -> list:
+    ids, cursor = [], None
+    while True:
+        page = await get_user_related_orders(
+            db=session, user_id=user_id, cursor=cursor, limit=limit
+        )
+        assert len(page.data) <= limit
+        ids.extend(response.order.id for response in page.data)
+        if page.next_cursor is None:
+            return ids
+        cursor = page.next_cursor
+
+
+class TestOrderCursor:
+    """Cursors carry (updated_at, id) and reject anything else with a 400."""
+
+    def test_round_trip(self):
+        updated_at, order_id = datetime(2025, 3, 4, 5, 6, 7, 891011), uuid.uuid4()
+
+        assert decode_order_cursor(encode_order_cursor(updated_at, order_id)) == (
+            updated_at,
+            order_id,
+        )
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not base64!",
+            base64.urlsafe_b64encode(b"no separator").decode(),
+            base64.urlsafe_b64encode(b"2025-01-01T00:00:00|not-a-uuid").decode(),
+            base64.urlsafe_b64encode(f"yesterday|{uuid.uuid4()}".encode()).decode(),
+            base64.urlsafe_b64encode(b"\xff\xfe|\x00").decode(),
+        ],
+    )
+    def test_malformed_cursor_is_rejected(self, cursor):
+        with pytest.raises(HTTPException) as exc_info:
+            decode_order_cursor(cursor)
+
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_malformed_cursor_returns_400(self, client: AsyncClient):
+        response = await client.get(
+            f"{BASE_URL}/{uuid.uuid4()}/user-related-orders",
+            params={"cursor": "not base64!", "limit": 5},
+        )
+
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+class TestUserRelatedOrders:
+    """Keyset pages over the owner, vendor, dispatch and rider branches."""
+
+    async def test_pages_cover_every_role_without_duplicates_or_gaps(
+        self, session: AsyncSession
+    ):
+        user, other, dispatch, rider = (
+            make_user(),
+            make_user(UserType.RESTAURANT_VENDOR),
+            make_user(UserType.DISPATCH),
+            make_user(UserType.RIDER),
+        )
+        session.add_all([user, other, dispatch, rider])
+        await session.flush()
+
+        base = datetime(2025, 1, 1, 12, 0, 0)
+        as_owner = [make_order(user, other, base + timedelta(minutes=m)) for m in (1, 2)]
+        as_vendor = [make_order(other, user, base + timedelta(minutes=m)) for m in (3, 3)]
+        as_dispatch = make_order(other, other, base + timedelta(minutes=4))
+        as_rider = make_order(other, other, base + timedelta(minutes=5))
+        # Matches both the owner and the dispatch branch
+        owner_and_dispatch = make_order(user, other, base + timedelta(minutes=6))
+        unrelated = make_order(other, other, base + timedelta(minutes=7))
+        related = [*as_owner, *as_vendor, as_dispatch, as_rider, owner_and_dispatch]
+        session.add_all([*related, unrelated])
+        await session.flush()
+
+        session.add_all(
+            [
+                make_delivery(as_dispatch, other, dispatch=user),
+                make_delivery(as_rider, other, dispatch=dispatch, rider=user),
+                make_delivery(owner_and_dispatch, user, dispatch=user),
+                make_delivery(unrelated, other, dispatch=dispatch, rider=rider),
+            ]
+        )
+        await session.flush()
+
+        expected = [
+            order.id
+            for order in sorted(
+                related, key=lambda order: (order.updated_at, order.id), reverse=True
+            )
+        ]
+        for limit in (1, 2, 3, len(related), len(related) + 1):
+            assert await walk_pages(session, user.id, limit) == expected
+
+    async def test_user_without_orders_gets_an_empty_page(self, session: AsyncSession):
+        page = await get_user_related_orders(db=session, user_id=uuid.uuid4(), limit=5)
+
+        assert page.data == []
+        assert page.next_cursor is None
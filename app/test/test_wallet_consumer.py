@@ -0,0 +1,64 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Transaction, User, Wallet
+from app.queue.wallet_consumer import WalletQueueConsumer
+from app.schemas.status_schema import TransactionType, UserType
+
+
+async def make_wallet(session: AsyncSession) -> Wallet:
+    user = User(
+        email=f"{uuid.uuid4().hex[:12]}@example.com",
+        password="hashed",
+        user_type=UserType.CUSTOMER,
+    )
+    session.add(user)
+    await session.flush()
+    wallet = Wallet(id=user.id, balance=Decimal("0"), escrow_balance=Decimal("0"))
+    session.add(wallet)
+    await session.flush()
+    return wallet
+
+
+@pytest.mark.asyncio
+class TestTransactionUpdate:
+    """An update that overtakes its create_transaction is retried, not dropped."""
+
+    async def test_update_applies_to_existing_transaction(self, session: AsyncSession):
+        wallet = await make_wallet(session)
+        tx_ref = uuid.uuid1()
+        session.add(
+            Transaction(
+                wallet_id=wallet.id,
+                tx_ref=tx_ref,
+                amount=Decimal("500"),
+                transaction_type=TransactionType.FUND_WALLET,
+            )
+        )
+        await session.flush()
+
+        await WalletQueueConsumer._apply_transaction_update(
+            session,
+            {"wallet_id": str(wallet.id), "tx_ref": str(tx_ref), "to_user": "Ada"},
+        )
+
+        assert await session.scalar(
+            select(Transaction.to_user).where(Transaction.tx_ref == tx_ref)
+        ) == "Ada"
+
+    async def test_update_before_create_raises(self, session: AsyncSession):
+        wallet = await make_wallet(session)
+
+        with pytest.raises(ValueError):
+            await WalletQueueConsumer._apply_transaction_update(
+                session,
+                {
+                    "wallet_id": str(wallet.id),
+                    "tx_ref": str(uuid.uuid1()),
+                    "to_user": "Ada",
+                },
+            )
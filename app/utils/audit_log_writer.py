@@ -0,0 +1,231 @@
+import asyncio
+import glob
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config.config import settings
+from app.database.database import async_session
+from app.models.models import AuditLog
+from app.utils.logger_config import setup_logger
+
+logger = setup_logger()
+
+# Entries waiting to be written, oldest first
+_pending_entries: deque[dict] = deque()
+
+_flush_lock = asyncio.Lock()
+_flush_requested = asyncio.Event()
+# Flushes in a row that failed on the batch at the front of the buffer
+_failed_flushes = 0
+
+
+def _json_safe(value):
+    """Round-trip through JSON so a bad value fails here, not in the batch insert"""
+    if value is None:
+        return None
+    return json.loads(json.dumps(value, default=str))
+
+
+def record_audit_log(
+    *,
+    actor_id: UUID,
+    actor_name: str,
+    actor_role,
+    action: str,
+    resource_type: str,
+    resource_id: UUID | None = None,
+    resource_summary: str | None = None,
+    changes: dict | None = None,
+    ip_address: str | None = None,
+    extra_metadata: dict | None = None,
+) -> None:
+    """
+    Queue an audit log entry for the background writer.
+    Call it after the audited change has been committed; the entry keeps the
+    time it was recorded, not the time it is flushed.
+    """
+    _pending_entries.append(
+        {
+            "id": uuid4(),
+            "timestamp": datetime.now(),
+            "actor_id": actor_id,
+            "actor_name": actor_name,
+            "actor_role": str(getattr(actor_role, "value", actor_role)),
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "resource_summary": resource_summary,
+            "changes": _json_safe(changes),
+            "ip_address": ip_address,
+            "extra_metadata": _json_safe(extra_metadata),
+        }
+    )
+    if len(_pending_entries) >= settings.AUDIT_LOG_BATCH_SIZE:
+        _flush_requested.set()
+
+
+async def _insert_entries(entries: list[dict]) -> None:
+    async with async_session() as session:
+        # Ids are assigned at record time, so re-sending a batch that did commit
+        # before an error is a no-op
+        await session.execute(
+            insert(AuditLog.__table__).on_conflict_do_nothing(), entries
+        )
+        await session.commit()
+
+
+async def _insert_one_by_one(batch: list[dict]) -> int:
+    """Insert a batch that keeps failing row by row, spilling the rows that fail"""
+    written, failed = 0, []
+    for index, entry in enumerate(batch):
+        try:
+            await _insert_entries([entry])
+        except Exception as e:
+            logger.error(f"Error writing audit log entry {entry['id']}: {str(e)}")
+            failed.append(entry)
+        except BaseException:
+            _pending_entries.extendleft(reversed(failed + batch[index:]))
+            raise
+        else:
+            written += 1
+    if failed:
+        _spill_entries(failed)
+    return written
+
+
+async def flush_audit_logs() -> int:
+    """
+    Write buffered entries with multi-row inserts, AUDIT_LOG_BATCH_SIZE rows per statement.
+    A failed batch goes back to the front of the buffer. Once the same batch has failed
+    AUDIT_LOG_BATCH_ATTEMPTS flushes in a row it is written row by row and the rows
+    that still fail are spilled, so one bad entry cannot hold up the rest. Past
+    AUDIT_LOG_MAX_PENDING entries, the newest are spilled. Returns the number written.
+    """
+    global _failed_flushes
+    async with _flush_lock:
+        written = 0
+        while _pending_entries:
+            batch = [
+                _pending_entries.popleft()
+                for _ in range(min(settings.AUDIT_LOG_BATCH_SIZE, len(_pending_entries)))
+            ]
+            if _failed_flushes >= settings.AUDIT_LOG_BATCH_ATTEMPTS:
+                _failed_flushes = 0
+                written += await _insert_one_by_one(batch)
+                continue
+            try:
+                await _insert_entries(batch)
+            except BaseException as e:
+                # Includes cancellation mid-flush; nothing popped is lost
+                _pending_entries.extendleft(reversed(batch))
+                if isinstance(e, Exception):
+                    _failed_flushes += 1
+                    logger.error(
+                        f"Error flushing audit logs, {len(_pending_entries)} pending: {str(e)}"
+                    )
+                    overflow = len(_pending_entries) - settings.AUDIT_LOG_MAX_PENDING
+                    if overflow > 0:
+                        newest = [_pending_entries.pop() for _ in range(overflow)]
+                        _spill_entries(newest[::-1])
+                raise
+            _failed_flushes = 0
+            written += len(batch)
+
+        if written:
+            logger.info(f"Flushed {written} audit log entries")
+        return written
+
+
+def _spill_entries(entries: list[dict]) -> None:
+    """
+    Write entries that could not be inserted to a new file beside AUDIT_LOG_SPILL_PATH.
+    Every spill gets its own file, named so that older spills sort first.
+    """
+    path = f"{settings.AUDIT_LOG_SPILL_PATH}.{time.time_ns()}.{os.getpid()}"
+    with open(f"{path}.tmp", "w") as spill:
+        for entry in entries:
+            spill.write(json.dumps(entry, default=str) + "\n")
+    # Only complete files carry the spill name a restoring process looks for
+    os.replace(f"{path}.tmp", path)
+    logger.warning(f"Spilled {len(entries)} audit log entries to {path}")
+
+
+def _spilled_files() -> list[str]:
+    base = settings.AUDIT_LOG_SPILL_PATH
+    paths = [
+        path
+        for path in sorted(glob.glob(f"{glob.escape(base)}.*"))
+        if not path.endswith((".tmp", ".restoring"))
+    ]
+    # Written by earlier versions, which appended every spill to one file
+    if os.path.exists(base):
+        paths.insert(0, base)
+    return paths
+
+
+def _restore_spilled_entries() -> None:
+    """
+    Re-queue entries spilled by earlier runs. A file is renamed before it
+    is read, so when several workers start at once each file is restored by one.
+    """
+    restored = []
+    for path in _spilled_files():
+        claimed = f"{path}.{os.getpid()}.restoring"
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            continue
+        with open(claimed) as spill:
+            for line in spill:
+                if line.strip():
+                    entry = json.loads(line)
+                    entry["id"] = UUID(entry["id"])
+                    entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+                    entry["actor_id"] = UUID(entry["actor_id"])
+                    if entry["resource_id"]:
+                        entry["resource_id"] = UUID(entry["resource_id"])
+                    restored.append(entry)
+        os.remove(claimed)
+
+    if restored:
+        _pending_entries.extendleft(reversed(restored))
+        logger.info(f"Restored {len(restored)} spilled audit log entries")
+
+
+async def run_audit_log_writer() -> None:
+    """
+    Flush audit logs every AUDIT_LOG_FLUSH_SECONDS, or sooner once a batch is full,
+    until cancelled. On shutdown everything pending is written, retrying a few times
+    before spilling to disk for the next start.
+    """
+    _restore_spilled_entries()
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    _flush_requested.wait(), timeout=settings.AUDIT_LOG_FLUSH_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            _flush_requested.clear()
+            try:
+                await flush_audit_logs()
+            except Exception:
+                # Entries stay buffered; back off before retrying
+                await asyncio.sleep(settings.AUDIT_LOG_FLUSH_SECONDS)
+    finally:
+        for attempt in range(settings.AUDIT_LOG_SHUTDOWN_RETRIES):
+            try:
+                await flush_audit_logs()
+                break
+            except Exception:
+                await asyncio.sleep(2**attempt)
+        if _pending_entries:
+            _spill_entries(list(_pending_entries))
+            _pending_entries.clear()
@@ -1,7 +1,38 @@
-from datetime import datetime, timedelta
-from sqlalchemy import insert, select, update
-from app.models.models import AuditLog, User
-from app.database.database import async_session
+import re
+from datetime import date, datetime, timedelta
+from sqlalchemy import (
+    JSON,
+    String,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    update,
+)
+from app.models.archive_model import (
+    archived_deliveries,
+    archived_order_items,
+    archived_orders,
+)
+from app.models.models import (
+    AuditLog,
+    Delivery,
+    Order,
+    OrderItem,
+    OutboxMessage,
+    ProcessedMessage,
+    User,
+    UserReport,
+)
+from app.auth.user_cache import invalidate_auth_user
+from app.schemas.status_schema import DeliveryStatus, OrderStatus
+from app.database.database import async_session, engine
+from app.config.config import redis_client, settings
 from app.utils.logger_config import setup_logger
 
 # import logging
@@ -10,65 +41,90 @@ from app.utils.logger_config import setup_logger
 logger = setup_logger()
 
 
-async def suspend_user_with_order_cancel_count_equal_3():
+async def suspend_user_with_order_cancel_count_equal_3() -> list:
     """
-    Suspend users who have cancelled 3 orders
+    Suspend users who have cancelled 3 orders.
+    The UPDATE and the audit rows are written by one statement in one transaction;
+    returns the ids of the suspended users.
     """
-    async with async_session() as session:
-        try:
-            # Find users with 3 cancellations
-            result = await session.execute(
-                select(User).where(
-                    User.order_cancel_count == 3,
-                    User.rider_is_suspended_for_order_cancel == False,
-                )
-            )
-            users = result.scalars().all()
+    now = datetime.now()
+    suspension_until = now + timedelta(days=3)
 
-            if not users:
-                logger.info("No users found with 3 order cancellations")
-                return
+    suspended = (
+        update(User)
+        .where(
+            User.order_cancel_count == 3,
+            User.rider_is_suspended_for_order_cancel == False,
+        )
+        .values(
+            rider_is_suspended_for_order_cancel=True,
+            rider_is_suspension_until=suspension_until,
+        )
+        .returning(User.id, User.email, User.user_type)
+        .cte("suspended")
+    )
 
-            suspension_until = datetime.now() + timedelta(days=3)
+    audit_rows = select(
+        func.gen_random_uuid(),
+        literal(now),
+        suspended.c.id,
+        func.coalesce(suspended.c.email, "unknown"),
+        cast(suspended.c.user_type, String),
+        literal("auto_suspend_user"),
+        literal("User"),
+        suspended.c.id,
+        suspended.c.email,
+        literal(
+            {
+                "rider_is_suspended_for_order_cancel": [False, True],
+                "rider_is_suspension_until": [None, suspension_until.isoformat()],
+            },
+            JSON,
+        ),
+        literal({"reason": "3 order cancellations (auto)"}, JSON),
+    )
 
-            # Update users in bulk
-            await session.execute(
-                update(User)
-                .where(User.id.in_([user.id for user in users]))
-                .values(
-                    rider_is_suspended_for_order_cancel=True,
-                    rider_is_suspension_until=suspension_until,
-                )
-            )
-
-            await session.commit()
-            logger.info(f"Suspended {len(users)} users until {suspension_until}")
-
-            # --- AUDIT LOG ---
-            for user in users:
-                await session.exeute(
-                    insert(AuditLog).values(
-                        actor_id=user.id,
-                        actor_name=getattr(user, "email", "unknown"),
-                        actor_role=str(getattr(user, "user_type", "unknown")),
-                        action="auto_suspend_user",
-                        resource_type="User",
-                        resource_id=user.id,
-                        resource_summary=user.email,
-                        changes={
-                            "rider_is_suspended_for_order_cancel": [False, True],
-                            "rider_is_suspension_until": [None, suspension_until],
-                        },
-                        extra_metadata={"reason": "3 order cancellations (auto)"},
-                    )
-                )
-                await session.commit()
+    stmt = (
+        insert(AuditLog)
+        .add_cte(suspended)
+        .from_select(
+            [
+                AuditLog.id,
+                AuditLog.timestamp,
+                AuditLog.actor_id,
+                AuditLog.actor_name,
+                AuditLog.actor_role,
+                AuditLog.action,
+                AuditLog.resource_type,
+                AuditLog.resource_id,
+                AuditLog.resource_summary,
+                AuditLog.changes,
+                AuditLog.extra_metadata,
+            ],
+            audit_rows,
+        )
+        .returning(AuditLog.resource_id)
+    )
 
+    async with async_session() as session:
+        try:
+            async with session.begin():
+                result = await session.execute(stmt)
+                suspended_ids = result.scalars().all()
         except Exception as e:
-            await session.rollback()
             logger.error(f"Error suspending users: {str(e)}")
             raise
 
+    # The rider pickup check reads the suspension from the auth user cache
+    for user_id in suspended_ids:
+        invalidate_auth_user(user_id)
+
+    if not suspended_ids:
+        logger.info("No users found with 3 order cancellations")
+    else:
+        logger.info(f"Suspended {len(suspended_ids)} users until {suspension_until}")
+    return suspended_ids
+
 
 async def reset_user_suspension():
     """
@@ -103,9 +159,244 @@ async def reset_user_suspension():
             )
 
             await session.commit()
+            for user in users:
+                invalidate_auth_user(user.id)
             logger.info(f"Reset suspension for {len(users)} users")
 
         except Exception as e:
             await session.rollback()
             logger.error(f"Error resetting user suspensions: {str(e)}")
             raise
+
+
+VENDOR_REVIEW_STATS_STALE_KEY = "vendor_review_stats:stale"
+
+
+def mark_vendor_review_stats_stale():
+    """
+    Flag the vendor_review_stats view for the next refresh run
+    """
+    redis_client.set(VENDOR_REVIEW_STATS_STALE_KEY, "1")
+
+
+async def refresh_vendor_review_stats(force: bool = False):
+    """
+    Refresh the vendor_review_stats materialized view if reviews changed since the last run
+    """
+    if not force and not redis_client.get(VENDOR_REVIEW_STATS_STALE_KEY):
+        logger.info("vendor_review_stats is up to date, skipping refresh")
+        return
+
+    # Clear the flag first so reviews written during the refresh trigger another run
+    redis_client.delete(VENDOR_REVIEW_STATS_STALE_KEY)
+
+    try:
+        # CONCURRENTLY cannot run inside a transaction block
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(
+                text("REFRESH MATERIALIZED VIEW CONCURRENTLY vendor_review_stats")
+            )
+
+        keys = redis_client.keys("restaurant_vendors:*")
+        if keys:
+            redis_client.delete(*keys)
+        redis_client.delete("laundry_vendors")
+
+        logger.info("Refreshed vendor_review_stats")
+
+    except Exception as e:
+        mark_vendor_review_stats_stale()
+        logger.error(f"Error refreshing vendor_review_stats: {str(e)}")
+        raise
+
+
+# Monthly range-partitioned tables: table -> months kept attached
+PARTITIONED_TABLES = {
+    "transactions": settings.TRANSACTIONS_RETENTION_MONTHS,
+    "audit_logs": settings.AUDIT_LOGS_RETENTION_MONTHS,
+}
+PARTITION_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+def _add_months(value: date, months: int) -> date:
+    month = value.month - 1 + months
+    return date(value.year + month // 12, month % 12 + 1, 1)
+
+
+async def maintain_time_partitions():
+    """
+    Create monthly partitions PARTITION_PREMAKE_MONTHS ahead and move partitions past
+    their retention into the archive schema, where they stay queryable but are
+    no longer scanned or vacuumed as part of the live table.
+    """
+    today = date.today()
+    try:
+        # DETACH ... CONCURRENTLY cannot run inside a transaction block
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(
+                text(f"CREATE SCHEMA IF NOT EXISTS {settings.PARTITION_ARCHIVE_SCHEMA}")
+            )
+
+            for table, retention_months in PARTITIONED_TABLES.items():
+                result = await conn.execute(
+                    text(
+                        """
+                        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+                        FROM pg_inherits i
+                        JOIN pg_class c ON c.oid = i.inhrelid
+                        WHERE i.inhparent = CAST(:table AS regclass)
+                        """
+                    ),
+                    {"table": table},
+                )
+                partitions = {
+                    name: datetime.fromisoformat(
+                        PARTITION_UPPER_BOUND.search(bound).group(1)
+                    ).date()
+                    for name, bound in result.all()
+                }
+
+                # Future partitions continue from the highest existing bound
+                start = max(partitions.values(), default=_add_months(today, 0))
+                horizon = _add_months(today, settings.PARTITION_PREMAKE_MONTHS + 1)
+                while start < horizon:
+                    end = _add_months(start, 1)
+                    await conn.execute(
+                        text(
+                            f"CREATE TABLE IF NOT EXISTS {table}_p{start:%Y%m} "
+                            f"PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"
+                        )
+                    )
+                    logger.info(f"Created partition {table}_p{start:%Y%m}")
+                    start = end
+
+                cutoff = _add_months(today, -retention_months)
+                for name, upper_bound in partitions.items():
+                    if upper_bound > cutoff:
+                        continue
+                    await conn.execute(
+                        text(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY")
+                    )
+                    await conn.execute(
+                        text(
+                            f"ALTER TABLE {name} SET SCHEMA {settings.PARTITION_ARCHIVE_SCHEMA}"
+                        )
+                    )
+                    logger.info(
+                        f"Archived partition {name} to {settings.PARTITION_ARCHIVE_SCHEMA}"
+                    )
+
+    except Exception as e:
+        logger.error(f"Error maintaining time partitions: {str(e)}")
+        raise
+
+
+TERMINAL_ORDER_STATUSES = [
+    OrderStatus.RECEIVED,
+    OrderStatus.CANCELLED,
+    OrderStatus.REJECTED,
+    OrderStatus.RECEIVED_REJECTED_PRODUCT,
+]
+TERMINAL_DELIVERY_STATUSES = [DeliveryStatus.RECEIVED, DeliveryStatus.CANCELLED]
+
+# live table -> (archive table, column linking rows to the order), in copy order
+ORDER_ARCHIVE_TABLES = (
+    (Order.__table__, archived_orders, Order.__table__.c.id),
+    (OrderItem.__table__, archived_order_items, OrderItem.__table__.c.order_id),
+    (Delivery.__table__, archived_deliveries, Delivery.__table__.c.order_id),
+)
+
+
+async def archive_completed_orders() -> int:
+    """
+    Move terminal orders untouched for ORDER_ARCHIVE_AFTER_DAYS, with their items and
+    delivery, into the archive tables. Each batch of ORDER_ARCHIVE_BATCH_SIZE orders
+    is copied and deleted in its own transaction. Orders with reports are kept live.
+    Returns the number of orders archived.
+    """
+    cutoff = datetime.now() - timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS)
+    archived = 0
+
+    try:
+        while True:
+            async with async_session() as session:
+                async with session.begin():
+                    result = await session.execute(
+                        select(Order.id)
+                        .outerjoin(Delivery, Delivery.order_id == Order.id)
+                        .where(
+                            Order.order_status.in_(TERMINAL_ORDER_STATUSES),
+                            Order.updated_at < cutoff,
+                            or_(
+                                Delivery.id.is_(None),
+                                Delivery.delivery_status.in_(TERMINAL_DELIVERY_STATUSES),
+                            ),
+                            ~exists().where(UserReport.order_id == Order.id),
+                        )
+                        .limit(settings.ORDER_ARCHIVE_BATCH_SIZE)
+                        .with_for_update(of=Order, skip_locked=True)
+                    )
+                    order_ids = result.scalars().all()
+                    if not order_ids:
+                        break
+
+                    for live, archive, order_column in ORDER_ARCHIVE_TABLES:
+                        await session.execute(
+                            insert(archive).from_select(
+                                [column.name for column in live.columns],
+                                select(*live.columns).where(order_column.in_(order_ids)),
+                            )
+                        )
+                    for live, _, order_column in reversed(ORDER_ARCHIVE_TABLES):
+                        await session.execute(
+                            delete(live).where(order_column.in_(order_ids))
+                        )
+
+            archived += len(order_ids)
+            if len(order_ids) < settings.ORDER_ARCHIVE_BATCH_SIZE:
+                break
+
+    except Exception as e:
+        logger.error(f"Error archiving completed orders: {str(e)}")
+        raise
+
+    logger.info(f"Archived {archived} completed orders")
+    return archived
+
+
+async def purge_processed_messages() -> int:
+    """Forget queue message ids older than QUEUE_PROCESSED_MESSAGE_RETENTION_DAYS"""
+    cutoff = datetime.now() - timedelta(
+        days=settings.QUEUE_PROCESSED_MESSAGE_RETENTION_DAYS
+    )
+    try:
+        async with async_session() as session:
+            async with session.begin():
+                result = await session.execute(
+                    delete(ProcessedMessage).where(ProcessedMessage.processed_at < cutoff)
+                )
+    except Exception as e:
+        logger.error(f"Error purging processed messages: {str(e)}")
+        raise
+
+    logger.info(f"Purged {result.rowcount} processed message ids")
+    return result.rowcount
+
+
+async def purge_sent_outbox_messages() -> int:
+    """Delete outbox rows published more than OUTBOX_RETENTION_DAYS ago"""
+    cutoff = datetime.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    try:
+        async with async_session() as session:
+            async with session.begin():
+                result = await session.execute(
+                    delete(OutboxMessage).where(OutboxMessage.sent_at < cutoff)
+                )
+    except Exception as e:
+        logger.error(f"Error purging sent outbox messages: {str(e)}")
+        raise
+
+    logger.info(f"Purged {result.rowcount} sent outbox messages")
+    return result.rowcount
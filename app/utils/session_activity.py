@@ -0,0 +1,101 @@
+import asyncio
+import time
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import and_, bindparam, update
+
+from app.config.config import settings
+from app.database.database import async_session
+from app.models.models import Session
+from app.utils.logger_config import setup_logger
+
+logger = setup_logger()
+
+# user_id -> last activity seen since the previous flush
+_pending_activity: dict[UUID, datetime] = {}
+# user_id -> monotonic time activity was last accepted for that user
+_last_recorded: dict[UUID, float] = {}
+
+_flush_lock = asyncio.Lock()
+
+
+def record_session_activity(user_id: UUID) -> None:
+    """
+    Note that a user was active without touching the database.
+    Activity is accepted at most once per SESSION_ACTIVITY_INTERVAL_SECONDS per user
+    and written to sessions by flush_session_activity.
+    """
+    now = time.monotonic()
+    last = _last_recorded.get(user_id)
+    if last is not None and now - last < settings.SESSION_ACTIVITY_INTERVAL_SECONDS:
+        return
+
+    _last_recorded[user_id] = now
+    _pending_activity[user_id] = datetime.now()
+
+
+async def flush_session_activity() -> int:
+    """
+    Write buffered activity to active sessions in one batched UPDATE.
+    Returns the number of users flushed.
+    """
+    async with _flush_lock:
+        if not _pending_activity:
+            return 0
+
+        batch = dict(_pending_activity)
+        _pending_activity.clear()
+
+        stmt = (
+            update(Session.__table__)
+            .where(
+                and_(
+                    Session.__table__.c.user_id == bindparam("b_user_id"),
+                    Session.__table__.c.is_active == True,
+                )
+            )
+            .values(last_active=bindparam("b_last_active"))
+        )
+
+        try:
+            async with async_session() as session:
+                await session.execute(
+                    stmt,
+                    [
+                        {"b_user_id": user_id, "b_last_active": last_active}
+                        for user_id, last_active in batch.items()
+                    ],
+                )
+                await session.commit()
+        except Exception as e:
+            # Put the batch back, keeping anything newer recorded meanwhile
+            for user_id, last_active in batch.items():
+                _pending_activity.setdefault(user_id, last_active)
+            logger.error(f"Error flushing session activity: {str(e)}")
+            raise
+
+        # Drop throttle entries that can no longer suppress a write
+        cutoff = time.monotonic() - settings.SESSION_ACTIVITY_INTERVAL_SECONDS
+        for user_id in [u for u, t in _last_recorded.items() if t < cutoff]:
+            _last_recorded.pop(user_id, None)
+
+        logger.info(f"Flushed session activity for {len(batch)} users")
+        return len(batch)
+
+
+async def run_session_activity_flusher() -> None:
+    """Flush buffered session activity every SESSION_ACTIVITY_FLUSH_SECONDS until cancelled"""
+    try:
+        while True:
+            await asyncio.sleep(settings.SESSION_ACTIVITY_FLUSH_SECONDS)
+            try:
+                await flush_session_activity()
+            except Exception:
+                pass
+    finally:
+        # Final flush on shutdown so recent activity is not lost
+        try:
+            await flush_session_activity()
+        except Exception:
+            pass
@@ -0,0 +1,152 @@
+"""
+Queue worker: runs the queue consumers in their own process, apart from the web app.
+
+    python -m app.worker [--consumers wallet,order_status] [--concurrency N] [--prefetch N]
+                         [--wallet-shards 0,1]
+
+Consumers also run inside the web app until QUEUE_CONSUMERS_IN_WEB is set to false
+there. The same image runs the worker with this command in place of uvicorn.
+
+With WALLET_QUEUE_SHARDS > 1, run one worker per wallet shard (--consumers wallet
+--wallet-shards N) to spread wallet updates; each shard still has a single active
+consumer, so updates to one wallet are handled in delivery order. A failed message
+is retried from a delay queue, after later updates to the same wallet.
+
+SIGTERM or SIGINT stops new deliveries and lets in-flight handlers finish for up to
+QUEUE_DRAIN_TIMEOUT_SECONDS before the connection is closed.
+"""
+import argparse
+import asyncio
+import os
+import signal
+
+from app.config.config import settings
+
+os.environ["TZ"] = settings.TZ
+
+import logfire
+
+from app.database.database import engine
+from app.queue.order_consumer import OrderStatusQueueConsumer
+from app.queue.queue_metrics import run_queue_metrics_publisher
+from app.queue.sharding import wallet_shards
+from app.queue.wallet_consumer import WalletQueueConsumer
+from app.utils.logger_config import setup_logger
+
+logger = setup_logger()
+
+CONSUMERS = {
+    "wallet": WalletQueueConsumer,
+    "order_status": OrderStatusQueueConsumer,
+}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.worker")
+    parser.add_argument(
+        "--consumers",
+        default=",".join(CONSUMERS),
+        help="Comma separated consumers to run (default: all)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.QUEUE_MAX_CONCURRENCY,
+        help="Handlers running at once per consumer",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=settings.QUEUE_PREFETCH_COUNT,
+        help="Unacked messages delivered to each consumer",
+    )
+    parser.add_argument(
+        "--wallet-shards",
+        help="Comma separated wallet queue shards to consume (default: all)",
+    )
+    args = parser.parse_args(argv)
+    args.consumers = [name.strip() for name in args.consumers.split(",") if name.strip()]
+    unknown = set(args.consumers) - set(CONSUMERS)
+    if unknown:
+        parser.error(f"Unknown consumers: {', '.join(sorted(unknown))}")
+
+    shards = wallet_shards()
+    if args.wallet_shards is None:
+        args.wallet_shards = shards
+    elif shards == [None]:
+        parser.error("--wallet-shards needs WALLET_QUEUE_SHARDS > 1")
+    else:
+        try:
+            args.wallet_shards = [
+                int(shard) for shard in args.wallet_shards.split(",") if shard.strip()
+            ]
+        except ValueError:
+            parser.error("--wallet-shards takes shard numbers")
+        invalid = set(args.wallet_shards) - set(shards)
+        if invalid:
+            parser.error(
+                f"Wallet shards must be in 0..{len(shards) - 1}, got "
+                f"{', '.join(map(str, sorted(invalid)))}"
+            )
+    return args
+
+
+def build_consumers(args: argparse.Namespace) -> list:
+    consumers = []
+    for name in args.consumers:
+        if name == "wallet":
+            consumers.extend(
+                WalletQueueConsumer(shard=shard) for shard in args.wallet_shards
+            )
+        else:
+            consumers.append(CONSUMERS[name]())
+    return consumers
+
+
+async def run_worker(args: argparse.Namespace) -> None:
+    settings.QUEUE_MAX_CONCURRENCY = args.concurrency
+    settings.QUEUE_PREFETCH_COUNT = args.prefetch
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    # Built after the overrides above, which the consumers read on construction
+    consumers = build_consumers(args)
+    metrics_task = None
+    try:
+        for consumer in consumers:
+            await consumer.start_consuming()
+        logger.info(
+            f"Worker consuming {', '.join(consumer.queue_name for consumer in consumers)} "
+            f"(concurrency {args.concurrency}, prefetch {args.prefetch})"
+        )
+
+        metrics_task = asyncio.create_task(run_queue_metrics_publisher(consumers))
+
+        await stop.wait()
+        logger.info("Worker draining...")
+    finally:
+        if metrics_task:
+            metrics_task.cancel()
+        await asyncio.gather(
+            *(
+                consumer.stop_consuming(
+                    drain_timeout=settings.QUEUE_DRAIN_TIMEOUT_SECONDS
+                )
+                for consumer in consumers
+            ),
+            return_exceptions=True,
+        )
+        logger.info("Worker stopped")
+
+
+def main(argv=None) -> None:
+    logfire.configure(service_name="ServiPal-worker")
+    logfire.instrument_sqlalchemy(engine=engine)
+    asyncio.run(run_worker(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the per-request session dependency.
+
+Compares the previous get_db (a new async_sessionmaker per request wrapped in a
+second retrying async generator) with the current get_db that reuses one factory.
+
+    python -m benchmarks.db_session --iterations 20000
+    python -m benchmarks.db_session --iterations 2000 --query   # include SELECT 1
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.database import engine, get_db
+
+
+async def legacy_get_db():
+    """The dependency as it was: factory per request plus a retry generator layer"""
+
+    async def inner():
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
+
+    for _ in range(3):
+        async for session in inner():
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
+        return
+
+
+async def drive(dependency, iterations: int, query: bool) -> float:
+    """Run the dependency the way FastAPI does and return seconds per request"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        generator = dependency()
+        session: AsyncSession = await generator.__anext__()
+        if query:
+            await session.execute(text("SELECT 1"))
+        try:
+            await generator.__anext__()
+        except StopAsyncIteration:
+            pass
+    return (time.perf_counter() - start) / iterations
+
+
+async def main(iterations: int, query: bool):
+    # Warm up the pool and code paths
+    await drive(get_db, 100, query)
+    await drive(legacy_get_db, 100, query)
+
+    legacy = await drive(legacy_get_db, iterations, query)
+    current = await drive(get_db, iterations, query)
+
+    print(f"iterations: {iterations} (query={query})")
+    print(f"legacy get_db : {legacy * 1e6:8.1f} us/request")
+    print(f"current get_db: {current * 1e6:8.1f} us/request")
+    print(f"saved         : {(legacy - current) * 1e6:8.1f} us/request")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the session dependency")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument(
+        "--query", action="store_true", help="Execute SELECT 1 in each session"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.query))
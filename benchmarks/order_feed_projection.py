@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Rows/sec of the order feed built from full ORM graphs versus the Core projection.
+
+Both paths produce the same list of DeliveryResponse for the delivery feed:
+the ORM path eager-loads Order -> items -> images, delivery and vendor profile and
+runs format_delivery_response, the projection path aggregates items in SQL.
+
+    python -m benchmarks.order_feed_projection --rows 200 --iterations 50
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from app.database.database import async_session, engine
+from app.models.models import Order
+from app.schemas.status_schema import RequireDeliverySchema
+from app.services.order_service import (
+    ORDER_FEED_LOAD_OPTIONS,
+    format_delivery_response,
+    load_order_feed,
+    order_feed_projection,
+)
+
+
+async def orm_feed(rows: int):
+    async with async_session() as session:
+        result = await session.execute(
+            select(Order)
+            .options(*ORDER_FEED_LOAD_OPTIONS)
+            .where(Order.require_delivery == RequireDeliverySchema.DELIVERY)
+            .order_by(Order.created_at.desc())
+            .limit(rows)
+        )
+        return [
+            format_delivery_response(order=order, delivery=order.delivery)
+            for order in result.unique().scalars().all()
+        ]
+
+
+async def projection_feed(rows: int):
+    async with async_session() as session:
+        return await load_order_feed(
+            session,
+            order_feed_projection()
+            .where(Order.require_delivery == RequireDeliverySchema.DELIVERY)
+            .order_by(Order.created_at.desc())
+            .limit(rows),
+        )
+
+
+async def measure(feed, rows: int, iterations: int) -> tuple[float, int]:
+    produced = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        produced += len(await feed(rows))
+    return produced / (time.perf_counter() - start), produced // iterations
+
+
+async def main(rows: int, iterations: int):
+    # Warm up compiled and prepared statement caches
+    await orm_feed(rows)
+    await projection_feed(rows)
+
+    orm_rate, orm_rows = await measure(orm_feed, rows, iterations)
+    projection_rate, projection_rows = await measure(projection_feed, rows, iterations)
+
+    print(f"iterations: {iterations}, rows per feed: {orm_rows} / {projection_rows}")
+    print(f"ORM graph  : {orm_rate:10.1f} rows/sec")
+    print(f"projection : {projection_rate:10.1f} rows/sec")
+    if orm_rate:
+        print(f"speedup    : {projection_rate / orm_rate:10.2f}x")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark order feed building")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.iterations))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Messages/sec through the wallet consumer on the in-memory queue transport.
+
+Publishes zero-delta update_wallet messages spread over existing wallets and
+times until the consumer has settled all of them. No RabbitMQ is needed, only
+the database configured in .env; balances are left unchanged.
+
+    python -m benchmarks.queue_pipeline --messages 5000 --wallets 50
+    python -m benchmarks.queue_pipeline --messages 5000 --wallets 50 --batch
+    python -m benchmarks.queue_pipeline --messages 5000 --wallets 50 --shards 4
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from app.config.config import settings
+from app.database.database import async_session, engine
+from app.models.models import Wallet
+from app.queue.producer import CentralQueueProducer
+from app.queue.sharding import wallet_shards
+from app.queue.transport import InMemoryBroker, InMemoryTransport
+from app.queue.wallet_consumer import WalletQueueConsumer
+
+
+async def main(
+    messages: int, wallets: int, batch: bool, concurrency: int, shards: int
+):
+    settings.WALLET_QUEUE_BATCH_MODE = batch
+    settings.QUEUE_MAX_CONCURRENCY = concurrency
+    settings.WALLET_QUEUE_SHARDS = shards
+
+    async with async_session() as session:
+        wallet_ids = (await session.execute(select(Wallet.id).limit(wallets))).scalars().all()
+    if not wallet_ids:
+        raise SystemExit("No wallets in the database")
+
+    broker = InMemoryBroker()
+    producer = CentralQueueProducer(InMemoryTransport(broker))
+    consumers = [
+        WalletQueueConsumer(InMemoryTransport(broker), shard=shard)
+        for shard in wallet_shards()
+    ]
+    # Declares the queues the producer routes to
+    for consumer in consumers:
+        await consumer.start_consuming()
+
+    start = time.perf_counter()
+    await producer.publish_many(
+        [
+            {
+                "service": "wallet",
+                "operation": "update_wallet",
+                "payload": {
+                    "wallet_id": str(wallet_ids[i % len(wallet_ids)]),
+                    "balance_change": "0",
+                    "escrow_change": "0",
+                },
+            }
+            for i in range(messages)
+        ]
+    )
+    while any(
+        broker.queues[consumer.queue_name].messages or consumer._inflight
+        for consumer in consumers
+    ):
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+
+    retried = sum(
+        len(queue.messages)
+        for name, queue in broker.queues.items()
+        if any(name.startswith(f"{consumer.queue_name}_retry") for consumer in consumers)
+    )
+    print(
+        f"messages: {messages}, wallets: {len(wallet_ids)}, batch mode: {batch}, "
+        f"concurrency: {concurrency}, shards: {shards}"
+    )
+    print(f"elapsed    : {elapsed:10.3f} s")
+    print(f"throughput : {messages / elapsed:10.1f} messages/sec")
+    print(f"retrying   : {retried:10d}")
+
+    for consumer in consumers:
+        await consumer.stop_consuming()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the wallet queue consumer")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--wallets", type=int, default=50)
+    parser.add_argument("--batch", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=settings.QUEUE_MAX_CONCURRENCY)
+    parser.add_argument("--shards", type=int, default=settings.WALLET_QUEUE_SHARDS)
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.messages, args.wallets, args.batch, args.concurrency, args.shards)
+    )
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark of statement caching on the order feed queries.
+
+Runs the delivery feed and the user related orders query against three engine
+configurations: caches disabled, the configured cache sizes, and PgBouncer mode.
+
+    python -m benchmarks.statement_cache --iterations 500
+    python -m benchmarks.statement_cache --iterations 500 --user-id <uuid>
+"""
+import argparse
+import asyncio
+import time
+from uuid import UUID
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config.config import settings
+from app.database.database import statement_cache_options
+from app.models.models import Order
+from app.schemas.order_schema import OrderType
+from app.schemas.status_schema import RequireDeliverySchema
+from app.services.order_service import ORDER_FEED_LOAD_OPTIONS
+
+CONFIGURATIONS = {
+    "no cache": statement_cache_options(
+        pgbouncer_mode=False, compiled_cache_size=0, prepared_statement_cache_size=0
+    ),
+    "configured": statement_cache_options(pgbouncer_mode=False),
+    "pgbouncer": statement_cache_options(pgbouncer_mode=True),
+}
+
+
+def delivery_feed():
+    return (
+        select(Order)
+        .options(*ORDER_FEED_LOAD_OPTIONS)
+        .where(Order.require_delivery == RequireDeliverySchema.DELIVERY)
+        .where(
+            Order.order_type.in_([OrderType.FOOD, OrderType.LAUNDRY, OrderType.PACKAGE])
+        )
+        .order_by(Order.created_at.desc())
+        .limit(20)
+    )
+
+
+def user_feed(user_id: UUID):
+    return (
+        select(Order)
+        .options(*ORDER_FEED_LOAD_OPTIONS)
+        .where(or_(Order.owner_id == user_id, Order.vendor_id == user_id))
+        .order_by(Order.updated_at.desc())
+        .limit(20)
+    )
+
+
+async def run(name: str, options: dict, iterations: int, user_id: UUID | None):
+    bench_engine = create_async_engine(settings.DATABASE_URL, pool_size=1, **options)
+    session_factory = async_sessionmaker(bench_engine, expire_on_commit=False)
+    queries = [delivery_feed] + ([lambda: user_feed(user_id)] if user_id else [])
+
+    async def once():
+        # New session per request so the identity map does not hide query cost
+        async with session_factory() as session:
+            for query in queries:
+                (await session.execute(query())).unique().scalars().all()
+
+    for _ in range(20):
+        await once()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await once()
+    elapsed = (time.perf_counter() - start) / iterations
+    await bench_engine.dispose()
+
+    print(f"{name:<12}: {elapsed * 1000:8.2f} ms/request ({len(queries)} feeds)")
+
+
+async def main(iterations: int, user_id: UUID | None):
+    print(f"iterations: {iterations}")
+    for name, options in CONFIGURATIONS.items():
+        await run(name, options, iterations, user_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark statement caching")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--user-id", type=UUID, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.user_id))
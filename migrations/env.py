@@ -12,6 +12,7 @@ from alembic import context
 from app.config.config import settings
 from app.database.database import Base
 from app.models.models import *
+from app.models.archive_model import *
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,47 @@
+"""create vendor_review_stats materialized view
+
+Revision ID: 32e672991eda
+Revises: 80c50e4e94f4
+Create Date: 2025-09-24 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '32e672991eda'
+down_revision: Union[str, Sequence[str], None] = '80c50e4e94f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS vendor_review_stats AS
+        SELECT
+            o.vendor_id AS vendor_id,
+            max(o.order_type::text) AS item_type,
+            avg(r.rating)::numeric(4, 2) AS avg_rating,
+            count(r.id) AS review_count
+        FROM reviews r
+        JOIN orders o ON o.id = r.order_id
+        WHERE r.review_type = 'ORDER' AND o.vendor_id IS NOT NULL
+        GROUP BY o.vendor_id
+        """
+    )
+    # A unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_vendor_review_stats_vendor_id "
+        "ON vendor_review_stats (vendor_id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_vendor_review_stats_vendor_id")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS vendor_review_stats")
@@ -0,0 +1,78 @@
+"""partition transactions and audit_logs by month
+
+Revision ID: 37d89b6641df
+Revises: 9d17a1fa41d6
+Create Date: 2025-09-29 09:21:37.640215
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '37d89b6641df'
+down_revision: Union[str, Sequence[str], None] = '9d17a1fa41d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> partition key
+PARTITIONED_TABLES = {"transactions": "created_at", "audit_logs": "timestamp"}
+FOREIGN_KEYS = {
+    "transactions": [
+        "ADD CONSTRAINT transactions_wallet_id_fkey FOREIGN KEY (wallet_id) REFERENCES wallets (id) ON DELETE CASCADE",
+        "ADD CONSTRAINT transactions_to_wallet_id_fkey FOREIGN KEY (to_wallet_id) REFERENCES users (id) ON DELETE SET NULL",
+    ],
+}
+PREMAKE_MONTHS = 3
+
+
+def _next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    for table, column in PARTITIONED_TABLES.items():
+        # The existing table becomes the first partition as-is, no rows are copied.
+        # It covers everything up to the month after the newest row.
+        newest = bind.execute(sa.text(f"SELECT max({column}) FROM {table}")).scalar()
+        newest = max(newest.date() if newest else date.today(), date.today())
+        boundary = _next_month(newest)
+
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+        op.execute(f"ALTER INDEX {table}_pkey RENAME TO {table}_legacy_pkey")
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {table}_legacy INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({column})"
+        )
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {column})")
+        for foreign_key in FOREIGN_KEYS.get(table, []):
+            op.execute(f"ALTER TABLE {table} {foreign_key}")
+        op.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {table}_legacy "
+            f"FOR VALUES FROM (MINVALUE) TO ('{boundary}')"
+        )
+
+        start = boundary
+        for _ in range(PREMAKE_MONTHS):
+            end = _next_month(start)
+            op.execute(
+                f"CREATE TABLE {table}_p{start:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+            start = end
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in PARTITIONED_TABLES:
+        # Fold every partition back into the original table
+        op.execute(f"ALTER TABLE {table} DETACH PARTITION {table}_legacy")
+        op.execute(f"INSERT INTO {table}_legacy SELECT * FROM {table}")
+        op.execute(f"DROP TABLE {table}")
+        op.execute(f"ALTER TABLE {table}_legacy RENAME TO {table}")
+        op.execute(f"ALTER INDEX {table}_legacy_pkey RENAME TO {table}_pkey")
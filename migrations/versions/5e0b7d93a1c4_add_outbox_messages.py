@@ -0,0 +1,56 @@
+"""add outbox_messages
+
+Revision ID: 5e0b7d93a1c4
+Revises: c81f4e2a9b37
+Create Date: 2025-10-02 16:08:51.204377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7d93a1c4'
+down_revision: Union[str, Sequence[str], None] = 'c81f4e2a9b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "outbox_messages",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("message_id", sa.Uuid(), nullable=False),
+        sa.Column("service", sa.String(length=64), nullable=False),
+        sa.Column("operation", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("routing_key", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("message_id"),
+    )
+    op.create_index(
+        "ix_outbox_messages_unsent",
+        "outbox_messages",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("sent_at IS NULL"),
+    )
+    op.create_index(
+        "ix_outbox_messages_sent_at", "outbox_messages", ["sent_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_outbox_messages_sent_at", table_name="outbox_messages")
+    op.drop_index(
+        "ix_outbox_messages_unsent",
+        table_name="outbox_messages",
+        postgresql_where=sa.text("sent_at IS NULL"),
+    )
+    op.drop_table("outbox_messages")
@@ -0,0 +1,46 @@
+"""add order archive tables
+
+Revision ID: 716be2558986
+Revises: 37d89b6641df
+Create Date: 2025-09-30 14:05:52.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '716be2558986'
+down_revision: Union[str, Sequence[str], None] = '37d89b6641df'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# live table -> archive primary key
+ARCHIVED_TABLES = {
+    "orders": "id",
+    "order_items": "order_id, item_id",
+    "deliveries": "id",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, primary_key in ARCHIVED_TABLES.items():
+        # Same columns and NOT NULLs as the live table, no defaults or foreign keys
+        op.execute(f"CREATE TABLE archived_{table} (LIKE {table})")
+        op.execute(
+            f"ALTER TABLE archived_{table} ADD COLUMN archived_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()"
+        )
+        op.execute(f"ALTER TABLE archived_{table} ADD PRIMARY KEY ({primary_key})")
+
+    # Reviews stay live (they feed vendor ratings) while their orders are archived
+    op.drop_constraint('reviews_order_id_fkey', 'reviews', type_='foreignkey')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_foreign_key('reviews_order_id_fkey', 'reviews', 'orders', ['order_id'], ['id'])
+    for table in reversed(list(ARCHIVED_TABLES)):
+        op.drop_table(f"archived_{table}")
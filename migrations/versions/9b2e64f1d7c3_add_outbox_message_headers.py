@@ -0,0 +1,28 @@
+"""add outbox_messages headers
+
+Revision ID: 9b2e64f1d7c3
+Revises: 5e0b7d93a1c4
+Create Date: 2025-10-04 11:27:36.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2e64f1d7c3'
+down_revision: Union[str, Sequence[str], None] = '5e0b7d93a1c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("outbox_messages", sa.Column("headers", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("outbox_messages", "headers")
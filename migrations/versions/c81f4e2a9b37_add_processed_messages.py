@@ -0,0 +1,44 @@
+"""add processed_messages
+
+Revision ID: c81f4e2a9b37
+Revises: 716be2558986
+Create Date: 2025-10-01 11:42:08.573961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f4e2a9b37'
+down_revision: Union[str, Sequence[str], None] = '716be2558986'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "processed_messages",
+        sa.Column("message_id", sa.Uuid(), nullable=False),
+        sa.Column("service", sa.String(length=64), nullable=False),
+        sa.Column("operation", sa.String(length=64), nullable=False),
+        sa.Column("processed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("message_id"),
+    )
+    op.create_index(
+        op.f("ix_processed_messages_processed_at"),
+        "processed_messages",
+        ["processed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_processed_messages_processed_at"), table_name="processed_messages"
+    )
+    op.drop_table("processed_messages")